@@ -1,60 +1,70 @@
 import os
-import csv
-import glob
-from src.evaluator import evaluate_code
+import argparse
+from src.batch import collect_inputs, iter_evaluate_batch
+from src.dedup import build_index
 from src.logger import logger
+from src.summary_writer import SummaryWriter
+from src.utils import extract_model_prompt
 
 GENERATED_DIR = "generated_code"
+REPORTS_DIR = "reports"
 SUMMARY_DIR = "reports/summary"
 SUMMARY_FILE = os.path.join(SUMMARY_DIR, "summary.csv")
 
-def extract_model_prompt(filename: str):
-    """
-    Expected filename format: <prompt_name>_<model_name>.c
-    E.g., char_driver_mistral.c → ('mistral', 'char_driver.txt')
-    """
-    name = os.path.basename(filename).replace(".c", "")
-    parts = name.split("_")
-    if len(parts) < 2:
-        return "unknown", "unknown"
-    model = parts[-1]
-    prompt = "_".join(parts[:-1]) + ".txt"
-    return model, prompt
+
+def _function_score(report: dict) -> float:
+    metrics = report.get("functionality", {}).get("metrics", {})
+    return round(sum(metrics.values()) / len(metrics), 2) if metrics else 0.0
+
+
+def _summary_row(code_file: str, report: dict) -> dict:
+    model, prompt = extract_model_prompt(code_file)
+    lint = report.get("static_analysis", {})
+    advanced = report.get("advanced_features", {}).get("metrics", {})
+    return {
+        "model": model,
+        "prompt": prompt,
+        "function_score": _function_score(report),
+        "missing_functions": "|".join(lint.get("missing_functions", [])),
+        "missing_includes": "|".join(lint.get("missing_includes", [])),
+        "suspicious_macros": "|".join(lint.get("suspicious_macros", [])),
+        "present_optional_components": "|".join(k for k, v in advanced.items() if v)
+    }
+
 
 def main():
-    os.makedirs(SUMMARY_DIR, exist_ok=True)
+    parser = argparse.ArgumentParser(description="Evaluate every generated file and write the summary CSV")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Evaluate whitespace/comment-only variants once and add a near-duplicate cluster column")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard the summary checkpoint and start over instead of resuming")
+    args = parser.parse_args()
+
     csv_fields = [
         "model", "prompt", "function_score",
         "missing_functions", "missing_includes",
         "suspicious_macros", "present_optional_components"
     ]
+    if args.dedup:
+        csv_fields.append("cluster")
 
-    results = []
-    code_files = glob.glob(os.path.join(GENERATED_DIR, "*.c"))
-    logger.info(f"Found {len(code_files)} files to evaluate.")
-
-    for code_file in code_files:
-        model, prompt = extract_model_prompt(code_file)
-        result = evaluate_code(code_file, model, prompt)
-        if result:
-            results.append(result)
-
-    with open(SUMMARY_FILE, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=csv_fields)
-        writer.writeheader()
-        for row in results:
-            writer.writerow({
-                "model": row["model"],
-                "prompt": row["prompt"],
-                "function_score": row["function_score"],
-                "missing_functions": "|".join(row["missing_functions"]),
-                "missing_includes": "|".join(row["missing_includes"]),
-                "suspicious_macros": "|".join(row["suspicious_macros"]),
-                "present_optional_components": "|".join(row["present_optional_components"])
-            })
+    code_files = collect_inputs(directory=GENERATED_DIR)
+    # Rows go to disk (CSV + NDJSON) as files finish; a restarted run skips inputs already checkpointed
+    with SummaryWriter(SUMMARY_DIR, csv_fields, restart=args.restart) as writer:
+        todo = [p for p in code_files if p not in writer.done]
+        logger.info(f"Found {len(code_files)} files, {len(todo)} left to evaluate.")
+        index = build_index(code_files) if args.dedup else None
+        clusters = index.cluster_ids() if index else {}
+        for code_file, report in iter_evaluate_batch(todo, REPORTS_DIR, jobs=args.jobs, index=index):
+            if not report:
+                continue   # not checkpointed, so a resumed run retries it
+            row = _summary_row(code_file, report)
+            if args.dedup:
+                row["cluster"] = clusters.get(code_file)
+            writer.write(code_file, row)
 
     logger.info(f" Final summary saved to: {SUMMARY_FILE}")
 
-
 if __name__ == "__main__":
     main()
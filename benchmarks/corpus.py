@@ -0,0 +1,252 @@
+import os
+import math
+import random
+import argparse
+from typing import List, NamedTuple
+
+KB = 1024
+MB = 1024 * KB
+
+HEADERS = ["<linux/init.h>", "<linux/module.h>", "<linux/fs.h>", "<linux/cdev.h>", "<linux/device.h>",
+           "<linux/slab.h>", "<linux/uaccess.h>", "<linux/mutex.h>", "<linux/spinlock.h>"]
+
+
+class CorpusSpec(NamedTuple):
+    """Shape of each generated driver; counts are per file."""
+    fops: int = 1             # struct file_operations tables (each with its own read/write/open/release)
+    copies: int = 2           # extra copy_to_user / copy_from_user helpers
+    locks: int = 1            # mutex- and spinlock-protected helpers
+    comment_ratio: float = 0.2   # share of body lines followed by a comment line
+    long_lines: int = 1       # lines longer than 100 columns (table initialisers)
+    long_line_width: int = 400
+
+
+def _comment(rng: random.Random) -> str:
+    words = ["buffer", "device", "offset", "check", "user", "copy", "state", "lock", "bounds", "release"]
+    return "    // " + " ".join(rng.choice(words) for _ in range(rng.randint(3, 9)))
+
+
+def _fops_block(i: int, rng: random.Random, spec: CorpusSpec) -> List[str]:
+    p = f"dev{i}"
+    lines = [
+        f"static int {p}_open(struct inode *inode, struct file *file)",
+        "{",
+        f"    file->private_data = &{p}_state;",
+        "    return 0;",
+        "}",
+        "",
+        f"static int {p}_release(struct inode *inode, struct file *file)",
+        "{",
+        "    return 0;",
+        "}",
+        "",
+        f"static ssize_t {p}_read(struct file *file, char __user *buf, size_t count, loff_t *f_pos)",
+        "{",
+        "    size_t remaining;",
+        "    if (*f_pos >= BUFFER_SIZE)",
+        "        return 0;",
+        "    remaining = min(count, (size_t)(BUFFER_SIZE - *f_pos));",
+        f"    if (copy_to_user(buf, {p}_state.buffer + *f_pos, remaining))",
+        "        return -EFAULT;",
+        "    *f_pos += remaining;",
+        "    return remaining;",
+        "}",
+        "",
+        f"static ssize_t {p}_write(struct file *file, const char __user *buf, size_t count, loff_t *f_pos)",
+        "{",
+        "    size_t remaining;",
+        "    if (*f_pos >= BUFFER_SIZE)",
+        "        return -ENOSPC;",
+        "    remaining = min(count, (size_t)(BUFFER_SIZE - *f_pos));",
+        f"    if (copy_from_user({p}_state.buffer + *f_pos, buf, remaining))",
+        "        return -EFAULT;",
+        "    *f_pos += remaining;",
+        "    return remaining;",
+        "}",
+        "",
+        f"static struct file_operations {p}_fops = {{",
+        "    .owner = THIS_MODULE,",
+        f"    .open = {p}_open,",
+        f"    .release = {p}_release,",
+        f"    .read = {p}_read,",
+        f"    .write = {p}_write,",
+        "};",
+        "",
+    ]
+    return lines
+
+
+def _copy_helper(i: int, rng: random.Random) -> List[str]:
+    direction = rng.choice(["to", "from"])
+    args = "ubuf, kbuf + pos, len" if direction == "to" else "kbuf + pos, ubuf, len"
+    return [
+        f"static long helper_copy_{i}(char __user *ubuf, char *kbuf, size_t len, loff_t pos)",
+        "{",
+        "    if (len > BUFFER_SIZE - pos)",
+        "        len = BUFFER_SIZE - pos;",
+        f"    if (copy_{direction}_user({args}))",
+        "        return -EFAULT;",
+        "    return len;",
+        "}",
+        "",
+    ]
+
+
+def _lock_helper(i: int, rng: random.Random) -> List[str]:
+    if i % 2:
+        return [
+            f"static void locked_update_{i}(int value)",
+            "{",
+            "    unsigned long flags;",
+            "    spin_lock_irqsave(&dev_lock, flags);",
+            f"    counter_{i % 8} += value;",
+            "    spin_unlock_irqrestore(&dev_lock, flags);",
+            "}",
+            "",
+        ]
+    return [
+        f"static int locked_reset_{i}(void)",
+        "{",
+        "    if (mutex_lock_interruptible(&dev_mutex))",
+        "        return -ERESTARTSYS;",
+        f"    counter_{i % 8} = 0;",
+        "    mutex_unlock(&dev_mutex);",
+        "    return 0;",
+        "}",
+        "",
+    ]
+
+
+def _filler(i: int, rng: random.Random) -> List[str]:
+    n = rng.randint(3, 12)
+    body = [f"    acc = acc * {rng.randint(3, 97)} + (value >> {rng.randint(1, 7)});" for _ in range(n)]
+    return [f"static int compute_{i}(int value)", "{", "    int acc = 0;", *body, "    return acc;", "}", ""]
+
+
+def _long_line(i: int, width: int, rng: random.Random) -> str:
+    values = []
+    line = f"static const int table_{i}[] = {{ "
+    while len(line) < width:
+        values.append(str(rng.randint(0, 65535)))
+        line = f"static const int table_{i}[] = {{ " + ", ".join(values)
+    return line + " };"
+
+
+def generate_driver(size: int, seed: int = 0, spec: CorpusSpec = CorpusSpec()) -> str:
+    """
+    A driver-like C file of roughly `size` bytes (at least the fixed parts):
+    headers, a state struct, `spec.fops` file_operations tables, copy and
+    lock helpers, then filler functions until the size is reached. Same
+    arguments give the same text.
+    """
+    rng = random.Random(seed)
+    lines = [f"#include {h}" for h in HEADERS] + [
+        "",
+        "#define BUFFER_SIZE 4096",
+        "",
+        "static DEFINE_MUTEX(dev_mutex);",
+        "static DEFINE_SPINLOCK(dev_lock);",
+        *[f"static int counter_{k};" for k in range(8)],
+        "",
+    ]
+    for i in range(spec.fops):
+        lines += [f"static struct {{ char buffer[BUFFER_SIZE]; }} dev{i}_state;"]
+    lines.append("")
+    for i in range(spec.long_lines):
+        lines += [_long_line(i, spec.long_line_width, rng), ""]
+
+    blocks: List[List[str]] = []
+    blocks += [_fops_block(i, rng, spec) for i in range(spec.fops)]
+    blocks += [_copy_helper(i, rng) for i in range(spec.copies)]
+    blocks += [_lock_helper(i, rng) for i in range(spec.locks)]
+
+    tail = [
+        "static int __init bench_init(void)",
+        "{",
+        "    pr_info(\"bench driver loaded\\n\");",
+        "    return 0;",
+        "}",
+        "",
+        "static void __exit bench_exit(void)",
+        "{",
+        "    pr_info(\"bench driver unloaded\\n\");",
+        "}",
+        "",
+        "module_init(bench_init);",
+        "module_exit(bench_exit);",
+        "MODULE_LICENSE(\"GPL\");",
+        "",
+    ]
+
+    def emit(block: List[str]) -> None:
+        for line in block:
+            lines.append(line)
+            if line.startswith("    ") and rng.random() < spec.comment_ratio:
+                lines.append(_comment(rng))
+
+    for block in blocks:
+        emit(block)
+    budget = size - sum(len(x) + 1 for x in lines) - sum(len(x) + 1 for x in tail)
+    i = 0
+    while budget > 0:
+        block = _filler(i, rng)
+        before = len(lines)
+        emit(block)
+        budget -= sum(len(x) + 1 for x in lines[before:])
+        i += 1
+    lines += tail
+    return "\n".join(lines)
+
+
+def file_sizes(count: int, min_size: int = KB, max_size: int = MB, seed: int = 0) -> List[int]:
+    """`count` sizes, log-uniform between `min_size` and `max_size`, so small files dominate as in real output."""
+    rng = random.Random(seed)
+    lo, hi = math.log(min_size), math.log(max_size)
+    return [int(math.exp(rng.uniform(lo, hi))) for _ in range(count)]
+
+
+def generate_corpus(out_dir: str, count: int, min_size: int = KB, max_size: int = MB, seed: int = 0,
+                    spec: CorpusSpec = CorpusSpec()) -> List[str]:
+    """Writes `count` drivers to `out_dir` (bench_<k>.c) and returns their paths; files already there are kept."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for k, size in enumerate(file_sizes(count, min_size, max_size, seed)):
+        path = os.path.join(out_dir, f"bench_{k:06d}.c")
+        if not os.path.exists(path):
+            with open(path, "w") as f:
+                f.write(generate_driver(size, seed=seed * 1_000_003 + k, spec=spec))
+        paths.append(path)
+    return paths
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = CorpusSpec()
+    parser.add_argument("--fops", type=int, default=defaults.fops, help="file_operations tables per file")
+    parser.add_argument("--copies", type=int, default=defaults.copies, help="extra copy_*_user helpers per file")
+    parser.add_argument("--locks", type=int, default=defaults.locks, help="mutex/spinlock helpers per file")
+    parser.add_argument("--comment-ratio", type=float, default=defaults.comment_ratio,
+                        help="share of body lines followed by a comment")
+    parser.add_argument("--long-lines", type=int, default=defaults.long_lines, help="long lines per file")
+    parser.add_argument("--long-line-width", type=int, default=defaults.long_line_width)
+
+
+def spec_from_args(args) -> CorpusSpec:
+    return CorpusSpec(args.fops, args.copies, args.locks, args.comment_ratio, args.long_lines, args.long_line_width)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic driver corpus")
+    parser.add_argument("--out", default="benchmarks/corpus", help="Output directory")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--min-size", type=int, default=KB, help="Smallest file in bytes")
+    parser.add_argument("--max-size", type=int, default=MB, help="Largest file in bytes")
+    parser.add_argument("--seed", type=int, default=0)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    paths = generate_corpus(args.out, args.count, args.min_size, args.max_size, args.seed, spec_from_args(args))
+    total = sum(os.path.getsize(p) for p in paths)
+    print(f"{len(paths)} file(s), {total / MB:.1f} MB in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import gc
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import contextlib
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.logger import get_logger
+from src import profiling
+from src.batch import evaluate_batch
+from src.compiler import CompileService, compile_code
+from src.header_sets import DEFAULT_HEADER_SET, ensure_header_set
+from src.evaluation.scheduler import run_checkers
+from src.evaluation.source_unit import SourceUnit
+from src.metrics import BUCKET_SOURCES, load_profiles, score_all
+from src.results_db import ResultsDB, db_path_for
+from src import scoring
+from src.stats import RESAMPLES, leaderboard
+from src.summary_generator import build_summary
+from src.telemetry import TelemetryStore
+from benchmarks.corpus import KB, MB, CorpusSpec, add_spec_arguments, generate_corpus, generate_driver, spec_from_args
+
+logger = get_logger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Baselines are absolute timings, so each machine keeps its own entry (see machine_key)
+BASELINE_FILE = ".cache/bench/baselines.json"
+RESULTS_DIR = "logs/bench"
+CORPUS_DIR = ".cache/bench_corpus"
+DEFAULT_THRESHOLD = 0.25     # fail when a metric is this much worse than its baseline
+NOISE_FLOOR_MS = 0.5         # latency changes smaller than this never count as regressions
+FILE_SIZES = {"1k": KB, "16k": 16 * KB, "256k": 256 * KB, "1m": MB}
+DEFAULT_SIZES = [10, 100, 1000]
+# cold starts of the CLI; every shell-loop or CI-hook invocation pays these
+STARTUP_COMMANDS = {
+    "cli": ["-m", "src.cli", "--help"],
+    "evaluate": ["-m", "src.cli", "evaluate", "--help"],
+    "summarize": ["-m", "src.cli", "summarize", "--help"],
+    "generate": ["-c", "import src.code_runner"],
+}
+MODELS = ["deepseek_r1", "mistral", "llama3", "qwen_coder", "gpt_oss"]
+PROMPTS = ["char_driver", "block_driver", "net_driver", "misc_driver"]
+
+
+def _metric(value: float, better: str = "lower") -> Dict:
+    return {"value": round(value, 4), "better": better}
+
+
+@contextlib.contextmanager
+def _no_gc() -> Iterator[None]:
+    """Like timeit: collect first, then keep the cyclic GC from firing mid-measurement."""
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _best_ms(func: Callable, repeat: int) -> float:
+    """Fastest of `repeat` calls in milliseconds; the minimum is the least noisy estimate."""
+    best = float("inf")
+    for _ in range(repeat):
+        with _no_gc():
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_startup(repeat: int) -> Dict[str, Dict]:
+    """Wall time of a fresh interpreter running each STARTUP_COMMANDS entry (imports and argument parsing)."""
+    metrics = {}
+    for name, args in STARTUP_COMMANDS.items():
+        cmd = [sys.executable, *args]
+        ms = _best_ms(lambda: subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+                      repeat)
+        metrics[f"startup.{name}_ms"] = _metric(ms)
+    return metrics
+
+
+def bench_checkers(spec: CorpusSpec, repeat: int) -> Dict[str, Dict]:
+    """
+    Latency of every facet and registered checker, and of scoring, on one
+    driver per FILE_SIZES entry. Nodes run one at a time (as under --profile),
+    each on a fresh SourceUnit so facets are computed, not cached.
+    """
+    metrics = {}
+    for label, size in FILE_SIZES.items():
+        source = generate_driver(size, seed=size, spec=spec).encode()
+        best: Dict[str, float] = {}
+        report: Dict = {}
+        for _ in range(repeat):
+            unit = SourceUnit.from_bytes(f"bench_{label}.c", source)
+            with _no_gc(), profiling.collect() as stages:
+                report, _ = asyncio.run(run_checkers(unit, None, sequential=True))
+            for stage, record in stages.items():
+                best[stage] = min(best.get(stage, float("inf")), record["wall_s"] * 1000)
+        for stage, ms in sorted(best.items()):
+            metrics[f"checker.{stage}.{label}_ms"] = _metric(ms)
+        metrics[f"checker.score_all.{label}_ms"] = _metric(_best_ms(lambda: score_all(report), repeat))
+    return metrics
+
+
+def bench_compile(spec: CorpusSpec, repeat: int, header_set: str = DEFAULT_HEADER_SET) -> Dict[str, Dict]:
+    """compile_code latency per FILE_SIZES entry (gcc startup included, as in a real run)."""
+    ensure_header_set(header_set)
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, size in FILE_SIZES.items():
+            path = os.path.join(tmp, f"bench_{label}.c")
+            with open(path, "w") as f:
+                f.write(generate_driver(size, seed=size, spec=spec))
+            ms = _best_ms(lambda: compile_code(path, header_set=header_set), repeat)
+            metrics[f"compile_code.{label}_ms"] = _metric(ms)
+    return metrics
+
+
+def bench_evaluate(n: int, spec: CorpusSpec, max_size: int, jobs: int,
+                   header_set: str = DEFAULT_HEADER_SET) -> Dict[str, Dict]:
+    """
+    End-to-end evaluation of an `n`-file corpus (no cache): files/s and the
+    mean and p95 latency of every stage recorded in the reports' profiles.
+    """
+    ensure_header_set(header_set)
+    corpus = os.path.join(CORPUS_DIR, f"{'_'.join(map(str, spec))}_{max_size}")
+    paths = generate_corpus(corpus, n, max_size=max_size, spec=spec)
+    compiler = CompileService(header_set=header_set)
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        reports = evaluate_batch(paths, out, jobs=jobs, cache=None, compiler=compiler)
+        elapsed = time.perf_counter() - start
+    metrics = {f"evaluate.{n}.files_per_s": _metric(n / elapsed, "higher")}
+    for stage, s in profiling.aggregate_profiles([r.get("profile") for r in reports if r]).items():
+        metrics[f"evaluate.{n}.{stage}.mean_ms"] = _metric(s["mean_wall_s"] * 1000)
+        metrics[f"evaluate.{n}.{stage}.p95_ms"] = _metric(s["p95_wall_s"] * 1000)
+    failed = sum(r is None for r in reports)
+    if failed:
+        logger.warning(f"Benchmark corpus of {n}: {failed} file(s) failed to evaluate")
+    return metrics
+
+
+def _synthetic_rows(n: int, rng: random.Random) -> List[Dict]:
+    rows = []
+    for k in range(n):
+        model, prompt = rng.choice(MODELS), rng.choice(PROMPTS)
+        ok = rng.random() < 0.8
+        rows.append({
+            "file": f"generated_code/{model}_20240101_{k % 1000000:06d}_{prompt}_s{k}.c",
+            "model": model,
+            "prompt": f"{prompt}.txt",
+            "run": "bench",
+            "overall_score": round(rng.uniform(0, 100), 2),
+            "compilation_success": ok,
+            "compilation_errors": 0 if ok else rng.randint(1, 20),
+            "compilation_warnings": rng.randint(0, 10),
+            "report": f"reports/bench_{k}_evaluation.json",
+            "timestamp": "2024-01-01T00:00:00",
+        })
+    return rows
+
+
+def bench_summary(n: int) -> Dict[str, Dict]:
+    """
+    Rows/s into results.db, the time summary_generator takes to rebuild every
+    table for `n` results, and the per-model bootstrap on its own.
+    """
+    rows = _synthetic_rows(n, random.Random(n))
+    with tempfile.TemporaryDirectory() as out:
+        db = ResultsDB(db_path_for(out))
+        try:
+            start = time.perf_counter()
+            db.upsert(rows)
+            ingest = time.perf_counter() - start
+            store = TelemetryStore(os.path.join(out, "telemetry"))
+            start = time.perf_counter()
+            build_summary(db, os.path.join(out, "summary.csv"), os.path.join(out, "leaderboard.md"),
+                          os.path.join(out, "models.csv"), run="bench", store=store)
+            rebuild = time.perf_counter() - start
+        finally:
+            db.close()
+    models = [r["model"] for r in rows]
+    scores = [r["overall_score"] for r in rows]
+    start = time.perf_counter()
+    leaderboard(models, scores, RESAMPLES)
+    bootstrap = time.perf_counter() - start
+    return {
+        f"summary.{n}.ingest_rows_per_s": _metric(n / ingest, "higher"),
+        f"summary.{n}.rebuild_ms": _metric(rebuild * 1000),
+        f"summary.{n}.rows_per_s": _metric(n / rebuild, "higher"),
+        f"summary.{n}.bootstrap_ms": _metric(bootstrap * 1000),
+    }
+
+
+def _synthetic_reports(n: int, rng: random.Random) -> List[Dict]:
+    reports = []
+    for k in range(n):
+        model, prompt = rng.choice(MODELS), rng.choice(PROMPTS)
+        report = {"file": f"generated_code/{model}_20240101_000000_{prompt}_s{k}.c",
+                  "compilation": {"success": rng.random() < 0.8}}
+        for key in BUCKET_SOURCES.values():
+            report[key] = {"metrics": {f"m{j}": rng.random() for j in range(4)}}
+        reports.append(report)
+    return reports
+
+
+def bench_rescore(n: int) -> Dict[str, Dict]:
+    """src.scoring on `n` reports: packing their metrics into arrays, then scoring every profile at once."""
+    reports = _synthetic_reports(n, random.Random(n))
+    names, weights = scoring.weight_matrix(load_profiles(None))
+    start = time.perf_counter()
+    table = scoring.metric_table(reports)
+    pack = time.perf_counter() - start
+    ms = _best_ms(lambda: scoring.rescore(scoring.bucket_matrix(table), weights), 3)
+    return {
+        f"rescore.{n}.pack_ms": _metric(pack * 1000),
+        f"rescore.{n}.score_ms": _metric(ms),
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+
+def machine_key() -> str:
+    """
+    What a baseline is only valid on: OS and architecture, CPU model and
+    count, Python minor version. Hostnames are left out so identical CI
+    runners share an entry.
+    """
+    return (f"{platform.system()}-{platform.machine()} {_cpu_model()} x{os.cpu_count()} "
+            f"py{platform.python_version_tuple()[0]}.{platform.python_version_tuple()[1]}")
+
+
+def machine_info() -> Dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git": _git_rev(),
+        "machine": machine_key(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = DEFAULT_THRESHOLD,
+            noise_floor_ms: float = NOISE_FLOOR_MS) -> List[Dict]:
+    """
+    Metrics worse than their baseline by more than `threshold` (a fraction).
+    Latencies within `noise_floor_ms` of the baseline are ignored; metrics
+    missing on either side are not compared.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            continue
+        value, ref = current["value"], base["value"]
+        if current["better"] == "higher":
+            worse = value < ref * (1 - threshold)
+        else:
+            worse = value > ref * (1 + threshold) and not (name.endswith("_ms") and value - ref < noise_floor_ms)
+        if worse:
+            regressions.append({"metric": name, "baseline": ref, "value": value,
+                                "change": round(value / ref - 1, 4)})
+    return regressions
+
+
+def _read_baselines(path: str) -> Dict[str, Dict]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("machines", {})
+    except FileNotFoundError:
+        return {}
+
+
+def load_baseline(path: str, machine: str) -> Dict[str, Dict]:
+    """Metrics recorded on `machine`; another machine's numbers are never used as the gate."""
+    entry = _read_baselines(path).get(machine)
+    if entry is None:
+        logger.warning(f"No baseline for {machine!r} in {path}; nothing to compare against "
+                       f"(record one with --update-baseline)")
+        return {}
+    return entry.get("metrics", {})
+
+
+def save_baseline(path: str, machine: str, document: Dict) -> None:
+    """Replaces `machine`'s entry and keeps the other machines' entries."""
+    machines = _read_baselines(path)
+    machines[machine] = document
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"machines": dict(sorted(machines.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark checkers, compile_code, evaluation and summaries")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Corpus sizes (files / result rows), e.g. 10,100,1000,10000,100000")
+    parser.add_argument("--eval-max", type=int, default=1000,
+                        help="Largest corpus size that is fully evaluated; bigger sizes only run the summary benchmark")
+    parser.add_argument("--max-size", type=int, default=64 * KB, help="Largest file in evaluated corpora (bytes)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for the evaluation benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per latency measurement (best is kept)")
+    parser.add_argument("--only", default=None, help="Comma-separated subset of: startup,checkers,compile,evaluate,summary,rescore")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="Baseline JSON to compare against; entries are keyed by machine")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Fail when a metric is worse than its baseline by more than this fraction")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's results as this machine's baseline")
+    parser.add_argument("--output", default=None, help=f"Results JSON (default: {RESULTS_DIR}/bench_<ts>.json)")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    parts = set(args.only.split(",")) if args.only else {"startup", "checkers", "compile", "evaluate", "summary", "rescore"}
+    spec = spec_from_args(args)
+
+    results: Dict[str, Dict] = {}
+    if "startup" in parts:
+        results.update(bench_startup(args.repeat))
+    if "checkers" in parts:
+        results.update(bench_checkers(spec, args.repeat))
+    if "compile" in parts:
+        results.update(bench_compile(spec, args.repeat))
+    for n in sizes:
+        if "evaluate" in parts and n <= args.eval_max:
+            results.update(bench_evaluate(n, spec, args.max_size, args.jobs))
+        if "summary" in parts:
+            results.update(bench_summary(n))
+        if "rescore" in parts:
+            results.update(bench_rescore(n))
+
+    document = {"meta": {**machine_info(), "sizes": sizes, "spec": spec._asdict()}, "metrics": results}
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    logger.info(f"Benchmark results saved to {output}")
+
+    machine = document["meta"]["machine"]
+    if args.update_baseline:
+        save_baseline(args.baseline, machine, document)
+        print(f"Baseline updated: {args.baseline} [{machine}] ({len(results)} metrics)")
+        return
+
+    baseline = load_baseline(args.baseline, machine)
+    print(f"{'metric':<52} {'baseline':>12} {'value':>12} {'change':>8}")
+    for name, current in sorted(results.items()):
+        ref = baseline.get(name, {}).get("value")
+        change = f"{current['value'] / ref - 1:+.1%}" if ref else ""
+        print(f"{name:<52} {ref if ref is not None else '-':>12} {current['value']:>12} {change:>8}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        logger.error(f"Regression: {r['metric']} {r['baseline']} -> {r['value']} ({r['change']:+.1%})")
+        print(f"REGRESSION {r['metric']}: {r['baseline']} -> {r['value']} ({r['change']:+.1%})")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} ({len(results)} metrics)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,5 @@
-
-import sys
-sys.path.append("src")
-
-from src.code_runner import main
+from src.cli import main
 
 if __name__ == "__main__":
-    main()
+    # `python main.py --prompt ... --model ...` still generates; see src/cli.py for the other commands
+    main(default="generate", prog="main.py")
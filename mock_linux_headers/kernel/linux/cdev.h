@@ -0,0 +1,14 @@
+#ifndef _MOCK_LINUX_CDEV_H
+#define _MOCK_LINUX_CDEV_H
+#include <linux/fs.h>
+struct cdev {
+    struct module *owner;
+    const struct file_operations *ops;
+    dev_t dev;
+    unsigned int count;
+};
+void cdev_init(struct cdev *cdev, const struct file_operations *fops);
+struct cdev *cdev_alloc(void);
+int cdev_add(struct cdev *cdev, dev_t dev, unsigned int count);
+void cdev_del(struct cdev *cdev);
+#endif
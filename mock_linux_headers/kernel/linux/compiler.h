@@ -0,0 +1,9 @@
+#ifndef _MOCK_LINUX_COMPILER_H
+#define _MOCK_LINUX_COMPILER_H
+#define __user
+#define __iomem
+#define __force
+#define __must_check
+#define likely(x) __builtin_expect(!!(x), 1)
+#define unlikely(x) __builtin_expect(!!(x), 0)
+#endif
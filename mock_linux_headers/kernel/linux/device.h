@@ -0,0 +1,22 @@
+#ifndef _MOCK_LINUX_DEVICE_H
+#define _MOCK_LINUX_DEVICE_H
+#include <linux/types.h>
+#include <linux/err.h>
+struct module;
+struct class { const char *name; };
+struct device { struct device *parent; void *driver_data; };
+struct class *__mock_class_create(const char *name);
+/* accepts both class_create(name) (>= 6.4) and class_create(THIS_MODULE, name) */
+#define class_create(...) __mock_class_create("class")
+void class_destroy(struct class *cls);
+struct device *device_create(struct class *cls, struct device *parent, dev_t devt,
+                             void *drvdata, const char *fmt, ...);
+void device_destroy(struct class *cls, dev_t devt);
+void *dev_get_drvdata(const struct device *dev);
+void dev_set_drvdata(struct device *dev, void *data);
+int _dev_printk(const struct device *dev, const char *fmt, ...);
+#define dev_err(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#define dev_warn(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#define dev_info(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#define dev_dbg(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#endif
@@ -0,0 +1,54 @@
+#ifndef _MOCK_LINUX_FS_H
+#define _MOCK_LINUX_FS_H
+#include <linux/kernel.h>
+#include <linux/mutex.h>
+struct module;
+struct inode {
+    dev_t i_rdev;
+    struct cdev *i_cdev;
+    loff_t i_size;
+};
+struct file {
+    void *private_data;
+    unsigned int f_flags;
+    umode_t f_mode;
+    loff_t f_pos;
+};
+struct poll_table_struct;
+struct vm_area_struct;
+struct file_operations {
+    struct module *owner;
+    loff_t (*llseek)(struct file *, loff_t, int);
+    ssize_t (*read)(struct file *, char __user *, size_t, loff_t *);
+    ssize_t (*write)(struct file *, const char __user *, size_t, loff_t *);
+    unsigned int (*poll)(struct file *, struct poll_table_struct *);
+    long (*unlocked_ioctl)(struct file *, unsigned int, unsigned long);
+    long (*compat_ioctl)(struct file *, unsigned int, unsigned long);
+    int (*mmap)(struct file *, struct vm_area_struct *);
+    int (*open)(struct inode *, struct file *);
+    int (*flush)(struct file *, void *);
+    int (*release)(struct inode *, struct file *);
+    int (*fsync)(struct file *, loff_t, loff_t, int);
+};
+#define MINORBITS 20
+#define MINORMASK ((1U << MINORBITS) - 1)
+#define MAJOR(dev) ((unsigned int)((dev) >> MINORBITS))
+#define MINOR(dev) ((unsigned int)((dev) & MINORMASK))
+#define MKDEV(ma, mi) (((ma) << MINORBITS) | (mi))
+#define SEEK_SET 0
+#define SEEK_CUR 1
+#define SEEK_END 2
+#define FMODE_READ 0x1
+#define FMODE_WRITE 0x2
+#define O_NONBLOCK 00004000
+int register_chrdev(unsigned int major, const char *name, const struct file_operations *fops);
+void unregister_chrdev(unsigned int major, const char *name);
+int alloc_chrdev_region(dev_t *dev, unsigned int baseminor, unsigned int count, const char *name);
+int register_chrdev_region(dev_t from, unsigned int count, const char *name);
+void unregister_chrdev_region(dev_t from, unsigned int count);
+unsigned int iminor(const struct inode *inode);
+unsigned int imajor(const struct inode *inode);
+loff_t no_llseek(struct file *file, loff_t offset, int whence);
+loff_t default_llseek(struct file *file, loff_t offset, int whence);
+int nonseekable_open(struct inode *inode, struct file *filp);
+#endif
@@ -0,0 +1,8 @@
+#ifndef _MOCK_LINUX_INIT_H
+#define _MOCK_LINUX_INIT_H
+#define __init
+#define __exit
+#define __initdata
+#define module_init(fn) static int (*__mock_initcall)(void) __attribute__((unused)) = fn
+#define module_exit(fn) static void (*__mock_exitcall)(void) __attribute__((unused)) = fn
+#endif
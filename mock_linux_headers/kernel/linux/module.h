@@ -0,0 +1,18 @@
+#ifndef _MOCK_LINUX_MODULE_H
+#define _MOCK_LINUX_MODULE_H
+#include <linux/kernel.h>
+#include <linux/init.h>
+struct module { int dummy; };
+extern struct module __this_module;
+#define THIS_MODULE (&__this_module)
+#define MODULE_LICENSE(x)
+#define MODULE_AUTHOR(x)
+#define MODULE_DESCRIPTION(x)
+#define MODULE_VERSION(x)
+#define MODULE_ALIAS(x)
+#define MODULE_DEVICE_TABLE(type, name)
+#define module_param(name, type, perm)
+#define MODULE_PARM_DESC(name, desc)
+#define EXPORT_SYMBOL(sym)
+#define EXPORT_SYMBOL_GPL(sym)
+#endif
@@ -0,0 +1,12 @@
+#ifndef _MOCK_LINUX_MUTEX_H
+#define _MOCK_LINUX_MUTEX_H
+struct mutex { int count; };
+#define DEFINE_MUTEX(name) struct mutex name = { 1 }
+void mutex_init(struct mutex *lock);
+void mutex_lock(struct mutex *lock);
+int mutex_lock_interruptible(struct mutex *lock);
+int mutex_trylock(struct mutex *lock);
+void mutex_unlock(struct mutex *lock);
+void mutex_destroy(struct mutex *lock);
+int mutex_is_locked(struct mutex *lock);
+#endif
@@ -0,0 +1,13 @@
+#ifndef _MOCK_LINUX_SLAB_H
+#define _MOCK_LINUX_SLAB_H
+#include <linux/types.h>
+#define GFP_KERNEL 0x0cc0u
+#define GFP_ATOMIC 0x0820u
+void *kmalloc(size_t size, gfp_t flags);
+void *kzalloc(size_t size, gfp_t flags);
+void *kcalloc(size_t n, size_t size, gfp_t flags);
+void *krealloc(const void *p, size_t new_size, gfp_t flags);
+void kfree(const void *p);
+void *vmalloc(unsigned long size);
+void vfree(const void *addr);
+#endif
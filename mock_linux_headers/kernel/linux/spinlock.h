@@ -0,0 +1,10 @@
+#ifndef _MOCK_LINUX_SPINLOCK_H
+#define _MOCK_LINUX_SPINLOCK_H
+typedef struct { int slock; } spinlock_t;
+#define DEFINE_SPINLOCK(x) spinlock_t x = { 0 }
+void spin_lock_init(spinlock_t *lock);
+void spin_lock(spinlock_t *lock);
+void spin_unlock(spinlock_t *lock);
+#define spin_lock_irqsave(lock, flags) ((flags) = 0, spin_lock(lock))
+#define spin_unlock_irqrestore(lock, flags) ((void)(flags), spin_unlock(lock))
+#endif
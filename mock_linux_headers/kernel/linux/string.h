@@ -0,0 +1,18 @@
+#ifndef _MOCK_LINUX_STRING_H
+#define _MOCK_LINUX_STRING_H
+#include <linux/types.h>
+void *memset(void *s, int c, size_t n);
+void *memcpy(void *dest, const void *src, size_t n);
+void *memmove(void *dest, const void *src, size_t n);
+int memcmp(const void *a, const void *b, size_t n);
+size_t strlen(const char *s);
+size_t strnlen(const char *s, size_t maxlen);
+char *strcpy(char *dest, const char *src);
+char *strncpy(char *dest, const char *src, size_t n);
+ssize_t strscpy(char *dest, const char *src, size_t count);
+char *strcat(char *dest, const char *src);
+int strcmp(const char *a, const char *b);
+int sprintf(char *buf, const char *fmt, ...);
+int snprintf(char *buf, size_t size, const char *fmt, ...);
+int scnprintf(char *buf, size_t size, const char *fmt, ...);
+#endif
@@ -0,0 +1,19 @@
+#ifndef _MOCK_LINUX_TYPES_H
+#define _MOCK_LINUX_TYPES_H
+#include <stddef.h>
+#include <stdbool.h>
+typedef long ssize_t;
+typedef long long loff_t;
+typedef unsigned int dev_t;
+typedef unsigned short umode_t;
+typedef unsigned int mode_t;
+typedef unsigned int gfp_t;
+typedef unsigned char u8;
+typedef unsigned short u16;
+typedef unsigned int u32;
+typedef unsigned long long u64;
+typedef signed char s8;
+typedef short s16;
+typedef int s32;
+typedef long long s64;
+#endif
@@ -0,0 +1,197 @@
+import os
+import glob
+import asyncio
+import json
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.logger import get_logger, start_log_listener, init_worker_logging, stage_levels
+from src.cache import ResultCache
+from src.compiler import CompileService
+from src.evaluator import evaluate_file, evaluate_files_async, report_path_for, save_report
+from src.dedup import DedupIndex, build_index
+from src.profiling import aggregate_profiles
+
+logger = get_logger(__name__)
+
+SUMMARY_FILE = "batch_summary.json"
+
+
+def collect_inputs(directory: Optional[str] = None, manifest: Optional[str] = None,
+                   pattern: str = "*.c") -> List[str]:
+    """
+    Returns the files to evaluate, in a stable order:
+      - directory: every file matching `pattern`, sorted by path
+      - manifest: one path per line in listed order (blank lines and '#' comments skipped)
+    """
+    if directory:
+        return sorted(glob.glob(os.path.join(directory, pattern)))
+    paths = []
+    with open(manifest, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(line)
+    return paths
+
+
+def _summary_row(file_path: str, output_dir: str, report: Optional[Dict]) -> Dict:
+    if report is None:
+        return {"file": file_path, "report": None, "ok": False}
+    compilation = report.get("compilation", {})
+    return {
+        "file": file_path,
+        "report": report_path_for(file_path, output_dir),
+        "ok": True,
+        "overall_score": report.get("overall_score", {}).get("scores", {}).get("overall_score"),
+        "compilation_success": compilation.get("success", False),
+        "compilation_errors": compilation.get("errors_count", 0),
+        "compilation_warnings": compilation.get("warnings_count", 0),
+    }
+
+
+def _reuse_report(report: Optional[Dict], file_path: str, original: str, output_dir: str) -> Optional[Dict]:
+    """Copy of `original`'s report for an exact normalized duplicate, saved under `file_path`."""
+    if report is None:
+        return None
+    reused = json.loads(json.dumps(report))
+    reused["file"] = file_path
+    reused["duplicate_of"] = original
+    save_report(reused, file_path, output_dir)
+    return reused
+
+
+def evaluate_batch(paths: List[str], output_dir: str, jobs: Optional[int] = None,
+                   cache: Optional[ResultCache] = None,
+                   compiler: Optional[CompileService] = None,
+                   dedup: bool = False) -> List[Optional[Dict]]:
+    """
+    Evaluates `paths` across a process pool and writes the usual per-file
+    reports plus `batch_summary.json`. Results are returned in input order.
+    With one job, files share a single event loop and `compiler` overlaps gcc runs.
+    With `dedup`, files whose normalized tokens match an earlier file reuse its
+    report, and near-duplicate clusters are recorded in the summary.
+    """
+    index = build_index(paths) if dedup else None
+    todo = [p for p in paths if not (index and index.duplicate_of(p))]
+
+    done = dict(zip(todo, _evaluate_all(todo, output_dir, jobs, cache, compiler)))
+    reports = []
+    for p in paths:
+        original = index.duplicate_of(p) if index else None
+        reports.append(_reuse_report(done.get(original), p, original, output_dir) if original else done[p])
+
+    write_batch_summary(paths, reports, output_dir, index)
+    return reports
+
+
+def _evaluate_all(paths: List[str], output_dir: str, jobs: Optional[int],
+                  cache: Optional[ResultCache], compiler: Optional[CompileService]) -> List[Optional[Dict]]:
+    jobs = jobs or os.cpu_count() or 1
+    logger.info(f"Batch evaluation of {len(paths)} file(s) with {jobs} worker(s)")
+
+    if jobs == 1 or len(paths) <= 1:
+        reports = asyncio.run(evaluate_files_async(paths, output_dir, cache, compiler))
+    else:
+        queue, listener = start_log_listener()
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker_logging,
+                                     initargs=(queue, stage_levels())) as pool:
+                chunksize = max(1, len(paths) // (jobs * 8))
+                n = len(paths)
+                reports = list(pool.map(evaluate_file, paths, [output_dir] * n, [cache] * n,
+                                        [compiler] * n, chunksize=chunksize))
+        finally:
+            listener.stop()
+    return reports
+
+
+def iter_evaluate_batch(paths: List[str], output_dir: str, jobs: Optional[int] = None,
+                        cache: Optional[ResultCache] = None, compiler: Optional[CompileService] = None,
+                        index: Optional[DedupIndex] = None) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """
+    Yields (path, report) as each file finishes, in completion order, and
+    never holds more than a few files per worker in flight, so memory does
+    not grow with the corpus. With a dedup `index`, a file whose original
+    is also in `paths` reuses that report right after the original finishes.
+    No batch summary is written; callers stream their own.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    wanted = set(paths)
+    copies: Dict[str, List[str]] = {}
+    todo = []
+    for p in paths:
+        original = index.duplicate_of(p) if index else None
+        if original in wanted:
+            copies.setdefault(original, []).append(p)
+        else:
+            todo.append(p)
+    logger.info(f"Streaming evaluation of {len(todo)} file(s) with {jobs} worker(s)")
+
+    def _with_copies(path: str, report: Optional[Dict]) -> Iterator[Tuple[str, Optional[Dict]]]:
+        yield path, report
+        for copy in copies.get(path, []):
+            yield copy, _reuse_report(report, copy, path, output_dir)
+
+    if jobs == 1 or len(todo) <= 1:
+        window = (compiler.concurrency if compiler else os.cpu_count() or 1) * 2
+        for i in range(0, len(todo), window):
+            chunk = todo[i:i + window]
+            for path, report in zip(chunk, asyncio.run(evaluate_files_async(chunk, output_dir, cache, compiler))):
+                yield from _with_copies(path, report)
+        return
+
+    queue, listener = start_log_listener()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker_logging, initargs=(queue, stage_levels())) as pool:
+            pending = {}
+            remaining = iter(todo)
+            while True:
+                for path in remaining:
+                    pending[pool.submit(evaluate_file, path, output_dir, cache, compiler)] = path
+                    if len(pending) >= jobs * 4:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield from _with_copies(pending.pop(future), future.result())
+    finally:
+        listener.stop()
+
+
+def _dedup_summary(index: DedupIndex, rows: List[Dict]) -> Dict:
+    ids = index.cluster_ids()
+    for row in rows:
+        row["cluster"] = ids.get(row["file"])
+        row["duplicate_of"] = index.duplicate_of(row["file"])
+    return {
+        "unique_files": len(index.entries) - sum(1 for r in rows if r["duplicate_of"]),
+        "exact_duplicates": sum(1 for r in rows if r["duplicate_of"]),
+        "clusters": [{"id": ids[group[0]], "size": len(group), "files": group} for group in index.clusters()],
+    }
+
+
+def write_batch_summary(paths: List[str], reports: List[Optional[Dict]], output_dir: str,
+                        index: Optional[DedupIndex] = None) -> str:
+    rows = [_summary_row(p, output_dir, r) for p, r in zip(paths, reports)]
+    scores = [r["overall_score"] for r in rows if r.get("overall_score") is not None]
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "files": len(rows),
+        "failed": sum(1 for r in rows if not r["ok"]),
+        "compiled": sum(1 for r in rows if r.get("compilation_success")),
+        "mean_overall_score": round(sum(scores) / len(scores), 2) if scores else None,
+        # where the time went, per stage across the batch (see src/profiling.py)
+        "profile": aggregate_profiles([r.get("profile") for r in reports if r]),
+        "results": rows,
+    }
+    if index is not None:
+        summary["dedup"] = _dedup_summary(index, rows)
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, SUMMARY_FILE)
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=4)
+    logger.info(f"Batch summary saved to {summary_path}")
+    return summary_path
@@ -0,0 +1,128 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from src.logger import get_logger
+from src import compiler, metrics
+from src.header_sets import DEFAULT_HEADER_SET, hash_tree, header_set_dir, header_set_label
+from src.evaluation.registry import registered_checkers
+
+logger = get_logger(__name__)
+
+CACHE_DIR = ".cache/evaluations"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Evict down to this fraction of the limit so we don't rescan on every put.
+EVICT_TARGET = 0.9
+# Compile statuses that are gcc's verdict on the source (or a skip decided by the
+# source alone). timeout, memory_limit and error depend on --compile-timeout,
+# --compile-memory-mb and the machine, which the key does not cover.
+CACHEABLE_COMPILE_STATUSES = ("ok", "failed", "skipped")
+
+
+def version_tag() -> str:
+    """Version of every stage whose output ends up in a report."""
+    parts = [f"compiler={compiler.COMPILER_VERSION}"]
+    parts += [f"{c.key}={c.version}" for c in registered_checkers()]
+    parts.append(f"scoring={metrics.SCORING_VERSION}")
+    return ";".join(parts)
+
+
+class ResultCache:
+    """
+    On-disk evaluation cache keyed by source content, header set and stage versions.
+    Entries are plain JSON files; reads bump the mtime so eviction is LRU by size.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 header_set: str = DEFAULT_HEADER_SET):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.header_set = header_set
+        self._prefix: Optional[str] = None
+        self._size: Optional[int] = None
+
+    def _key_prefix(self) -> str:
+        if self._prefix is None:
+            set_dir = header_set_dir(self.header_set)
+            headers = hash_tree(set_dir) if os.path.isdir(set_dir) else "none"
+            self._prefix = f"{header_set_label(self.header_set)}:{headers}|{version_tag()}|"
+        return self._prefix
+
+    def key_for(self, content: bytes, salt: str = "") -> str:
+        """Key of `content`; `salt` keys variants of the same contents apart."""
+        h = hashlib.sha256((self._key_prefix() + salt).encode())
+        h.update(content)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            os.utime(path)
+            return report
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, report: Dict) -> None:
+        """Stores `report` unless its compilation has no real verdict (then the next run compiles again)."""
+        status = (report.get("compilation") or {}).get("status")
+        if status not in CACHEABLE_COMPILE_STATUSES:
+            logger.debug(f"Not caching a report with compile status {status!r}")
+            return
+        path = self._path(key)
+        try:
+            if self._size is None:
+                self._size = self._scan_size()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(report, f)
+            os.replace(tmp, path)
+            self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self.evict()
+        except Exception as e:
+            logger.error(f"Failed to write cache entry {path}: {e}")
+
+    def _entries(self) -> List[Tuple[str, os.stat_result]]:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if name.endswith(".json"):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        entries.append((path, os.stat(path)))
+                    except FileNotFoundError:
+                        pass
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(st.st_size for _, st in self._entries())
+
+    def evict(self) -> None:
+        """Deletes least recently used entries until the cache is under its target size."""
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        total = sum(st.st_size for _, st in entries)
+        target = int(self.max_bytes * EVICT_TARGET)
+        removed = 0
+        for path, st in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= st.st_size
+                removed += 1
+            except FileNotFoundError:
+                pass
+        self._size = total
+        if removed:
+            logger.info(f"Evaluation cache evicted {removed} entr(ies), now {total} bytes")
@@ -0,0 +1,46 @@
+import sys
+import argparse
+import importlib
+from typing import List, Optional
+
+# command -> (module whose main() runs it, summary). Modules are imported only
+# when their command runs, so `evaluate` never loads the model SDKs or dotenv and
+# `summarize` never loads asyncio or the checkers.
+COMMANDS = {
+    "generate": ("src.code_runner", "Generate code for one prompt with one model"),
+    "sweep": ("src.sweep", "Generate code for many models x prompts x samples"),
+    "evaluate": ("src.evaluator", "Evaluate C files and write reports"),
+    "summarize": ("src.summary_generator", "Rebuild the summary CSV and leaderboard"),
+    "rescore": ("src.scoring", "Re-score existing reports under weight profiles"),
+    "run": ("src.pipeline", "Generate and evaluate in one run"),
+}
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    epilog = "commands:\n" + "\n".join(f"  {name:<11} {summary}" for name, (_, summary) in COMMANDS.items())
+    parser = argparse.ArgumentParser(prog=prog, description="Linux driver code generation and evaluation",
+                                     epilog=epilog + "\n\nRun '<command> --help' for a command's options.",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS, metavar="command", help=", ".join(COMMANDS))
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, default: Optional[str] = None, prog: Optional[str] = None) -> None:
+    """
+    Dispatches to the command's module. With `default`, arguments that do not
+    start with a command name run that command (main.py keeps its old flags).
+    """
+    prog = prog or "python -m src.cli"
+    argv = sys.argv[1:] if argv is None else argv
+    if default and (not argv or argv[0] not in COMMANDS) and argv[:1] not in (["-h"], ["--help"]):
+        argv = [default, *argv]
+    args = build_parser(prog).parse_args(argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    # usage lines of the command read "<prog> <command> ..."
+    sys.argv[0] = f"{prog} {args.command}"
+    module.main(args.args)
+
+
+if __name__ == "__main__":
+    main()
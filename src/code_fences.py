@@ -0,0 +1,76 @@
+import re
+from typing import List
+
+FENCE = "```"
+_LANG_RX = re.compile(r"[a-zA-Z]*")
+
+# parser states
+TEXT, INFO, CODE = "text", "info", "code"
+
+
+def _partial_fence(s: str) -> int:
+    """Length of a trailing run of backticks that could be the start of a fence."""
+    n = 0
+    while n < len(FENCE) - 1 and n < len(s) and s[-1 - n] == "`":
+        n += 1
+    return n
+
+
+class FenceParser:
+    """
+    Incremental ```-fence extractor for streamed model output. Feed chunks as
+    they arrive; every block is returned from `feed` as soon as its closing
+    fence is seen. Same rules as the old regex: an opening fence may carry a
+    language tag (letters) ending in a newline, and the next ``` closes it.
+    """
+
+    def __init__(self):
+        self.state = TEXT
+        self.blocks: List[str] = []
+        self._pending = ""     # unconsumed tail, at most a partial fence / language tag
+        self._code: List[str] = []
+        self._text: List[str] = []
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consumes `chunk`; returns blocks completed by it."""
+        self._text.append(chunk)
+        self._pending += chunk
+        done = []
+        while self._pending:
+            if self.state == TEXT:
+                i = self._pending.find(FENCE)
+                if i < 0:
+                    keep = _partial_fence(self._pending)
+                    self._pending = self._pending[len(self._pending) - keep:] if keep else ""
+                    break
+                self._pending = self._pending[i + len(FENCE):]
+                self.state = INFO
+            elif self.state == INFO:
+                lang = _LANG_RX.match(self._pending).end()
+                if lang == len(self._pending):
+                    break          # tag may continue in the next chunk
+                if lang and self._pending[lang] == "\n":
+                    self._pending = self._pending[lang + 1:]
+                self.state, self._code = CODE, []
+            else:
+                i = self._pending.find(FENCE)
+                if i < 0:
+                    keep = _partial_fence(self._pending)
+                    self._code.append(self._pending[:len(self._pending) - keep])
+                    self._pending = self._pending[len(self._pending) - keep:]
+                    break
+                self._code.append(self._pending[:i])
+                self._pending = self._pending[i + len(FENCE):]
+                block = "".join(self._code)
+                self.blocks.append(block)
+                done.append(block)
+                self.state = TEXT
+        return done
+
+    @property
+    def text(self) -> str:
+        return "".join(self._text)
+
+    def result(self) -> str:
+        """Code for the whole response: all closed blocks, or the stripped text if there are none."""
+        return "\n\n".join(self.blocks) if self.blocks else self.text.strip()
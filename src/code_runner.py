@@ -1,13 +1,15 @@
 import os
+import json
 import argparse
-from dotenv import load_dotenv
+from typing import List, Optional
 from src.models.model_registry import together_models, get_model
-from src.utils import extract_code_blocks, save_generated_code
-from src.logger import logger
+from src.models.response_cache import ResponseCache, RESPONSE_CACHE_DIR, CACHE_MODES
+from src.utils import extract_code_blocks, save_generated_code, load_env
+from src.logger import get_logger
+from src import profiling
 from src.errors import PromptFileError, ModelLoadError ,CodeGenerationError
 
-load_dotenv()
-TOGETHER_API_KEY=os.getenv("TOGETHER_API_KEY")
+logger = get_logger(__name__)
 
 
 def read_prompt(path):
@@ -21,7 +23,8 @@ def read_prompt(path):
         raise PromptFileError(str(e))
     
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    load_env()
     parser= argparse.ArgumentParser(description="Run prompt with the selected model")
     
     parser.add_argument("--prompt","--p",
@@ -39,34 +42,52 @@ def main():
                         type=str,
                         help="Option output path for code to be saved") 
 
-    args=parser.parse_args()
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Sampling seed; part of the response cache key")
+    parser.add_argument("--temperature", type=float, default=None,
+                        help="Sampling temperature; part of the response cache key")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="use",
+                        help="use: reuse cached responses | refresh: call the API and overwrite | bypass: no cache")
+    parser.add_argument("--cache-dir", default=RESPONSE_CACHE_DIR, help="Response cache directory")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write cProfile stats and a collapsed-stack file to logs/profile/")
+
+    args=parser.parse_args(argv)
     if not args.output:
         args.output = "generated_code"
     
 
-    try:
-            prompt_path = os.path.join("prompts", args.prompt)
-            prompt = read_prompt(prompt_path)
+    with profiling.profile_run("code_runner") if args.profile else profiling.collect() as stages:
+        try:
+            with profiling.span("read_prompt"):
+                prompt_path = os.path.join("prompts", args.prompt)
+                prompt = read_prompt(prompt_path)
 
             logger.info(f"model selected: {args.model}")
             logger.info(f"The prompt selected from :{args.prompt}")
 
-            model = get_model(args.model)
+            with profiling.span("load_model"):
+                model = get_model(args.model, cache=ResponseCache(args.cache_dir, args.cache_mode))
+            params = {k: v for k, v in (("seed", args.seed), ("temperature", args.temperature)) if v is not None}
 
             try:
-                response = model.generate_code(prompt)
+                with profiling.span("generate"):
+                    response = model.generate_code(prompt, **params)
                 logger.info(" Response received from Together AI.")
                 logger.debug(f"Raw Response:\n{response}")
 
             except Exception as model_error:
                 raise ModelLoadError(f"Together AI generation failed: {model_error}")
 
-            code = extract_code_blocks(response)
-            save_generated_code(args.model, code, output_path=args.output)
+            with profiling.span("extract"):
+                code = extract_code_blocks(response)
+            with profiling.span("save"):
+                save_generated_code(args.model, code, output_path=args.output)
             logger.info("Code generation complete.")
 
-    except (PromptFileError, ModelLoadError, Exception) as e:
-        logger.error(f" Pipeline failed: {e}")
+        except (PromptFileError, ModelLoadError, Exception) as e:
+            logger.error(f" Pipeline failed: {e}")
+    logger.info(f"Stage timings: {json.dumps(stages)}")
 
 
 if __name__ == "__main__":
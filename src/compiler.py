@@ -1,63 +1,331 @@
-import os
-import subprocess
-from datetime import datetime
-from pathlib import Path
-from src.logger import logger
-
-def _to_wsl_path(win_path: str) -> str:
-    p = Path(win_path).resolve()
-    drive = p.drive.replace(":", "").lower()
-    parts = "/".join(p.parts[1:])  # drop drive letter
-    return f"/mnt/{drive}/{parts}".replace("\\", "/")
-
-def compile_code(file_path: str) -> dict:
-    logs_dir = "logs"
-    os.makedirs(logs_dir, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base = os.path.splitext(os.path.basename(file_path))[0]
-    log_file = os.path.join(logs_dir, f"{base}_compile_{ts}.log")
-
-    # Paths for both Windows and WSL
-    include_dir = os.path.abspath("mock_linux_headers")
-
-    # If you installed gcc in WSL, call via `wsl` and convert paths
-    use_wsl = True
-    if use_wsl:
-        wsl_file = _to_wsl_path(file_path)
-        wsl_inc  = _to_wsl_path(include_dir)
-        cmd = ["wsl", "gcc", "-Wall", "-Wextra", "-fsyntax-only", "-I", wsl_inc, wsl_file]
-        pretty_cmd = " ".join(cmd)
-    else:
-        cmd = ["gcc", "-Wall", "-Wextra", "-fsyntax-only", "-I", include_dir, file_path]
-        pretty_cmd = " ".join(cmd)
-
-    logger.info(f"Compiling {file_path} using gcc...")
-    logger.debug(f"Command: {pretty_cmd}")
-
-    result = {"success": False, "warnings_count": 0, "errors_count": 0, "log_file": log_file}
-    with open(log_file, "w", encoding="utf-8", errors="ignore") as f:
-        try:
-            proc = subprocess.run(cmd, stdout=f, stderr=subprocess.STDOUT, text=True)
-        except FileNotFoundError as e:
-            logger.error(f"gcc not found: {e}")
-            f.write(f"error: gcc not found: {e}\n")
-            result["errors_count"] = 1
-            return result
-
-    # Parse the log for warnings/errors
-    try:
-        with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-            log = f.read()
-        result["warnings_count"] = log.count("warning:")
-        result["errors_count"]   = log.count("error:")
-    except Exception:
-        pass
-
-    result["success"] = (proc.returncode == 0)
-
-    if result["success"]:
-        logger.info(f"✅ Compilation successful with {result['warnings_count']} warnings.")
-    else:
-        logger.warning(f"⚠️ Compilation failed with {result['errors_count']} errors and {result['warnings_count']} warnings.")
-
-    return result
+import os
+import re
+import sys
+import shutil
+import signal
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+try:
+    import resource   # POSIX only
+except ImportError:
+    resource = None
+from src.logger import get_logger
+from src.profiling import span
+from src.diagnostics import parse_diagnostics, summarize
+from src.header_sets import DEFAULT_HEADER_SET, ensure_header_set, header_set_dir, header_set_label
+
+logger = get_logger(__name__)
+
+COMPILER_VERSION = "7"  # bump when flags or result fields change
+
+# If you installed gcc in WSL, call via `wsl` and convert paths
+USE_WSL = os.name == "nt"
+
+DEFAULT_TIMEOUT = 30.0       # seconds of wall-clock per gcc run
+DEFAULT_MEMORY_LIMIT_MB = 1024
+
+# gcc >= 9 can emit diagnostics as JSON; set False for older compilers (text is parsed instead)
+JSON_DIAGNOSTICS = True
+MAX_REPORTED_DIAGNOSTICS = 200
+WARNING_FLAGS = ["-Wall", "-Wextra"]
+# Put the header set's precompiled headers on the include path when it has any
+USE_PCH = True
+
+def _to_wsl_path(win_path: str) -> str:
+    from pathlib import Path   # only needed on Windows; pathlib is slow to import
+    p = Path(win_path).resolve()
+    drive = p.drive.replace(":", "").lower()
+    parts = "/".join(p.parts[1:])  # drop drive letter
+    return f"/mnt/{drive}/{parts}".replace("\\", "/")
+
+def _gcc_path(path: str) -> str:
+    return _to_wsl_path(path) if USE_WSL else os.path.abspath(path)
+
+def gcc_command(flags: List[str], include_dir: str, file_path: str,
+                path_options: Sequence[Tuple[str, str]] = ()) -> List[str]:
+    """
+    gcc argv; `path_options` are (flag, path) pairs whose paths need WSL
+    conversion too. They come before `include_dir`, so an ("-I", dir) option
+    is searched first.
+    """
+    # Paths for both Windows and WSL
+    include_dir = os.path.abspath(include_dir)
+    options = [x for flag, path in path_options for x in (flag, _gcc_path(path))]
+    if USE_WSL:
+        wsl_file = _to_wsl_path(file_path)
+        wsl_inc  = _to_wsl_path(include_dir)
+        return ["wsl", "gcc", *flags, *options, "-I", wsl_inc, wsl_file]
+    return ["gcc", *flags, *options, "-I", include_dir, file_path]
+
+def _build_command(file_path: str, header_set: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Returns (argv, pch_dir) for syntax-checking `file_path` against
+    `header_set`. gcc only takes a precompiled header in place of the file's
+    own first #include, so the verdict is the same either way.
+    """
+    flags = [*WARNING_FLAGS, "-fsyntax-only"]
+    if JSON_DIAGNOSTICS:
+        flags.append("-fdiagnostics-format=json")
+    pch_dir = None
+    if USE_PCH:
+        stamp = ensure_header_set(header_set)
+        pch_dir = stamp["pch_dir"] if stamp["pch"] and os.path.isdir(stamp["pch_dir"]) else None
+    path_options = [("-I", pch_dir)] if pch_dir else []
+    return gcc_command(flags, header_set_dir(header_set), file_path, path_options), pch_dir
+
+def _unalias(stderr: str, pch_dir: Optional[str], header_set: str) -> str:
+    """Diagnostics in a header copy next to its .gch name the set's own header instead."""
+    if not pch_dir:
+        return stderr
+    return stderr.replace(_gcc_path(pch_dir) + "/", _gcc_path(header_set_dir(header_set)) + "/")
+
+def _log_path(file_path: str, log_dir: Optional[str]) -> Optional[str]:
+    if not log_dir:
+        return None
+    os.makedirs(log_dir, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(log_dir, f"{base}_compile_{ts}.log")
+
+def _write_log(result: dict, text: str) -> None:
+    if result["log_file"]:
+        with open(result["log_file"], "w", encoding="utf-8", errors="ignore") as f:
+            f.write(text)
+
+# The cap is in place before gcc execs, without running Python in a forked
+# child (preexec_fn can deadlock when the evaluation's checker threads hold
+# locks at fork time): `prlimit` (util-linux) when it is on PATH, otherwise a
+# fresh interpreter that sets the limit and execs gcc in its place.
+PRLIMIT = shutil.which("prlimit")
+_SETRLIMIT_EXEC = ("import os, sys, resource; n = int(sys.argv[1]); "
+                   "resource.setrlimit(resource.RLIMIT_AS, (n, n)); os.execvp(sys.argv[2], sys.argv[2:])")
+
+# What cc1 prints when an allocation fails under RLIMIT_AS
+_OOM_MARKERS = ("out of memory allocating", "virtual memory exhausted", "cannot allocate memory")
+# How a crash is reported: by the driver when a program it ran died ("Killed signal
+# terminated program cc1"), by cc1 when it caught the signal itself, or by an ICE
+_KILLED_RX = re.compile(r"([A-Z][A-Za-z ]*?) signal terminated program")
+_ICE_RX = re.compile(r"internal compiler error: ([^\n\"]*)")
+_SIGNALS_BY_TEXT = {(signal.strsignal(s) or "").lower(): s for s in signal.valid_signals()}
+# Signals a process dies of when an allocation or stack growth fails under RLIMIT_AS
+_LIMIT_SIGNALS = {getattr(signal, "SIGKILL", None), signal.SIGSEGV} - {None}
+# A job whose peak RSS reached this share of its address-space cap ran into it:
+# cc1 stopped by the cap peaks at 55-85% of it in RSS
+LIMIT_HIT_FRACTION = 0.5
+
+def _memory_limit_bytes(memory_limit_mb: Optional[int]) -> Optional[int]:
+    if not memory_limit_mb or os.name != "posix" or USE_WSL:
+        return None
+    return memory_limit_mb * 1024 * 1024
+
+def _limited(cmd: List[str], limit: Optional[int]) -> List[str]:
+    """
+    argv that runs `cmd` capped at `limit` bytes of address space. A gcc
+    that is not on PATH is left unwrapped, so spawning it still raises
+    FileNotFoundError (status "error").
+    """
+    if limit is None or shutil.which(cmd[0]) is None:
+        return cmd
+    if PRLIMIT:
+        return [PRLIMIT, f"--as={limit}", "--", *cmd]
+    return [sys.executable, "-I", "-S", "-c", _SETRLIMIT_EXEC, str(limit), *cmd]
+
+def _children_peak_kb() -> int:
+    """Largest peak RSS of any reaped child process so far (0 where unsupported)."""
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss if resource is not None else 0
+
+def _limit_hit(limit: Optional[int], peak_before_kb: int) -> bool:
+    """This job (it raised the children's peak) came close enough to `limit` to have run into it."""
+    peak_kb = _children_peak_kb()
+    return limit is not None and peak_kb > peak_before_kb and peak_kb * 1024 >= limit * LIMIT_HIT_FRACTION
+
+def _crash_signal(stderr: str, returncode: int) -> Optional[int]:
+    """Signal that killed gcc or a program it ran (0 for an ICE without one); None when nothing crashed."""
+    if returncode < 0:
+        return -returncode
+    m = _KILLED_RX.search(stderr) or _ICE_RX.search(stderr)
+    return _SIGNALS_BY_TEXT.get(m.group(1).strip().lower(), 0) if m else None
+
+def _out_of_memory(stderr: str, returncode: int, limit_hit: bool) -> bool:
+    """
+    gcc (or cc1 under it) ran out of its address-space cap: it said so, or
+    it died of SIGKILL/SIGSEGV after its memory use reached the cap.
+    """
+    text = stderr.lower()
+    if any(m in text for m in _OOM_MARKERS):
+        return True
+    return limit_hit and _crash_signal(stderr, returncode) in _LIMIT_SIGNALS
+
+def _new_result(log_file: Optional[str], header_set: str, use_pch: bool) -> dict:
+    # status: ok | failed | timeout | memory_limit | skipped | error
+    return {
+        "success": False, "status": "error",
+        "header_set": header_set_label(header_set), "pch": use_pch,
+        "warnings_count": 0, "errors_count": 0, "notes_count": 0,
+        "counts": {"by_severity": {}, "by_option": {}},
+        "diagnostics": [],
+        "log_file": log_file,
+    }
+
+def _finish(result: dict, stdout: str, stderr: str, returncode: int, limit: Optional[int] = None,
+            limit_hit: bool = False) -> dict:
+    _write_log(result, stdout + stderr)
+    if returncode != 0 and limit is not None and _out_of_memory(stderr, returncode, limit_hit):
+        return _memory_exceeded(result, limit)
+    sig = _crash_signal(stderr, returncode) if returncode != 0 else None
+    if sig is not None:
+        return _crashed(result, sig)
+
+    # gcc writes diagnostics to stderr; parse them straight from the pipe
+    diags = parse_diagnostics(stderr)
+    counts = summarize(diags)
+    result["warnings_count"] = counts["by_severity"].get("warning", 0)
+    result["errors_count"]   = counts["by_severity"].get("error", 0)
+    result["notes_count"]    = counts["by_severity"].get("note", 0)
+    result["counts"] = counts
+    result["diagnostics"] = [d._asdict() for d in diags[:MAX_REPORTED_DIAGNOSTICS]]
+    result["success"] = (returncode == 0)
+    result["status"] = "ok" if result["success"] else "failed"
+
+    if result["success"]:
+        logger.info(f"✅ Compilation successful with {result['warnings_count']} warnings.")
+    else:
+        logger.warning(f"⚠️ Compilation failed with {result['errors_count']} errors and {result['warnings_count']} warnings.")
+    return result
+
+def _timed_out(result: dict, file_path: str, timeout: float) -> dict:
+    logger.error(f"Compilation of {file_path} timed out after {timeout}s")
+    _write_log(result, f"timeout: gcc exceeded {timeout}s\n")
+    result["status"] = "timeout"
+    return result
+
+def _memory_exceeded(result: dict, limit: int) -> dict:
+    logger.error(f"gcc exceeded its {limit // (1024 * 1024)} MB memory limit")
+    result["status"] = "memory_limit"
+    return result
+
+def _crashed(result: dict, sig: int) -> dict:
+    # a gcc bug or a signal from outside, not a verdict on the source
+    reason = f"gcc killed by {signal.Signals(sig).name}" if sig else "internal compiler error"
+    logger.error(f"Compilation crashed: {reason}")
+    result["status"] = "error"
+    result["reason"] = reason
+    return result
+
+def skipped_result(reason: str, header_set: str = DEFAULT_HEADER_SET) -> dict:
+    """A compilation block for a file gcc was never run on (status "skipped")."""
+    result = _new_result(None, header_set, False)
+    result["status"] = "skipped"
+    result["reason"] = reason
+    return result
+
+def _not_found(result: dict, e: Exception) -> dict:
+    logger.error(f"gcc not found: {e}")
+    _write_log(result, f"error: gcc not found: {e}\n")
+    result["errors_count"] = 1
+    return result
+
+def compile_code(file_path: str, timeout: float = DEFAULT_TIMEOUT,
+                 memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB,
+                 log_dir: Optional[str] = None, header_set: str = DEFAULT_HEADER_SET) -> dict:
+    """
+    Syntax-checks one file against a mock header set. Diagnostics are parsed
+    from gcc's stderr into typed records; the raw output is only written to
+    disk when `log_dir` is set. Blocking form of CompileService.compile.
+    """
+    service = CompileService(concurrency=1, timeout=timeout, memory_limit_mb=memory_limit_mb,
+                             log_dir=log_dir, header_set=header_set)
+    return asyncio.run(service.compile(file_path))
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    """Kills gcc with everything it started (cc1 and as hold its pipes) and reaps it."""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)   # gcc leads its own process group
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+    await proc.wait()
+
+
+class CompileService:
+    """
+    Runs gcc syntax checks on the asyncio loop, at most `concurrency` at a time.
+    Each job gets its own wall-clock timeout and address-space limit; a job
+    that overruns is killed and reported with status "timeout", one that runs
+    out of memory with status "memory_limit".
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT,
+                 memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB, log_dir: Optional[str] = None,
+                 header_set: str = DEFAULT_HEADER_SET):
+        self.concurrency = concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.log_dir = log_dir
+        self.header_set = header_set
+        self._sem = None
+        self._loop = None
+
+    def __getstate__(self):
+        # Semaphores belong to one event loop; workers build their own.
+        state = self.__dict__.copy()
+        state["_sem"] = state["_loop"] = None
+        return state
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._sem = loop, asyncio.Semaphore(self.concurrency)
+        return self._sem
+
+    async def compile(self, file_path: str) -> dict:
+        async with self._semaphore():
+            return await self._run(file_path)
+
+    async def skip(self, file_path: str, reason: str) -> dict:
+        """Stands in for compile() when `file_path` must not reach gcc."""
+        logger.warning(f"Not compiling {file_path}: {reason}")
+        return skipped_result(reason, self.header_set)
+
+    async def compile_many(self, file_paths: List[str]) -> List[dict]:
+        return list(await asyncio.gather(*(self.compile(p) for p in file_paths)))
+
+    async def _run(self, file_path: str) -> dict:
+        with span("command"):
+            cmd, pch_dir = _build_command(file_path, self.header_set)
+        result = _new_result(_log_path(file_path, self.log_dir), self.header_set, pch_dir is not None)
+
+        logger.info(f"Compiling {file_path} using gcc...")
+        logger.debug(f"Command: {' '.join(cmd)}")
+
+        limit = _memory_limit_bytes(self.memory_limit_mb)
+        cmd = _limited(cmd, limit)
+        peak_before_kb = _children_peak_kb()
+        try:
+            # a session of its own, so a kill reaches cc1 and as too
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                start_new_session=os.name == "posix",
+            )
+        except FileNotFoundError as e:
+            return _not_found(result, e)
+
+        try:
+            with span("gcc", children=True):
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            await _kill(proc)
+            return _timed_out(result, file_path, self.timeout)
+        except asyncio.CancelledError:
+            # e.g. a speculative evaluation superseded by a newer one; don't leave gcc running
+            await _kill(proc)
+            raise
+
+        with span("parse"):
+            stderr = _unalias(stderr.decode("utf-8", errors="ignore"), pch_dir, self.header_set)
+            return _finish(result, stdout.decode("utf-8", errors="ignore"), stderr, proc.returncode, limit,
+                           _limit_hit(limit, peak_before_kb))
@@ -0,0 +1,145 @@
+import re
+import hashlib
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+from src.logger import get_logger
+from src.evaluation.c_lexer import tokenize
+from src.evaluation.source_unit import decode_source, read_source
+
+logger = get_logger(__name__)
+
+SHINGLE_SIZE = 3          # tokens per shingle; short, since drivers are only a few hundred tokens
+SIMHASH_BITS = 64
+# Near-duplicate if SimHashes differ in at most this many bits. Splitting the
+# hash into MAX_DISTANCE + 1 bands guarantees such pairs share one band exactly.
+MAX_DISTANCE = 7
+BANDS = MAX_DISTANCE + 1
+BAND_BITS = SIMHASH_BITS // BANDS
+
+
+class DedupEntry(NamedTuple):
+    path: str
+    exact_hash: str             # hash of the normalized token stream
+    simhash: int
+    duplicate_of: Optional[str] # first ingested file with the same normalized tokens
+
+
+def normalized_tokens(text: str) -> List[str]:
+    """Token texts with comments, whitespace and in-directive spacing removed."""
+    return [
+        re.sub(r"\s+", " ", t.text).strip() if t.kind == "directive" else t.text
+        for t in tokenize(text)
+    ]
+
+
+def _hash64(data: str) -> int:
+    return int.from_bytes(hashlib.blake2b(data.encode(), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: List[str], k: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over k-token shingles, weighted by shingle frequency."""
+    if len(tokens) < k:
+        shingles = Counter([" ".join(tokens)])
+    else:
+        shingles = Counter(" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1))
+    votes = [0] * SIMHASH_BITS
+    for shingle, weight in shingles.items():
+        h = _hash64(shingle)
+        for bit in range(SIMHASH_BITS):
+            votes[bit] += weight if (h >> bit) & 1 else -weight
+    return sum(1 << bit for bit, v in enumerate(votes) if v > 0)
+
+
+def _bands(h: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [(h >> (b * BAND_BITS)) & mask for b in range(BANDS)]
+
+
+class DedupIndex:
+    """
+    Clusters files as they are added. Exact duplicates (same normalized token
+    stream) point at the first file seen; near-duplicates (SimHash within
+    MAX_DISTANCE bits) are merged into one cluster through band buckets.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, DedupEntry] = {}
+        self._exact: Dict[str, str] = {}
+        self._buckets: Dict[tuple, List[str]] = {}
+        self._parent: Dict[str, str] = {}
+
+    def _find(self, path: str) -> str:
+        root = path
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[path] != root:   # path compression
+            self._parent[path], path = root, self._parent[path]
+        return root
+
+    def _union(self, a: str, b: str) -> None:
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[rb] = ra
+
+    def add(self, path: str, text: str) -> None:
+        if path in self.entries:
+            return
+        tokens = normalized_tokens(text)
+        exact = hashlib.sha256("\0".join(tokens).encode()).hexdigest()
+        h = simhash(tokens)
+        self._parent[path] = path
+        duplicate_of = self._exact.get(exact)
+        if duplicate_of is None:
+            self._exact[exact] = path
+        else:
+            self._union(duplicate_of, path)
+
+        for band, value in enumerate(_bands(h)):
+            bucket = self._buckets.setdefault((band, value), [])
+            for other in bucket:
+                if bin(h ^ self.entries[other].simhash).count("1") <= MAX_DISTANCE:
+                    self._union(other, path)
+            bucket.append(path)
+        self.entries[path] = DedupEntry(path, exact, h, duplicate_of)
+
+    def duplicate_of(self, path: str) -> Optional[str]:
+        entry = self.entries.get(path)
+        return entry.duplicate_of if entry else None
+
+    def clusters(self) -> List[List[str]]:
+        """Groups of two or more near-duplicate files, in insertion order."""
+        groups: Dict[str, List[str]] = {}
+        for path in self.entries:
+            groups.setdefault(self._find(path), []).append(path)
+        return [g for g in groups.values() if len(g) > 1]
+
+    def cluster_ids(self) -> Dict[str, int]:
+        """Cluster id per file, numbered in insertion order; singletons get their own id."""
+        ids: Dict[str, int] = {}
+        roots: Dict[str, int] = {}
+        for path in self.entries:
+            ids[path] = roots.setdefault(self._find(path), len(roots))
+        return ids
+
+
+def build_index(paths: List[str]) -> DedupIndex:
+    """
+    Reads and indexes `paths` in order; unreadable files are logged and left
+    out, and so are files over the analysis cap, which only a prefix of would
+    be compared.
+    """
+    index = DedupIndex()
+    for path in paths:
+        try:
+            data, size = read_source(path)
+            if len(data) < size:
+                logger.info(f"Dedup skipped {path}: {size} bytes is over the analysis cap")
+                continue
+            index.add(path, decode_source(data))
+        except Exception as e:
+            logger.error(f"Dedup skipped {path}: {e}")
+    exact = sum(1 for e in index.entries.values() if e.duplicate_of)
+    logger.info(f"Dedup: {len(index.entries)} file(s), {exact} exact duplicate(s), "
+                f"{len(index.clusters())} near-duplicate cluster(s)")
+    return index
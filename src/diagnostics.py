@@ -0,0 +1,79 @@
+import re
+import json
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+# gcc's plain-text format: file:line:col: severity: message [-Woption]
+TEXT_DIAGNOSTIC_RX = re.compile(
+    r"^(?P<file>[^:\n]+):(?P<line>\d+):(?P<column>\d+): "
+    r"(?P<severity>fatal error|error|warning|note): "
+    r"(?P<message>.*?)(?: \[(?P<option>-W[^\]]+)\])?$",
+    re.M,
+)
+
+
+class Diagnostic(NamedTuple):
+    file: Optional[str]
+    line: Optional[int]
+    column: Optional[int]
+    severity: str
+    option: Optional[str]
+    message: str
+
+
+def _from_json_item(item: Dict) -> Diagnostic:
+    caret = (item.get("locations") or [{}])[0].get("caret", {})
+    return Diagnostic(
+        file=caret.get("file"),
+        line=caret.get("line"),
+        column=caret.get("column"),
+        severity=item.get("kind", "error"),
+        option=item.get("option"),
+        message=item.get("message", ""),
+    )
+
+
+def parse_json_diagnostics(text: str) -> List[Diagnostic]:
+    """Parses `-fdiagnostics-format=json` output; child notes are flattened after their parent."""
+    diags = []
+    stack = list(reversed(json.loads(text)))
+    while stack:
+        item = stack.pop()
+        diags.append(_from_json_item(item))
+        stack.extend(reversed(item.get("children", [])))
+    return diags
+
+
+def parse_text_diagnostics(text: str) -> List[Diagnostic]:
+    return [
+        Diagnostic(
+            file=m.group("file"),
+            line=int(m.group("line")),
+            column=int(m.group("column")),
+            severity=m.group("severity"),
+            option=m.group("option"),
+            message=m.group("message"),
+        )
+        for m in TEXT_DIAGNOSTIC_RX.finditer(text)
+    ]
+
+
+def parse_diagnostics(text: str) -> List[Diagnostic]:
+    """JSON when gcc produced it, otherwise the classic text format."""
+    stripped = text.strip()
+    if stripped.startswith("["):
+        try:
+            return parse_json_diagnostics(stripped)
+        except (ValueError, AttributeError):
+            pass
+    return parse_text_diagnostics(text)
+
+
+def summarize(diags: List[Diagnostic]) -> Dict:
+    """Counts per severity and per -W option (options only counted for warnings/errors)."""
+    by_severity = Counter("error" if d.severity == "fatal error" else d.severity for d in diags)
+    by_option = Counter(d.option for d in diags if d.option and d.severity != "note")
+    return {
+        "by_severity": dict(by_severity),
+        "by_option": dict(by_option.most_common()),
+    }
@@ -1,13 +1,18 @@
 from typing import Dict
-from src.logger import logger
-from src.utils import read_text
+from src.logger import get_logger
+from src.evaluation.source_unit import SourceUnit
 
-def check_advanced_features(file_path: str) -> Dict:
+logger = get_logger(__name__)
+
+CHECKER_VERSION = "2"  # bump when the heuristics change
+
+
+def check_advanced_features(unit: SourceUnit) -> Dict:
     """
     Checks for device tree, power management, debugging hooks.
     Returns presence metrics in 0..1.
     """
-    logger.info(f" Advanced features check: {file_path}")
+    logger.info(f" Advanced features check: {unit.path}")
     res = {
         "metrics": {
             "device_tree": 0.0,
@@ -17,12 +22,12 @@ def check_advanced_features(file_path: str) -> Dict:
         "findings": {}
     }
     try:
-        code = read_text(file_path)
-        if "of_match_table" in code:
+        hits = unit.hits
+        if hits.contains("of_match_table"):
             res["metrics"]["device_tree"] = 1.0
-        if "suspend" in code and "resume" in code:
+        if hits.contains("suspend") and hits.contains("resume"):
             res["metrics"]["power_management"] = 1.0
-        if ("dev_dbg" in code) or ("debugfs" in code) or ("proc_create" in code):
+        if hits.contains("dev_dbg") or hits.contains("debugfs") or hits.contains("proc_create"):
             res["metrics"]["debug_support"] = 1.0
         return res
     except Exception as e:
@@ -0,0 +1,138 @@
+import re
+from bisect import bisect_right
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# One alternation, tried left to right at each offset; a single finditer pass
+# tokenizes the file. Whitespace only eats up to one newline so that a
+# preprocessor directive is always seen at the start of its line.
+_TOKEN_RX = re.compile(
+    r"(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))"
+    r"|(?P<directive>^[ \t]*\#(?:\\\r?\n|[^\n])*)"
+    r"|(?P<ws>[ \t\r\f\v]*\n|[ \t\r\f\v]+)"
+    r"|(?P<ident>[A-Za-z_]\w*)"
+    r"|(?P<number>\.?\d(?:[eEpP][+-]|[\w.])*)"
+    r"|(?P<string>\"(?:\\.|[^\"\\\n])*\"?)"
+    r"|(?P<char>'(?:\\.|[^'\\\n])*'?)"
+    r"|(?P<punct>->|\+\+|--|<<=?|>>=?|[<>!=]=|&&|\|\||[-+*/%&|^]=|\.\.\.|\#\#|[^\s\w])",
+    re.S | re.M,
+)
+
+_SKIP = {"comment", "ws"}
+
+# Identifiers that can precede `(` ... `)` `{` without naming a function
+_NOT_FUNCTIONS = {"if", "for", "while", "switch", "return", "sizeof", "do", "else"}
+
+
+class Token(NamedTuple):
+    kind: str    # ident | number | string | char | punct | directive
+    text: str
+    start: int   # character offset in the source
+
+
+class FunctionSpan(NamedTuple):
+    name: str
+    start: int        # offset of the first token of the definition (return type, qualifiers)
+    body_start: int   # offset of the opening `{`
+    end: int          # offset just past the closing `}` (end of text if unterminated)
+    start_token: int
+    end_token: int    # index just past the closing `}`
+    start_line: int
+    end_line: int
+
+
+def tokenize(text: str) -> List[Token]:
+    """C tokens of `text` with comments and whitespace dropped. Linear in the input."""
+    return [
+        Token(m.lastgroup, m.group(), m.start())
+        for m in _TOKEN_RX.finditer(text)
+        if m.lastgroup not in _SKIP
+    ]
+
+
+def find_functions(tokens: List[Token], text_len: int,
+                   line_of: Callable[[int], int]) -> List[FunctionSpan]:
+    """
+    Function definitions at file scope: `name ( ... ) {` with balanced braces.
+    One pass over the tokens; declarations, initializers and macros are skipped.
+    """
+    functions: List[FunctionSpan] = []
+    depth = 0
+    decl_start = 0            # first token after the last `;`, `}` or directive at file scope
+    open_parens: List[int] = []
+    paren_of: Dict[int, int] = {}   # `)` index -> matching `(` index, file scope only
+    current = None            # (name, start_token, body_token)
+
+    for i, tok in enumerate(tokens):
+        if tok.kind == "directive":
+            if depth == 0:
+                decl_start = i + 1
+            continue
+        text = tok.text
+        if depth == 0:
+            if text == "(":
+                open_parens.append(i)
+            elif text == ")" and open_parens:
+                paren_of[i] = open_parens.pop()
+            elif text == ";":
+                decl_start, open_parens = i + 1, []
+            elif text == "{":
+                opener = paren_of.get(i - 1)
+                if opener is not None and opener > 0:
+                    name_tok = tokens[opener - 1]
+                    if name_tok.kind == "ident" and name_tok.text not in _NOT_FUNCTIONS:
+                        current = (name_tok.text, min(decl_start, opener - 1), i)
+                depth = 1
+                continue
+            elif text == "}":
+                decl_start = i + 1
+        else:
+            if text == "{":
+                depth += 1
+            elif text == "}":
+                depth -= 1
+                if depth == 0:
+                    if current:
+                        functions.append(_span(tokens, current, i + 1, tokens[i].start + 1, line_of))
+                    current, decl_start, open_parens = None, i + 1, []
+
+    if current:  # body runs to end of file (truncated generation)
+        functions.append(_span(tokens, current, len(tokens), text_len, line_of))
+    return functions
+
+
+def _span(tokens: List[Token], current, end_token: int, end: int,
+          line_of: Callable[[int], int]) -> FunctionSpan:
+    name, start_token, body_token = current
+    start = tokens[start_token].start
+    return FunctionSpan(
+        name=name, start=start, body_start=tokens[body_token].start, end=end,
+        start_token=start_token, end_token=end_token,
+        start_line=line_of(start), end_line=line_of(max(start, end - 1)),
+    )
+
+
+class FunctionIndex:
+    """Function definitions of one file, ordered by offset, with offset lookup."""
+
+    def __init__(self, functions: List[FunctionSpan]):
+        self.functions = functions
+        self._starts = [f.start for f in functions]
+
+    def __iter__(self):
+        return iter(self.functions)
+
+    def __len__(self) -> int:
+        return len(self.functions)
+
+    def at(self, offset: int) -> Optional[FunctionSpan]:
+        """The function whose definition contains `offset`, if any."""
+        i = bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset < self.functions[i].end:
+            return self.functions[i]
+        return None
+
+    def named(self, name: str) -> Optional[FunctionSpan]:
+        for fn in self.functions:
+            if fn.name == name:
+                return fn
+        return None
@@ -1,17 +1,18 @@
-import re
 from typing import Dict
-from src.logger import logger
-from src.utils import read_text
+from src.logger import get_logger
+from src.evaluation.source_unit import SourceUnit
+from src.evaluation.rules import REQUIRED_FUNCS as REQ_FUNCS
 
-REQ_FUNCS = ["open", "read", "write", "release"]
-FILE_OPS_STRUCT_RX = r"struct\s+file_operations\s+[a-zA-Z_]\w*\s*=\s*\{"
+logger = get_logger(__name__)
 
+CHECKER_VERSION = "3"  # bump when the heuristics change
 
-def check_driver_apis(file_path: str) -> Dict:
+
+def check_driver_apis(unit: SourceUnit) -> Dict:
     """
     Returns normalized functionality metrics + findings.
     """
-    logger.info(f" Functionality check: {file_path}")
+    logger.info(f" Functionality check: {unit.path}")
     data = {
         "metrics": {
             "basic_operations": 0.0,
@@ -21,22 +22,24 @@ def check_driver_apis(file_path: str) -> Dict:
         },
         "findings": {
             "missing_functions": [],
-            "has_file_operations_struct": False
+            "has_file_operations_struct": False,
+            "function_definitions": 0
         }
     }
     try:
-        code = read_text(file_path)
+        hits = unit.hits
+        data["findings"]["function_definitions"] = len(unit.functions)
 
         missing = []
         for fn in REQ_FUNCS:
-            if not re.search(rf"\b{fn}\s*\(", code):
+            if not hits.has(f"func.{fn}"):
                 missing.append(fn)
         data["findings"]["missing_functions"] = missing
 
         base = 1.0 - (len(missing) / max(1, len(REQ_FUNCS)))
         data["metrics"]["basic_operations"] = round(max(0.0, base), 2)
 
-        has_file_ops = bool(re.search(FILE_OPS_STRUCT_RX, code))
+        has_file_ops = hits.has("struct.file_operations")
         data["findings"]["has_file_operations_struct"] = has_file_ops
         ki = base
         if not has_file_ops:
@@ -44,14 +47,14 @@ def check_driver_apis(file_path: str) -> Dict:
         data["metrics"]["kernel_integration"] = round(max(0.0, min(1.0, ki)), 2)
 
         eh = 0.5
-        if "copy_to_user" in code or "copy_from_user" in code:
+        if hits.contains("copy_to_user") or hits.contains("copy_from_user"):
             eh += 0.1
-        if "-EFAULT" in code or "-EINVAL" in code:
+        if hits.contains("-EFAULT") or hits.contains("-EINVAL"):
             eh += 0.1
         data["metrics"]["error_handling"] = round(min(1.0, eh), 2)
 
         ec = 0.5
-        if "min(" in code or "memmove(" in code:
+        if hits.contains("min(") or hits.contains("memmove("):
             ec += 0.1
         data["metrics"]["edge_cases"] = round(min(1.0, ec), 2)
 
@@ -1,35 +1,15 @@
-import re
 from typing import Dict
-from src.logger import logger
-from src.utils import read_text
-
-MAX_LINE_CHARS = 140
-MIN_COMMENT_DENSITY = 0.05  # 5%
+from src.logger import get_logger
+from src.evaluation.source_unit import SourceUnit
 
+logger = get_logger(__name__)
 
-def _comment_density(code: str) -> float:
-    lines = code.splitlines()
-    if not lines:
-        return 0.0
-    comment_lines, block = 0, False
-    for ln in lines:
-        s = ln.strip()
-        if s.startswith("//"):
-            comment_lines += 1
-        if "/*" in s:
-            block = True
-            comment_lines += 1
-        elif block:
-            comment_lines += 1
-        if "*/" in s:
-            block = False
-    return comment_lines / max(1, len(lines))
+CHECKER_VERSION = "2"  # bump when the heuristics change
+MIN_COMMENT_DENSITY = 0.05  # 5%
 
-def _long_line_count(code: str) -> int:
-    return sum(1 for ln in code.splitlines() if len(ln) > MAX_LINE_CHARS)
 
-def check_code_quality(file_path: str) -> Dict:
-    logger.info(f" Code quality check: {file_path}")
+def check_code_quality(unit: SourceUnit) -> Dict:
+    logger.info(f" Code quality check: {unit.path}")
     res = {
         "metrics": {
             "style_compliance": 1.0,
@@ -42,22 +22,19 @@ def check_code_quality(file_path: str) -> Dict:
         }
     }
     try:
-        code = read_text(file_path)
-        long_lines = _long_line_count(code)
+        long_lines = len(unit.long_lines)
         res["findings"]["long_line_warnings"] = long_lines
         if long_lines > 0:
             res["metrics"]["style_compliance"] -= 0.1
 
-        has_tabs = "\t" in code
-        has_indented_spaces = bool(re.search(r"^\s{2,}\S", code, re.M))
-        res["findings"]["mixed_tabs_spaces"] = has_tabs and has_indented_spaces
+        res["findings"]["mixed_tabs_spaces"] = unit.has_tabs and unit.has_space_indent
         if res["findings"]["mixed_tabs_spaces"]:
             res["metrics"]["style_compliance"] -= 0.05
 
-        density = _comment_density(code)
+        density = unit.comment_density
         res["metrics"]["documentation"] = 1.0 if density >= MIN_COMMENT_DENSITY else 0.6
 
-        if "goto" in code:
+        if unit.hits.contains("goto"):
             res["metrics"]["maintainability"] -= 0.1
 
         res["metrics"]["style_compliance"] = max(0.0, res["metrics"]["style_compliance"])
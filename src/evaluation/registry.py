@@ -0,0 +1,59 @@
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from src.evaluation import (
+    adv_feature, functionality_checker, quality_check, security_check, static_analyzer, static_linter
+)
+
+# Inputs a checker can declare besides other checkers' output keys:
+#   SourceUnit facets are computed once per file before any checker that needs them;
+#   "compilation" is the gcc result (diagnostics included) for the same file.
+FACETS: Dict[str, Tuple[str, ...]] = {
+    "text": (),
+    "code": (),
+    "hits": ("code",),
+    "tokens": (),
+    "functions": ("tokens",),
+}
+COMPILATION = "compilation"
+
+
+class Checker(NamedTuple):
+    key: str                     # report key the result is stored under
+    func: Callable               # func(unit, **outputs of declared checker/compilation inputs)
+    inputs: Tuple[str, ...]
+    version: str
+
+
+_CHECKERS: Dict[str, Checker] = {}
+
+
+def register_checker(key: str, func: Callable, inputs: Tuple[str, ...] = ("text",),
+                     version: str = "1") -> Checker:
+    """
+    Adds (or replaces) the checker writing report[`key`]. Inputs are facet names,
+    "compilation", or keys of other checkers; the scheduler orders runs by them.
+    """
+    checker = Checker(key, func, tuple(inputs), version)
+    _CHECKERS[key] = checker
+    return checker
+
+
+def unregister_checker(key: str) -> None:
+    _CHECKERS.pop(key, None)
+
+
+def registered_checkers() -> List[Checker]:
+    """Checkers in registration order, which is also their order in reports."""
+    return list(_CHECKERS.values())
+
+
+# ---- Built-in checkers (steps 2-6 of the old pipeline plus the consolidated analyzer) ----
+register_checker("static_analysis", static_linter.lint_c_code, ("hits",), static_linter.CHECKER_VERSION)
+register_checker("functionality", functionality_checker.check_driver_apis, ("hits", "functions"),
+                 functionality_checker.CHECKER_VERSION)
+register_checker("security", security_check.scan_security_issues, ("hits", "functions"),
+                 security_check.CHECKER_VERSION)
+register_checker("code_quality", quality_check.check_code_quality, ("hits", "text"), quality_check.CHECKER_VERSION)
+register_checker("advanced_features", adv_feature.check_advanced_features, ("hits",), adv_feature.CHECKER_VERSION)
+register_checker("analysis", static_analyzer.analyze_code, ("hits", "functions", "text"),
+                 static_analyzer.CHECKER_VERSION)
@@ -0,0 +1,234 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Rule(NamedTuple):
+    name: str
+    pattern: str            # regex source, or the literal text for literal rules
+    literal: bool = False
+    anchor: Optional[str] = None   # literal every regex match starts with
+
+
+# ---- Declarative rule catalogue shared by every checker ----
+# Regex rules are named "<kind>.<what>"; literal rules are looked up by their
+# text through RuleHits.contains(), so checks still read like `"kfree" in code`.
+
+REQUIRED_FUNCS = ["open", "read", "write", "release"]
+FILE_OPS_STRUCT_RX = r"struct\s+file_operations\s+[a-zA-Z_]\w*\s*=\s*\{"
+
+REGEX_RULES: Dict[str, str] = {
+    **{f"func.{fn}": rf"\b{fn}\s*\(" for fn in REQUIRED_FUNCS},
+    "struct.file_operations": FILE_OPS_STRUCT_RX,
+    # unsafe / discouraged libc calls
+    "call.strcpy": r"\bstrcpy\s*\(",
+    "call.sprintf": r"\bsprintf\s*\(",
+    "call.gets": r"\bgets\s*\(",
+    "call.strcat": r"\bstrcat\s*\(",
+    "call.memcpy": r"\bmemcpy\s*\(",
+    # user copies and bounds
+    "call.copy_to_user": r"\bcopy_to_user\s*\(",
+    "call.copy_from_user": r"\bcopy_from_user\s*\(",
+    "call.min": r"\bmin\s*\(",
+    # locking
+    "call.DEFINE_MUTEX": r"\bDEFINE_MUTEX\s*\(",
+    "call.mutex_lock": r"\bmutex_lock\s*\(",
+    "call.mutex_unlock": r"\bmutex_unlock\s*\(",
+    "call.spin_lock": r"\bspin_lock\s*\(",
+    "call.spin_unlock": r"\bspin_unlock\s*\(",
+}
+
+LITERAL_RULES: List[str] = [
+    # includes
+    "<linux/module.h>", "<linux/fs.h>", "<linux/uaccess.h>", "<linux/cdev.h>", "<linux/init.h>",
+    # kernel macros
+    "THIS_MODULE", "module_init", "module_exit", "MODULE_LICENSE",
+    # types
+    "ssize_t", "loff_t", "size_t",
+    # macros that must not be redefined locally
+    "EIO", "EFAULT", "copy_to_user", "#define EIO", "#define EFAULT", "#define copy_to_user",
+    # error handling / bounds
+    "copy_from_user", "-EFAULT", "-EINVAL", "return -EFAULT", "return -EINVAL", "goto",
+    "min(", "memmove(", "BUFFER_SIZE", "count", "f_pos", "pos", "remaining",
+    "if (", "< 0", "> BUFFER_SIZE", "1024",
+    # memory / locking / irq
+    "kmalloc", "kzalloc", "KMALLOC", "kfree", "memset", "memcpy",
+    "mutex_lock", "mutex_unlock", "interrupt", "irq",
+    # advanced features
+    "of_match_table", "suspend", "resume", "dev_dbg", "debugfs", "proc_create",
+]
+
+# Named groups the checkers report on
+UNSAFE_CALLS = ["call.strcpy", "call.sprintf", "call.gets"]
+DISCOURAGED_CALLS = ["call.strcat", "call.memcpy"]
+USER_COPY_CALLS = ["call.copy_to_user", "call.copy_from_user"]
+MUTEX_CALLS = ["call.DEFINE_MUTEX", "call.mutex_lock", "call.mutex_unlock"]
+SPINLOCK_CALLS = ["call.spin_lock", "call.spin_unlock"]
+
+
+def literal_name(text: str) -> str:
+    return f"lit:{text}"
+
+
+# min() or a size/position name in the same function counts as a bounds check
+BOUNDS_CHECKS = ["call.min"] + [literal_name(t) for t in ("BUFFER_SIZE", "count", "f_pos", "pos", "remaining")]
+
+
+def _leading_literal(pattern: str) -> Optional[str]:
+    """
+    Identifier characters every match of `pattern` must start with, or None.
+    Only a leading \\b is skipped; top-level alternation disables anchoring.
+    """
+    depth, i = 0, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return None
+        i += 1
+
+    body = pattern[2:] if pattern.startswith(r"\b") else pattern
+    m = re.match(r"[A-Za-z0-9_]+", body)
+    if not m:
+        return None
+    anchor = m.group(0)
+    if body[len(anchor):len(anchor) + 1] in ("*", "?", "{"):
+        anchor = anchor[:-1]   # last char is optional
+    return anchor or None
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex matching any of `words`, factored by common prefix; greedy, so the longest wins."""
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class RuleHits:
+    """Start offsets of every rule hit in one source text."""
+
+    def __init__(self, positions: Dict[str, List[int]]):
+        self.positions = positions
+
+    def has(self, name: str) -> bool:
+        return name in self.positions
+
+    def count(self, name: str) -> int:
+        return len(self.positions.get(name, ()))
+
+    def contains(self, text: str) -> bool:
+        """Same answer as `text in code` for a registered literal."""
+        if literal_name(text) not in _RULES:
+            raise ValueError(f"Literal {text!r} is not registered in src/evaluation/rules.py")
+        return literal_name(text) in self.positions
+
+    def between(self, name: str, start: int, end: int) -> bool:
+        """True if `name` has a hit starting in [start, end)."""
+        pos = self.positions.get(name)
+        if not pos:
+            return False
+        i = bisect_left(pos, start)
+        return i < len(pos) and pos[i] < end
+
+
+class RuleEngine:
+    """
+    Compiles a rule set into one matcher. A single lookahead scan over a
+    prefix-factored alternation finds every literal and every regex anchor
+    (overlaps included, Aho-Corasick style); regex rules are then verified
+    only where their anchor occurs. Rules without an anchor fall back to
+    their own search and are logged, since each one costs a full scan.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self._by_literal: Dict[str, List[Tuple[str, Optional[Pattern]]]] = defaultdict(list)
+        self._unanchored: List[Tuple[str, Pattern]] = []
+        for rule in rules:
+            if rule.literal:
+                self._by_literal[rule.pattern].append((rule.name, None))
+            elif rule.anchor:
+                self._by_literal[rule.anchor].append((rule.name, re.compile(rule.pattern)))
+            else:
+                logger.warning(f"Rule {rule.name} has no literal anchor; it needs its own scan")
+                self._unanchored.append((rule.name, re.compile(rule.pattern)))
+
+        literals = sorted(self._by_literal, key=len, reverse=True)
+        # the scanner reports the longest literal at each offset; shorter ones
+        # starting at the same offset are exactly its registered prefixes
+        self._prefixes = {lit: [p for p in literals if lit.startswith(p)] for lit in literals}
+        self._scanner = re.compile(f"(?=({_trie_pattern(literals)}))", re.S) if literals else None
+
+    def scan(self, text: str) -> RuleHits:
+        positions: Dict[str, List[int]] = defaultdict(list)
+        if self._scanner is not None:
+            by_literal, prefixes = self._by_literal, self._prefixes
+            for m in self._scanner.finditer(text):
+                start = m.start()
+                for lit in prefixes[m.group(1)]:
+                    for name, check in by_literal[lit]:
+                        if check is None or check.match(text, start):
+                            positions[name].append(start)
+        for name, rx in self._unanchored:
+            for m in rx.finditer(text):
+                positions[name].append(m.start())
+        return RuleHits(dict(positions))
+
+
+_RULES: Dict[str, Rule] = {}
+_ENGINE: Optional[RuleEngine] = None
+
+
+def register_regex(name: str, pattern: str, anchor: Optional[str] = None) -> Rule:
+    global _ENGINE
+    rule = Rule(name, pattern, False, anchor or _leading_literal(pattern))
+    _RULES[name] = rule
+    _ENGINE = None
+    return rule
+
+
+def register_literal(text: str) -> Rule:
+    global _ENGINE
+    rule = Rule(literal_name(text), text, True)
+    _RULES[rule.name] = rule
+    _ENGINE = None
+    return rule
+
+
+def pattern_of(name: str) -> str:
+    return _RULES[name].pattern
+
+
+def default_engine() -> RuleEngine:
+    """Engine over every registered rule, compiled on first use and after registrations."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = RuleEngine(_RULES.values())
+    return _ENGINE
+
+
+for _name, _pattern in REGEX_RULES.items():
+    register_regex(_name, _pattern)
+for _text in LITERAL_RULES:
+    register_literal(_text)
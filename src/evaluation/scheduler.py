@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+import time
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.logger import get_logger, log_context
+from src.profiling import span, traced
+from src.evaluation.source_unit import SourceUnit
+from src.evaluation.registry import COMPILATION, FACETS, Checker, registered_checkers
+
+logger = get_logger(__name__)
+
+
+def build_graph(checkers: List[Checker], with_compilation: bool = True) -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    (node, dependencies) pairs in a valid run order: compilation first, the
+    facets the checkers need, then the checkers. Raises ValueError on an unknown input
+    or a dependency cycle.
+    """
+    deps: Dict[str, Tuple[str, ...]] = {COMPILATION: ()} if with_compilation else {}
+    by_key = {c.key: c for c in checkers}
+
+    def add_input(name: str) -> None:
+        if name in deps or name in by_key:
+            return
+        if name in FACETS:
+            deps[name] = FACETS[name]
+            for d in FACETS[name]:
+                add_input(d)
+        else:
+            raise ValueError(f"Checker input {name!r} is neither a facet, compilation nor a registered checker")
+
+    for c in checkers:
+        deps[c.key] = c.inputs
+        for name in c.inputs:
+            add_input(name)
+
+    # Kahn's algorithm; insertion order breaks ties so reports keep registration order
+    order, ready = [], [n for n, d in deps.items() if not d]
+    remaining = {n: set(d) for n, d in deps.items() if d}
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for n in [n for n, d in remaining.items() if node in d]:
+            remaining[n].discard(node)
+            if not remaining[n]:
+                del remaining[n]
+                ready.append(n)
+    if remaining:
+        raise ValueError(f"Checker dependency cycle among: {sorted(remaining)}")
+    return [(n, deps[n]) for n in order]
+
+
+async def run_checkers(unit: SourceUnit, compile_job: Optional[Callable[[], Awaitable[Dict]]] = None,
+                       checkers: Optional[List[Checker]] = None,
+                       sequential: bool = False) -> Tuple[Dict, Dict[str, float]]:
+    """
+    Runs every checker for one file as soon as its inputs are ready. Facets and
+    checkers run on the default thread pool, compilation on the loop, so
+    independent nodes overlap. With `sequential` (profiling), nodes run one at a
+    time on the loop thread, so cProfile sees them and each span's CPU and
+    memory are its own. Each node is a profiling span. Returns (results by report
+    key, wall seconds per node).
+    """
+    checkers = registered_checkers() if checkers is None else checkers
+    by_key = {c.key: c for c in checkers}
+    graph = build_graph(checkers, with_compilation=compile_job is not None)
+    loop = asyncio.get_running_loop()
+    tasks: Dict[str, asyncio.Task] = {}
+    timings: Dict[str, float] = {}
+
+    async def run_node(node: str, deps: Tuple[str, ...]):
+        inputs = await asyncio.gather(*(tasks[d] for d in deps))
+        start = time.perf_counter()
+        try:
+            with log_context(stage=node):
+                if node == COMPILATION:
+                    with span(node, children=True):
+                        return await compile_job()
+                if node in FACETS:
+                    job = partial(getattr, unit, node)
+                else:
+                    values = {d: v for d, v in zip(deps, inputs) if d == COMPILATION or d in by_key}
+                    job = partial(by_key[node].func, unit, **values)
+                if sequential:
+                    return traced(node, job)
+                # copy the task's context so the worker thread keeps file/stage and the span sink
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(None, context.run, traced, node, job)
+        except Exception as e:
+            logger.error(f"Checker {node} failed on {unit.path}: {e}")
+            return {}
+        finally:
+            timings[node] = round(time.perf_counter() - start, 4)
+            logger.debug(f"{node} finished in {timings[node]}s", extra={"stage": node, "duration_s": timings[node]})
+
+    for node, deps in graph:
+        tasks[node] = asyncio.ensure_future(run_node(node, deps))
+        if sequential:
+            await tasks[node]
+    await asyncio.gather(*tasks.values())
+
+    results = {}
+    if COMPILATION in tasks:
+        results[COMPILATION] = tasks[COMPILATION].result()
+    for c in checkers:
+        results[c.key] = tasks[c.key].result()
+    return results, {n: timings[n] for n, _ in graph}
@@ -1,15 +1,15 @@
-import re
 from typing import Dict
-from src.logger import logger
-from src.utils import read_text
+from src.logger import get_logger
+from src.evaluation.source_unit import SourceUnit
+from src.evaluation.rules import BOUNDS_CHECKS, UNSAFE_CALLS, USER_COPY_CALLS, MUTEX_CALLS, pattern_of
 
-UNSAFE_FUNCS = [r"\bstrcpy\s*\(", r"\bsprintf\s*\(", r"\bgets\s*\("]
-USER_COPY_FUNCS = [r"\bcopy_to_user\s*\(", r"\bcopy_from_user\s*\("]
-LOCK_FUNCS = [r"\bDEFINE_MUTEX\s*\(", r"\bmutex_lock\s*\(", r"\bmutex_unlock\s*\("]
+logger = get_logger(__name__)
 
+CHECKER_VERSION = "2"  # bump when the heuristics change
 
-def scan_security_issues(file_path: str) -> Dict:
-    logger.info(f" Security scan: {file_path}")
+
+def scan_security_issues(unit: SourceUnit) -> Dict:
+    logger.info(f" Security scan: {unit.path}")
     res = {
         "metrics": {
             "buffer_safety": 1.0,
@@ -24,27 +24,32 @@ def scan_security_issues(file_path: str) -> Dict:
         }
     }
     try:
-        code = read_text(file_path)
+        hits = unit.hits
 
-        unsafe = [p for p in UNSAFE_FUNCS if re.search(p, code)]
+        unsafe = [pattern_of(n) for n in UNSAFE_CALLS if hits.has(n)]
         res["findings"]["unsafe_calls"] = unsafe
         if unsafe:
             res["metrics"]["buffer_safety"] -= 0.3
 
-        user_copies = sum(1 for p in USER_COPY_FUNCS if re.search(p, code))
+        user_copies = sum(1 for n in USER_COPY_CALLS if hits.has(n))
         res["findings"]["user_copy_calls"] = user_copies
-        if user_copies > 0 and ("min(" in code or "BUFFER_SIZE" in code or "count" in code):
+        # a copy only counts as validated if its own function bounds the size
+        bounded = any(
+            unit.function_contains_any(fn, *USER_COPY_CALLS) and unit.function_contains_any(fn, *BOUNDS_CHECKS)
+            for fn in unit.functions
+        )
+        if user_copies > 0 and bounded:
             res["metrics"]["input_validation"] += 0.2
         res["metrics"]["input_validation"] = min(1.0, res["metrics"]["input_validation"])
 
-        uses_mutex = any(re.search(p, code) for p in LOCK_FUNCS)
+        uses_mutex = any(hits.has(n) for n in MUTEX_CALLS)
         res["findings"]["uses_mutex"] = uses_mutex
         if uses_mutex:
             res["metrics"]["race_conditions"] += 0.2
         res["metrics"]["race_conditions"] = min(1.0, res["metrics"]["race_conditions"])
 
-        if "kmalloc" in code or "kzalloc" in code:
-            if "kfree" in code:
+        if hits.contains("kmalloc") or hits.contains("kzalloc"):
+            if hits.contains("kfree"):
                 res["metrics"]["resource_management"] += 0.1
             else:
                 res["metrics"]["resource_management"] -= 0.2
@@ -0,0 +1,214 @@
+import os
+import re
+import mmap
+import contextlib
+from array import array
+from operator import sub
+from bisect import bisect_right
+from functools import cached_property
+from typing import Iterator, List, Optional, Tuple, Union
+from src.evaluation.c_lexer import FunctionIndex, FunctionSpan, Token, find_functions, tokenize
+
+MAX_LINE_CHARS = 140
+
+# Bytes of a file that are analyzed; the rest of a larger file is dropped, the
+# report marked truncated and the file not compiled. Analysis memory grows with the
+# analyzed size, mostly for the token list: about 40x it on driver-like code and up
+# to about 110x on input that is one token per byte, so at most ~220 MB per worker
+# at the default whatever the model emitted. Real drivers are far below it. 0
+# disables the cap (and with it the bound).
+DEFAULT_MAX_SOURCE_MB = 2
+
+# Comments and string/char literals, in the order the C preprocessor would see them.
+_COMMENT_OR_LITERAL_RX = re.compile(
+    r"//[^\n]*"
+    r"|/\*.*?(?:\*/|\Z)"
+    r"|\"(?:\\.|[^\"\\\n])*\"?"
+    r"|'(?:\\.|[^'\\\n])*'?",
+    re.S,
+)
+
+
+def _blank(match: "re.Match") -> str:
+    s = match.group(0)
+    if s[0] in "\"'":
+        # keep the quotes so `"..."` still reads as a literal, drop the contents
+        end = s[-1] if len(s) > 1 and s[-1] == s[0] else ""
+        body = s[1:len(s) - len(end)]
+        return s[0] + re.sub(r"[^\n]", " ", body) + end
+    return re.sub(r"[^\n]", " ", s)
+
+
+def strip_comments_and_strings(code: str) -> str:
+    """
+    Returns `code` with comment bodies and literal contents replaced by spaces.
+    Length and newlines are preserved, so offsets and line numbers stay valid.
+    """
+    return _COMMENT_OR_LITERAL_RX.sub(_blank, code)
+
+
+# Literal patterns only: the regex engine skips ahead to each occurrence instead of
+# trying a `^` anchor at every character.
+_NEWLINE_RX = re.compile(r"\n")
+_LINE_COMMENT_RX = re.compile(r"//")
+_BLOCK_OPEN_RX = re.compile(r"/\*")
+_BLOCK_CLOSE_RX = re.compile(r"\*/")
+
+
+def max_source_bytes() -> int:
+    """Analysis cap per file, from $EVAL_MAX_SOURCE_MB (set by --max-source-mb so batch workers inherit it)."""
+    return int(float(os.getenv("EVAL_MAX_SOURCE_MB", DEFAULT_MAX_SOURCE_MB)) * 1024 * 1024)
+
+
+@contextlib.contextmanager
+def map_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Read-only memory map of `path` (b"" for an empty file, which cannot be mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def source_prefix(data: Union[mmap.mmap, bytes], max_bytes: Optional[int] = None) -> bytes:
+    """
+    The part of `data` that is analyzed: all of it up to `max_bytes`, otherwise
+    the prefix ending at the last newline within the cap. Only this prefix is
+    copied out of a memory map.
+    """
+    max_bytes = max_source_bytes() if max_bytes is None else max_bytes
+    if not max_bytes or len(data) <= max_bytes:
+        return data[:]
+    cut = data.rfind(b"\n", 0, max_bytes)
+    return data[:cut + 1 if cut >= 0 else max_bytes]
+
+
+def read_source(path: str, max_bytes: Optional[int] = None) -> Tuple[bytes, int]:
+    """(analyzed prefix, size of the whole file) without reading past the cap."""
+    with map_file(path) as mapped:
+        return source_prefix(mapped, max_bytes), len(mapped)
+
+
+def decode_source(data: bytes) -> str:
+    return data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _line_lengths(text: str, offsets: array) -> Iterator[int]:
+    """Length of every line, from consecutive line offsets (newlines excluded)."""
+    ends = offsets[1:]
+    ends.append(len(text) + 1)
+    return (n - 1 for n in map(sub, ends, offsets))
+
+
+def _comment_density(text: str, offsets: array, line_of, line_count: int) -> float:
+    """
+    Share of lines that are `//` lines or inside `/* ... */`. Visits only the
+    comment markers; the lines between them are counted from line numbers, so
+    no list of lines is built.
+    """
+    if not line_count:
+        return 0.0
+    comment_lines = 0
+    for m in _LINE_COMMENT_RX.finditer(text):
+        start = offsets[line_of(m.start()) - 1]
+        if not text[start:m.start()].strip():
+            comment_lines += 1
+    opens = {line_of(m.start()) for m in _BLOCK_OPEN_RX.finditer(text)}
+    closes = {line_of(m.start()) for m in _BLOCK_CLOSE_RX.finditer(text)}
+    block, prev = False, 0
+    for line in sorted(opens | closes):
+        if block:
+            comment_lines += line - prev - 1
+        if line in opens:
+            block = True
+            comment_lines += 1
+        elif block:
+            comment_lines += 1
+        if line in closes:
+            block = False
+        prev = line
+    if block:
+        comment_lines += line_count - prev
+    return comment_lines / line_count
+
+
+class SourceUnit:
+    """
+    One driver source file, read once and shared by every checker.
+      - text: raw source (at most max_source_bytes() of it; see `truncated`)
+      - code: same offsets as `text`, with comments and literals blanked out
+      - line metrics: comment density, long lines, indentation style, all from
+        regex scans of `text` and the line-offset index
+      - tokens / functions: C token stream and function-definition index
+      - hits: every rule hit in `code`
+    """
+
+    def __init__(self, path: str, text: str, size: Optional[int] = None, truncated: bool = False):
+        self.path = path
+        self.text = text
+        # bytes of the file on disk; `text` holds only a prefix of them when truncated
+        self.size = len(text) if size is None else size
+        self.truncated = truncated
+        offsets = self.line_offsets
+        self.line_count = len(offsets) - (1 if text.endswith("\n") or not text else 0)
+
+        self.comment_density = _comment_density(text, offsets, self.line_of, self.line_count)
+        self.long_lines = [i for i, n in enumerate(_line_lengths(text, offsets), 1) if n > MAX_LINE_CHARS]
+        self.has_tabs = "\t" in text
+        self.has_space_indent = bool(re.search(r"^\s{2,}\S", text, re.M))
+
+    @classmethod
+    def from_path(cls, path: str, max_bytes: Optional[int] = None) -> "SourceUnit":
+        data, size = read_source(path, max_bytes)
+        return cls.from_bytes(path, data, size)
+
+    @classmethod
+    def from_bytes(cls, path: str, data: bytes, size: Optional[int] = None) -> "SourceUnit":
+        """
+        Same view as `from_path` for bytes already read (e.g. to hash them).
+        `size` is the whole file's when `data` is only its analyzed prefix.
+        """
+        return cls(path, decode_source(data), size, truncated=size is not None and size > len(data))
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """The lines of `text`; built only on request, the checkers use line_offsets."""
+        return self.text.splitlines()
+
+    @cached_property
+    def code(self) -> str:
+        return strip_comments_and_strings(self.text)
+
+    @cached_property
+    def hits(self):
+        """
+        Every rule in src/evaluation/rules.py, found in one scan of `code` and
+        shared by all checkers; comments and string contents never match.
+        """
+        from src.evaluation.rules import default_engine
+        return default_engine().scan(self.code)
+
+    @cached_property
+    def tokens(self) -> List[Token]:
+        return tokenize(self.text)
+
+    @cached_property
+    def functions(self) -> FunctionIndex:
+        return FunctionIndex(find_functions(self.tokens, len(self.text), self.line_of))
+
+    def function_contains(self, fn: FunctionSpan, *names: str) -> bool:
+        """True if every rule in `names` has a hit inside `fn`."""
+        return all(self.hits.between(n, fn.start, fn.end) for n in names)
+
+    def function_contains_any(self, fn: FunctionSpan, *names: str) -> bool:
+        return any(self.hits.between(n, fn.start, fn.end) for n in names)
+
+    @cached_property
+    def line_offsets(self) -> array:
+        """Start offset of every line in `text`/`code`, packed 8 bytes per line."""
+        return array("q", [0, *[m.end() for m in _NEWLINE_RX.finditer(self.text)]])
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number of a character offset."""
+        return bisect_right(self.line_offsets, offset)
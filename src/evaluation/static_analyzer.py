@@ -1,128 +1,80 @@
 # src/static_analyzer.py
-import re
 from typing import Dict, List
-from src.logger import logger
+from src.logger import get_logger
+from src.evaluation.source_unit import SourceUnit
+from src.evaluation.rules import (
+    DISCOURAGED_CALLS, MUTEX_CALLS, REQUIRED_FUNCS, SPINLOCK_CALLS, UNSAFE_CALLS, USER_COPY_CALLS,
+    BOUNDS_CHECKS, RuleHits, literal_name, pattern_of,
+)
 
-# ---- Heuristic rule sets ----
+logger = get_logger(__name__)
+
+CHECKER_VERSION = "1"  # bump when the heuristics change
+
+# ---- Heuristic rule sets (patterns live in src/evaluation/rules.py) ----
 REQUIRED_INCLUDES = [
     r"<linux/module.h>", r"<linux/fs.h>",
     r"<linux/uaccess.h>", r"<linux/cdev.h>"
 ]
 
-REQUIRED_FUNCS = ["open", "read", "write", "release"]
 REQUIRED_KERNEL_MACROS = ["THIS_MODULE", "module_init", "module_exit", "MODULE_LICENSE"]
 
-FILE_OPS_STRUCT_RX = r"struct\s+file_operations\s+[a-zA-Z_]\w*\s*=\s*\{"
-
-# Security patterns
-UNSAFE_FUNCS = [r"\bstrcpy\s*\(", r"\bsprintf\s*\(", r"\bgets\s*\("]
-DISCOURAGED_FUNCS = [r"\bstrcat\s*\(", r"\bmemcpy\s*\("]
-USER_COPY_FUNCS = [r"\bcopy_to_user\s*\(", r"\bcopy_from_user\s*\("]
-
-# Concurrency / locking
-MUTEX_USE = [r"\bDEFINE_MUTEX\s*\(", r"\bmutex_lock\s*\(", r"\bmutex_unlock\s*\("]
-SPINLOCK_USE = [r"\bspin_lock\s*\(", r"\bspin_unlock\s*\("]
-
 # Style / quality
-MAX_LINE_CHARS = 140
 MIN_COMMENT_DENSITY = 0.05  # 5% of lines as comments considered ok for a simple driver
 
 
-def _read(path: str) -> str:
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
-
-
-def _count_matches(code: str, patterns: List[str]) -> int:
-    return sum(1 for p in patterns if re.search(p, code))
-
+def _count_matches(hits: RuleHits, names: List[str]) -> int:
+    return sum(1 for n in names if hits.has(n))
 
-def _missing_items(code: str, items: List[str]) -> List[str]:
-    missing = []
-    for inc in items:
-        if inc.startswith("<") and inc not in code:
-            missing.append(inc)
-        elif inc in REQUIRED_KERNEL_MACROS and inc not in code:
-            missing.append(inc)
-    return missing
 
+def _missing_items(hits: RuleHits, items: List[str]) -> List[str]:
+    return [item for item in items if not hits.contains(item)]
 
-def _has_file_ops_struct(code: str) -> bool:
-    return bool(re.search(FILE_OPS_STRUCT_RX, code))
 
+def _has_required_functions(hits: RuleHits) -> List[str]:
+    return [fn for fn in REQUIRED_FUNCS if not hits.has(f"func.{fn}")]
 
-def _has_required_functions(code: str) -> List[str]:
-    missing = []
-    for fn in REQUIRED_FUNCS:
-        if not re.search(rf"\b{fn}\s*\(", code):
-            missing.append(fn)
-    return missing
 
-
-def _comment_density(code: str) -> float:
-    lines = code.splitlines()
-    if not lines:
-        return 0.0
-    comment_lines = 0
-    block = False
-    for ln in lines:
-        s = ln.strip()
-        if s.startswith("//"):
-            comment_lines += 1
-        if "/*" in s:
-            block = True
-            comment_lines += 1
-        elif block:
-            comment_lines += 1
-        if "*/" in s:
-            block = False
-    return comment_lines / max(1, len(lines))
+def _has_bounds_checks_near_user_copies(unit: SourceUnit) -> bool:
+    """
+    Very light heuristic:
+    If copy_to_user/copy_from_user appears and the same function also has a
+    min()/bounds-like expression or BUFFER_SIZE/count checks, reward it.
+    """
+    return any(
+        unit.function_contains_any(fn, *USER_COPY_CALLS) and unit.function_contains_any(fn, *BOUNDS_CHECKS)
+        for fn in unit.functions
+    )
 
 
-def _long_lines_warnings(code: str) -> int:
-    return sum(1 for ln in code.splitlines() if len(ln) > MAX_LINE_CHARS)
+def _any_function_contains(unit: SourceUnit, *names: str) -> bool:
+    return any(unit.function_contains(fn, *names) for fn in unit.functions)
 
 
-def _has_bounds_checks_near_user_copies(code: str) -> bool:
-    """
-    Very light heuristic:
-    If copy_to_user/copy_from_user appears and we see a min()/bounds-like expression
-    or BUFFER_SIZE/count checks in the same function or nearby lines, reward it.
-    """
-    # crude window around copy_* lines
-    lines = code.splitlines()
-    idxs = [i for i, ln in enumerate(lines) if re.search(r"copy_(to|from)_user\s*\(", ln)]
-    if not idxs:
-        return False
-    for i in idxs:
-        window = "\n".join(lines[max(0, i-6): i+6])
-        if re.search(r"\bmin\s*\(", window) or re.search(r"BUFFER_SIZE|count|f_pos|pos|remaining", window):
-            return True
-    return False
-
-
-def analyze_code(file_path: str) -> Dict:
+def analyze_code(unit: SourceUnit) -> Dict:
     """
     Returns a dict of:
       - findings (missing includes/functions/macros, unsafe calls, etc.)
       - normalized metrics buckets in keys: functionality, security, code_quality, performance, advanced
     """
-    logger.info(f"🔎 Static analysis of {file_path}")
-    code = _read(file_path)
+    logger.info(f"🔎 Static analysis of {unit.path}")
+    hits = unit.hits
+    has = hits.contains
 
-    missing_includes = _missing_items(code, REQUIRED_INCLUDES)
-    missing_macros = _missing_items(code, REQUIRED_KERNEL_MACROS)
-    missing_funcs = _has_required_functions(code)
-    has_file_ops = _has_file_ops_struct(code)
+    missing_includes = _missing_items(hits, REQUIRED_INCLUDES)
+    missing_macros = _missing_items(hits, REQUIRED_KERNEL_MACROS)
+    missing_funcs = _has_required_functions(hits)
+    has_file_ops = hits.has("struct.file_operations")
 
-    unsafe_found = [p for p in UNSAFE_FUNCS if re.search(p, code)]
-    discouraged_found = [p for p in DISCOURAGED_FUNCS if re.search(p, code)]
-    user_copy_calls = _count_matches(code, USER_COPY_FUNCS)
-    has_mutex = _count_matches(code, MUTEX_USE) > 0
-    has_spin = _count_matches(code, SPINLOCK_USE) > 0
+    unsafe_found = [pattern_of(n) for n in UNSAFE_CALLS if hits.has(n)]
+    discouraged_found = [pattern_of(n) for n in DISCOURAGED_CALLS if hits.has(n)]
+    user_copy_calls = _count_matches(hits, USER_COPY_CALLS)
+    has_mutex = _count_matches(hits, MUTEX_CALLS) > 0
+    has_spin = _count_matches(hits, SPINLOCK_CALLS) > 0
 
-    comment_ratio = _comment_density(code)
-    long_line_warns = _long_lines_warnings(code)
+    comment_ratio = unit.comment_density
+    long_line_warns = len(unit.long_lines)
+    bounds_checked = _has_bounds_checks_near_user_copies(unit)
 
     # ---- Normalize to 0..1 buckets ----
     # Functionality
@@ -133,14 +85,14 @@ def analyze_code(file_path: str) -> Dict:
     # Error handling heuristic: if copy_to/from_user exists and bounds heuristics are present => better
     error_handling = 0.5
     if user_copy_calls > 0:
-        error_handling = 0.7 if _has_bounds_checks_near_user_copies(code) else 0.4
-    if "return -EFAULT" in code or "return -EINVAL" in code or "goto" in code:
+        error_handling = 0.7 if bounds_checked else 0.4
+    if has("return -EFAULT") or has("return -EINVAL") or has("goto"):
         error_handling = min(1.0, error_handling + 0.1)
 
     edge_cases = 0.5
-    if "min(" in code or "memmove(" in code or "KMALLOC" in code or "kzalloc" in code:
+    if has("min(") or has("memmove(") or has("KMALLOC") or has("kzalloc"):
         edge_cases = 0.6
-    if "mutex_lock" in code and "mutex_unlock" in code:
+    if _any_function_contains(unit, "call.mutex_lock", "call.mutex_unlock"):
         edge_cases += 0.1
     edge_cases = min(edge_cases, 1.0)
 
@@ -154,22 +106,23 @@ def analyze_code(file_path: str) -> Dict:
     buffer_safety = 1.0
     if unsafe_found:
         buffer_safety -= 0.3
-    if not _has_bounds_checks_near_user_copies(code):
+    if not bounds_checked:
         buffer_safety -= 0.2
     buffer_safety = max(0.0, buffer_safety)
 
     race_conditions = 0.6
     if has_mutex or has_spin:
         race_conditions += 0.2
-    if "interrupt" in code or "irq" in code:
+    if has("interrupt") or has("irq"):
         # without locks in IRQ paths we'd penalize, but keep heuristic light
         race_conditions -= 0.1
     race_conditions = max(0.0, min(1.0, race_conditions))
 
     input_validation = 0.6
-    if "copy_from_user" in code and ("count" in code or "BUFFER_SIZE" in code):
+    if (_any_function_contains(unit, "call.copy_from_user", literal_name("count"))
+            or _any_function_contains(unit, "call.copy_from_user", literal_name("BUFFER_SIZE"))):
         input_validation += 0.2
-    if "if (" in code and ("< 0" in code or "> BUFFER_SIZE" in code):
+    if has("if (") and (has("< 0") or has("> BUFFER_SIZE")):
         input_validation += 0.1
     input_validation = max(0.0, min(1.0, input_validation))
 
@@ -189,9 +142,9 @@ def analyze_code(file_path: str) -> Dict:
 
     documentation = 1.0 if comment_ratio >= MIN_COMMENT_DENSITY else 0.6
     maintainability = 0.8
-    if "goto" in code:
+    if has("goto"):
         maintainability -= 0.1
-    if len(code) > 6000:
+    if len(unit.text) > 6000:
         maintainability -= 0.1
     maintainability = max(0.0, maintainability)
 
@@ -203,10 +156,10 @@ def analyze_code(file_path: str) -> Dict:
 
     # Performance (very light heuristics for a char driver)
     efficiency = 0.8
-    if "memset" in code or "memcpy" in code:
+    if has("memset") or has("memcpy"):
         efficiency -= 0.05
     scalability = 0.7  # neutral default for simple drivers
-    memory_usage = 0.9 if "BUFFER_SIZE" in code and "1024" in code else 0.8
+    memory_usage = 0.9 if has("BUFFER_SIZE") and has("1024") else 0.8
 
     performance = {
         "efficiency": round(max(0.0, efficiency), 2),
@@ -215,9 +168,9 @@ def analyze_code(file_path: str) -> Dict:
     }
 
     # Advanced features (presence flags → small bonus if present)
-    device_tree = 1.0 if "of_match_table" in code else 0.0
-    power_mgmt = 1.0 if "suspend" in code and "resume" in code else 0.0
-    debug_support = 1.0 if ("dev_dbg" in code or "debugfs" in code or "proc_create" in code) else 0.0
+    device_tree = 1.0 if has("of_match_table") else 0.0
+    power_mgmt = 1.0 if has("suspend") and has("resume") else 0.0
+    debug_support = 1.0 if (has("dev_dbg") or has("debugfs") or has("proc_create")) else 0.0
 
     advanced = {
         "device_tree": device_tree,
@@ -229,8 +182,8 @@ def analyze_code(file_path: str) -> Dict:
         "missing_includes": missing_includes,
         "missing_functions": missing_funcs,
         "missing_macros": [m for m in REQUIRED_KERNEL_MACROS if m in missing_macros],
-        "unsafe_calls": [p for p in UNSAFE_FUNCS if re.search(p, code)],
-        "discouraged_calls": [p for p in DISCOURAGED_FUNCS if re.search(p, code)],
+        "unsafe_calls": unsafe_found,
+        "discouraged_calls": discouraged_found,
         "has_file_operations_struct": has_file_ops,
         "uses_mutex": has_mutex,
         "uses_spinlock": has_spin,
@@ -1,17 +1,19 @@
-import re
 from typing import Dict
-from src.logger import logger
-from src.utils import read_text
+from src.logger import get_logger
+from src.evaluation.source_unit import SourceUnit
+from src.evaluation.rules import REQUIRED_FUNCS
 
+logger = get_logger(__name__)
+
+CHECKER_VERSION = "2"  # bump when the lint rules change
 
-REQUIRED_FUNCTIONS = ['open', 'read', 'write', 'release']
 REQUIRED_INCLUDES = ['<linux/fs.h>', '<linux/init.h>', '<linux/module.h>']
 SUSPICIOUS_MACROS = ['EIO', 'EFAULT', 'copy_to_user']
 REQUIRED_TYPES = ['ssize_t', 'loff_t', 'size_t']
 
 
-def lint_c_code(file_path: str) -> Dict:
-    logger.info(f" Static lint: {file_path}")
+def lint_c_code(unit: SourceUnit) -> Dict:
+    logger.info(f" Static lint: {unit.path}")
     issues = {
         "missing_functions": [],
         "missing_types": [],
@@ -20,22 +22,22 @@ def lint_c_code(file_path: str) -> Dict:
         "issues_count": 0
     }
     try:
-        code = read_text(file_path)
+        hits = unit.hits
 
-        for fn in REQUIRED_FUNCTIONS:
-            if not re.search(rf"\b{fn}\s*\(", code):
+        for fn in REQUIRED_FUNCS:
+            if not hits.has(f"func.{fn}"):
                 issues["missing_functions"].append(fn)
 
         for typ in REQUIRED_TYPES:
-            if typ not in code:
+            if not hits.contains(typ):
                 issues["missing_types"].append(typ)
 
         for macro in SUSPICIOUS_MACROS:
-            if macro in code and f"#define {macro}" not in code:
+            if hits.contains(macro) and not hits.contains(f"#define {macro}"):
                 issues["suspicious_macros"].append(macro)
 
         for header in REQUIRED_INCLUDES:
-            if header not in code:
+            if not hits.contains(header):
                 issues["missing_includes"].append(header)
 
         issues["issues_count"] = (
@@ -1,20 +1,54 @@
 import os
+import time
+import contextlib
+import asyncio
 import argparse
 import json
 from datetime import datetime
-
-from src.logger import logger
-from src.compiler import compile_code
-from src.evaluation.static_linter import lint_c_code
-from src.evaluation.functionality_checker import check_driver_apis
-from src.evaluation.security_check import scan_security_issues
-from src.evaluation.quality_check import check_code_quality
-from src.evaluation.adv_feature import check_advanced_features
+from typing import Dict, List, Optional
+
+from src.logger import get_logger, log_context
+from src.cache import ResultCache, CACHE_DIR, DEFAULT_MAX_BYTES
+from src.compiler import CompileService, DEFAULT_TIMEOUT, DEFAULT_MEMORY_LIMIT_MB
+from src.header_sets import HEADER_SETS, DEFAULT_HEADER_SET, ensure_header_set
+from src.evaluation.source_unit import DEFAULT_MAX_SOURCE_MB, SourceUnit, map_file, max_source_bytes, source_prefix
+from src.evaluation.scheduler import run_checkers
 from src.metrics import score_all
+from src.results_db import record_report
+from src import profiling
+
+logger = get_logger(__name__)
+
+
+def report_path_for(file_path: str, output_dir: str) -> str:
+    filename = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_dir, f"{filename}_evaluation.json")
+
 
+def save_report(evaluation_data: Dict, file_path: str, output_dir: str) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = report_path_for(file_path, output_dir)
+    with open(report_path, "w") as f:
+        json.dump(evaluation_data, f, indent=4)
+    record_report(evaluation_data, report_path, output_dir)
+    logger.info(f"Evaluation report saved to {report_path}")
 
-def evaluate_file(file_path: str, output_dir: str) -> None:
+
+async def evaluate_file_async(file_path: str, output_dir: str, cache: Optional[ResultCache] = None,
+                              compiler: Optional[CompileService] = None) -> Optional[Dict]:
+    # every record logged while evaluating carries the file (JSON log format)
+    with log_context(file=file_path), profiling.collect() as stages:
+        start = time.perf_counter()
+        report = await _evaluate_file_async(file_path, output_dir, cache, compiler, stages)
+        duration = round(time.perf_counter() - start, 4)
+        logger.info(f"Evaluated {file_path} in {duration}s", extra={"duration_s": duration})
+        return report
+
+
+async def _evaluate_file_async(file_path: str, output_dir: str, cache: Optional[ResultCache],
+                               compiler: Optional[CompileService], stages: Dict[str, Dict]) -> Optional[Dict]:
     logger.info(f" Evaluating: {file_path}")
+    compiler = compiler or CompileService(concurrency=1)
 
     evaluation_data = {
         "file": file_path,
@@ -22,55 +56,147 @@ def evaluate_file(file_path: str, output_dir: str) -> None:
     }
 
     try:
-        # 1. Compilation
-        compilation_result = compile_code(file_path)
-        evaluation_data["compilation"] = compilation_result
+        # Only the analyzed prefix is copied out of the map
+        max_bytes = max_source_bytes()
+        with profiling.span("read"):
+            with map_file(file_path) as mapped:
+                source = source_prefix(mapped, max_bytes)
+                size = len(mapped)
+        truncated = len(source) < size
+
+        cache_key = None
+        if cache:
+            # a truncated report depends only on the analyzed prefix and the file's size
+            cache_key = cache.key_for(source, f"truncated={size}|") if truncated else cache.key_for(source)
+        if cache_key:
+            with profiling.span("cache_lookup"):
+                cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Cache hit for {file_path}")
+                cached["file"] = file_path
+                cached["profile"] = stages   # this run's stages, not the cached run's
+                save_report(cached, file_path, output_dir)
+                return cached
+
+        evaluation_data["source"] = {"bytes": size, "analyzed_bytes": len(source), "truncated": truncated}
+        if truncated:
+            logger.warning(f"{file_path} is {size} bytes; analyzing its first {len(source)} bytes only")
+
+        # Read the source once; every checker shares this view
+        with profiling.span("source_unit"):
+            unit = SourceUnit.from_bytes(file_path, source, size)
+
+        # A truncated file is not compiled: gcc would read every byte the cap keeps out of analysis
+        if truncated:
+            compile_job = lambda: compiler.skip(file_path, f"source truncated at {len(source)} of {size} bytes")
+        else:
+            compile_job = lambda: compiler.compile(file_path)
+
+        # 1-6. Compilation and every registered checker, each as soon as its inputs are ready
+        check_results, timings = await run_checkers(unit, compile_job, sequential=profiling.is_active())
+        evaluation_data.update(check_results)
+        evaluation_data["timings"] = timings
 
-        # 2. Static Lint
-        lint_result = lint_c_code(file_path)
-        evaluation_data["static_analysis"] = lint_result
-
-        # 3. Functionality
-        func_result = check_driver_apis(file_path)
-        evaluation_data["functionality"] = func_result
+        # 7. Scoring (calculate total score)
+        with profiling.span("scoring"):
+            scores = score_all(evaluation_data)
+        evaluation_data["overall_score"] = scores
+        # wall/cpu (and peak_kb under --profile) per stage; see src/profiling.py
+        evaluation_data["profile"] = stages
 
-        # 4. Security
-        security_result = scan_security_issues(file_path)
-        evaluation_data["security"] = security_result
+        # 8. Save JSON report
+        with profiling.span("save"):
+            save_report(evaluation_data, file_path, output_dir)
+        if cache_key:
+            cache.put(cache_key, evaluation_data)
+        return evaluation_data
 
-        # 5. Code Quality
-        quality_result = check_code_quality(file_path)
-        evaluation_data["code_quality"] = quality_result
+    except Exception as e:
+        logger.error(f"Evaluation failed: {e}")
+        return None
 
-        # 6. Advanced Features
-        advanced_result = check_advanced_features(file_path)
-        evaluation_data["advanced_features"] = advanced_result
 
-        # 7. Scoring (calculate total score)
-        scores = score_all(evaluation_data)
-        evaluation_data["overall_score"] = scores
+def evaluate_file(file_path: str, output_dir: str, cache: Optional[ResultCache] = None,
+                  compiler: Optional[CompileService] = None) -> Optional[Dict]:
+    return asyncio.run(evaluate_file_async(file_path, output_dir, cache, compiler))
 
-        # 8. Save JSON report
-        os.makedirs(output_dir, exist_ok=True)
-        filename = os.path.splitext(os.path.basename(file_path))[0]
-        report_path = os.path.join(output_dir, f"{filename}_evaluation.json")
-        with open(report_path, "w") as f:
-            json.dump(evaluation_data, f, indent=4)
 
-        logger.info(f"Evaluation report saved to {report_path}")
+async def evaluate_files_async(file_paths: List[str], output_dir: str, cache: Optional[ResultCache] = None,
+                               compiler: Optional[CompileService] = None) -> List[Optional[Dict]]:
+    """
+    Evaluates many files on one loop; gcc runs up to `compiler.concurrency`
+    jobs at once. Results are returned in input order.
+    """
+    compiler = compiler or CompileService()
+    # keep a couple of files ready per compile slot without loading the whole list
+    in_flight = asyncio.Semaphore(compiler.concurrency * 2)
 
+    async def _one(path: str) -> Optional[Dict]:
+        async with in_flight:
+            return await evaluate_file_async(path, output_dir, cache, compiler)
 
-    except Exception as e:
-        logger.error(f"Evaluation failed: {e}")
+    return list(await asyncio.gather(*(_one(p) for p in file_paths)))
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(description="Evaluate Linux driver C code")
-    parser.add_argument("--file", "-f", required=True, help="Path to the C file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", "-f", help="Path to the C file")
+    source.add_argument("--dir", "-d", help="Evaluate every *.c file in this directory")
+    source.add_argument("--manifest", "-m", help="Text file listing one C file per line")
     parser.add_argument("--output", "-o", default="reports", help="Reports output dir")
-    args = parser.parse_args()
-
-    evaluate_file(args.file, args.output)
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Worker processes for --dir/--manifest (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-evaluate, ignoring cached reports")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Evaluation cache directory")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Evict least recently used cache entries above this size")
+    parser.add_argument("--compile-jobs", type=int, default=None,
+                        help="Concurrent gcc runs per process (default: CPU count)")
+    parser.add_argument("--compile-timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Wall-clock seconds before a gcc run is killed")
+    parser.add_argument("--compile-memory-mb", type=int, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help="Address-space limit for each gcc run (POSIX only)")
+    parser.add_argument("--compile-log-dir", default=None,
+                        help="Also write raw gcc output to this directory (off by default)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Reuse reports for files that only differ in whitespace/comments and "
+                             "record near-duplicate clusters in the batch summary")
+    parser.add_argument("--max-source-mb", type=float, default=None,
+                        help=f"Analyze at most this much of each file and mark larger ones truncated "
+                             f"(default: $EVAL_MAX_SOURCE_MB or {DEFAULT_MAX_SOURCE_MB}; 0 = no cap)")
+    parser.add_argument("--header-set", default=DEFAULT_HEADER_SET, choices=sorted(HEADER_SETS),
+                        help="Mock kernel header set to compile against")
+    parser.add_argument("--run", default=None,
+                        help="Run label for rows in <output>/results.db (default: $EVAL_RUN or 'default')")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run stages one at a time in this process with memory tracing; write cProfile "
+                             "stats and a collapsed-stack file to --profile-dir")
+    parser.add_argument("--profile-dir", default=profiling.PROFILE_DIR, help="Where --profile output goes")
+    args = parser.parse_args(argv)
+    if args.run:
+        os.environ["EVAL_RUN"] = args.run   # inherited by batch workers
+    if args.max_source_mb is not None:
+        os.environ["EVAL_MAX_SOURCE_MB"] = str(args.max_source_mb)
+
+    # Build (or validate) the header set and its precompiled header once, before any workers start
+    ensure_header_set(args.header_set)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024,
+                                                   header_set=args.header_set)
+    compiler = CompileService(args.compile_jobs, args.compile_timeout, args.compile_memory_mb,
+                              log_dir=args.compile_log_dir, header_set=args.header_set)
+
+    jobs = args.jobs
+    if args.profile and jobs != 1:
+        logger.info("--profile: evaluating in this process (--jobs 1) so every stage is profiled")
+        jobs = 1
+    with profiling.profile_run("evaluator", args.profile_dir) if args.profile else contextlib.nullcontext():
+        if args.file:
+            evaluate_file(args.file, args.output, cache=cache, compiler=compiler)
+        else:
+            from src.batch import collect_inputs, evaluate_batch
+            paths = collect_inputs(directory=args.dir, manifest=args.manifest)
+            evaluate_batch(paths, args.output, jobs=jobs, cache=cache, compiler=compiler, dedup=args.dedup)
     logger.info(f" Evaluation complete. Report saved to {args.output}")
 
 
@@ -0,0 +1,611 @@
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+HEADER_ROOT = "mock_linux_headers"
+PCH_ROOT = ".cache/pch"
+DEFAULT_HEADER_SET = "minimal"
+MANIFEST_FILE = "manifest.json"
+
+# Named, versioned stub sets: this is the one definition of every header.
+# `python -m src.header_sets --write` generates mock_linux_headers/<name>/
+# from it (the tree is committed so gcc errors point at readable files) and
+# builds refuse a tree that has drifted from it. The set hash is taken from
+# these texts, so editing one rebuilds the PCH and re-keys cached reports by
+# itself; also bump "version", the label reports record ("kernel@2").
+HEADER_SETS: Dict[str, Dict] = {
+    # The original hand-written stubs, kept byte-for-byte so historical scores
+    # stay reproducible.
+    "minimal": {
+        "version": "1",
+        "headers": {
+            "linux/cdev.h": """#pragma once
+struct cdev { int dummy; };
+static inline int cdev_register(void *c) { return 0; }
+static inline void cdev_unregister(void *c) {}
+""",
+            "linux/device.h": """#pragma once
+""",
+            "linux/fs.h": """#ifndef _LINUX_FS_H
+#define _LINUX_FS_H
+
+struct file {
+    void *private_data;
+};
+
+struct cdev {
+    void *private_data;
+};
+
+#endif
+""",
+            "linux/init.h": """/* mock_linux_headers/linux/init.h */
+#pragma once
+#define module_init(x)
+#define module_exit(x)
+""",
+            "linux/module.h": """/* mock_linux_headers/linux/module.h */
+#pragma once
+#define THIS_MODULE 0
+#define MODULE_LICENSE(x)
+#define MODULE_AUTHOR(x)
+#define MODULE_DESCRIPTION(x)
+""",
+            "linux/slab.h": """#pragma once
+#define GFP_KERNEL 0
+static inline void* kmalloc(int size, int flags) { return 0; }
+static inline void kfree(void* ptr) {}
+""",
+            "linux/types.h": """#ifndef _LINUX_TYPES_H
+#define _LINUX_TYPES_H
+
+typedef long ssize_t;
+typedef long loff_t;
+typedef unsigned int dev_t;
+typedef unsigned int mode_t;
+
+#endif
+""",
+            "linux/uaccess.h": """#ifndef _LINUX_UACCESS_H
+#define _LINUX_UACCESS_H
+
+static inline int copy_to_user(void *to, const void *from, unsigned long n) {
+    return 0; // Simulate success
+}
+
+#endif
+""",
+        },
+    },
+    # Closer to the real char-driver API surface: declarations only (nothing
+    # is linked under -fsyntax-only) and include guards throughout. Offers
+    # every header `minimal` does (tests/test_header_sets.py checks).
+    "kernel": {
+        "version": "1",
+        "headers": {
+            "linux/cdev.h": """#ifndef _MOCK_LINUX_CDEV_H
+#define _MOCK_LINUX_CDEV_H
+#include <linux/fs.h>
+struct cdev {
+    struct module *owner;
+    const struct file_operations *ops;
+    dev_t dev;
+    unsigned int count;
+};
+void cdev_init(struct cdev *cdev, const struct file_operations *fops);
+struct cdev *cdev_alloc(void);
+int cdev_add(struct cdev *cdev, dev_t dev, unsigned int count);
+void cdev_del(struct cdev *cdev);
+#endif
+""",
+            "linux/compiler.h": """#ifndef _MOCK_LINUX_COMPILER_H
+#define _MOCK_LINUX_COMPILER_H
+#define __user
+#define __iomem
+#define __force
+#define __must_check
+#define likely(x) __builtin_expect(!!(x), 1)
+#define unlikely(x) __builtin_expect(!!(x), 0)
+#endif
+""",
+            "linux/device.h": """#ifndef _MOCK_LINUX_DEVICE_H
+#define _MOCK_LINUX_DEVICE_H
+#include <linux/types.h>
+#include <linux/err.h>
+struct module;
+struct class { const char *name; };
+struct device { struct device *parent; void *driver_data; };
+struct class *__mock_class_create(const char *name);
+/* accepts both class_create(name) (>= 6.4) and class_create(THIS_MODULE, name) */
+#define class_create(...) __mock_class_create("class")
+void class_destroy(struct class *cls);
+struct device *device_create(struct class *cls, struct device *parent, dev_t devt,
+                             void *drvdata, const char *fmt, ...);
+void device_destroy(struct class *cls, dev_t devt);
+void *dev_get_drvdata(const struct device *dev);
+void dev_set_drvdata(struct device *dev, void *data);
+int _dev_printk(const struct device *dev, const char *fmt, ...);
+#define dev_err(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#define dev_warn(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#define dev_info(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#define dev_dbg(dev, fmt, ...) _dev_printk(dev, fmt, ##__VA_ARGS__)
+#endif
+""",
+            "linux/err.h": """#ifndef _MOCK_LINUX_ERR_H
+#define _MOCK_LINUX_ERR_H
+#include <linux/types.h>
+#define MAX_ERRNO 4095
+#define IS_ERR_VALUE(x) ((unsigned long)(void *)(x) >= (unsigned long)-MAX_ERRNO)
+static inline void *ERR_PTR(long error) { return (void *)error; }
+static inline long PTR_ERR(const void *ptr) { return (long)ptr; }
+static inline bool IS_ERR(const void *ptr) { return IS_ERR_VALUE(ptr); }
+static inline bool IS_ERR_OR_NULL(const void *ptr) { return !ptr || IS_ERR_VALUE(ptr); }
+#endif
+""",
+            "linux/errno.h": """#ifndef _MOCK_LINUX_ERRNO_H
+#define _MOCK_LINUX_ERRNO_H
+#define EPERM 1
+#define ENOENT 2
+#define EINTR 4
+#define EIO 5
+#define ENXIO 6
+#define EAGAIN 11
+#define ENOMEM 12
+#define EFAULT 14
+#define EBUSY 16
+#define ENODEV 19
+#define EINVAL 22
+#define ENOSPC 28
+#define ESPIPE 29
+#define ENOTTY 25
+#define ERESTARTSYS 512
+#endif
+""",
+            "linux/fs.h": """#ifndef _MOCK_LINUX_FS_H
+#define _MOCK_LINUX_FS_H
+#include <linux/kernel.h>
+#include <linux/mutex.h>
+struct module;
+struct inode {
+    dev_t i_rdev;
+    struct cdev *i_cdev;
+    loff_t i_size;
+};
+struct file {
+    void *private_data;
+    unsigned int f_flags;
+    umode_t f_mode;
+    loff_t f_pos;
+};
+struct poll_table_struct;
+struct vm_area_struct;
+struct file_operations {
+    struct module *owner;
+    loff_t (*llseek)(struct file *, loff_t, int);
+    ssize_t (*read)(struct file *, char __user *, size_t, loff_t *);
+    ssize_t (*write)(struct file *, const char __user *, size_t, loff_t *);
+    unsigned int (*poll)(struct file *, struct poll_table_struct *);
+    long (*unlocked_ioctl)(struct file *, unsigned int, unsigned long);
+    long (*compat_ioctl)(struct file *, unsigned int, unsigned long);
+    int (*mmap)(struct file *, struct vm_area_struct *);
+    int (*open)(struct inode *, struct file *);
+    int (*flush)(struct file *, void *);
+    int (*release)(struct inode *, struct file *);
+    int (*fsync)(struct file *, loff_t, loff_t, int);
+};
+#define MINORBITS 20
+#define MINORMASK ((1U << MINORBITS) - 1)
+#define MAJOR(dev) ((unsigned int)((dev) >> MINORBITS))
+#define MINOR(dev) ((unsigned int)((dev) & MINORMASK))
+#define MKDEV(ma, mi) (((ma) << MINORBITS) | (mi))
+#define SEEK_SET 0
+#define SEEK_CUR 1
+#define SEEK_END 2
+#define FMODE_READ 0x1
+#define FMODE_WRITE 0x2
+#define O_NONBLOCK 00004000
+int register_chrdev(unsigned int major, const char *name, const struct file_operations *fops);
+void unregister_chrdev(unsigned int major, const char *name);
+int alloc_chrdev_region(dev_t *dev, unsigned int baseminor, unsigned int count, const char *name);
+int register_chrdev_region(dev_t from, unsigned int count, const char *name);
+void unregister_chrdev_region(dev_t from, unsigned int count);
+unsigned int iminor(const struct inode *inode);
+unsigned int imajor(const struct inode *inode);
+loff_t no_llseek(struct file *file, loff_t offset, int whence);
+loff_t default_llseek(struct file *file, loff_t offset, int whence);
+int nonseekable_open(struct inode *inode, struct file *filp);
+#endif
+""",
+            "linux/init.h": """#ifndef _MOCK_LINUX_INIT_H
+#define _MOCK_LINUX_INIT_H
+#define __init
+#define __exit
+#define __initdata
+#define module_init(fn) static int (*__mock_initcall)(void) __attribute__((unused)) = fn
+#define module_exit(fn) static void (*__mock_exitcall)(void) __attribute__((unused)) = fn
+#endif
+""",
+            "linux/kernel.h": """#ifndef _MOCK_LINUX_KERNEL_H
+#define _MOCK_LINUX_KERNEL_H
+#include <linux/types.h>
+#include <linux/compiler.h>
+#include <linux/errno.h>
+#include <linux/err.h>
+#include <linux/string.h>
+#define KERN_EMERG "0"
+#define KERN_ALERT "1"
+#define KERN_CRIT "2"
+#define KERN_ERR "3"
+#define KERN_WARNING "4"
+#define KERN_NOTICE "5"
+#define KERN_INFO "6"
+#define KERN_DEBUG "7"
+int printk(const char *fmt, ...);
+#define pr_emerg(fmt, ...) printk(KERN_EMERG fmt, ##__VA_ARGS__)
+#define pr_alert(fmt, ...) printk(KERN_ALERT fmt, ##__VA_ARGS__)
+#define pr_crit(fmt, ...) printk(KERN_CRIT fmt, ##__VA_ARGS__)
+#define pr_err(fmt, ...) printk(KERN_ERR fmt, ##__VA_ARGS__)
+#define pr_warn(fmt, ...) printk(KERN_WARNING fmt, ##__VA_ARGS__)
+#define pr_notice(fmt, ...) printk(KERN_NOTICE fmt, ##__VA_ARGS__)
+#define pr_info(fmt, ...) printk(KERN_INFO fmt, ##__VA_ARGS__)
+#define pr_debug(fmt, ...) printk(KERN_DEBUG fmt, ##__VA_ARGS__)
+#define min(a, b) ((a) < (b) ? (a) : (b))
+#define max(a, b) ((a) > (b) ? (a) : (b))
+#define min_t(type, a, b) ((type)(a) < (type)(b) ? (type)(a) : (type)(b))
+#define max_t(type, a, b) ((type)(a) > (type)(b) ? (type)(a) : (type)(b))
+#define ARRAY_SIZE(arr) (sizeof(arr) / sizeof((arr)[0]))
+#define container_of(ptr, type, member) ((type *)((char *)(ptr) - offsetof(type, member)))
+#endif
+""",
+            "linux/module.h": """#ifndef _MOCK_LINUX_MODULE_H
+#define _MOCK_LINUX_MODULE_H
+#include <linux/kernel.h>
+#include <linux/init.h>
+struct module { int dummy; };
+extern struct module __this_module;
+#define THIS_MODULE (&__this_module)
+#define MODULE_LICENSE(x)
+#define MODULE_AUTHOR(x)
+#define MODULE_DESCRIPTION(x)
+#define MODULE_VERSION(x)
+#define MODULE_ALIAS(x)
+#define MODULE_DEVICE_TABLE(type, name)
+#define module_param(name, type, perm)
+#define MODULE_PARM_DESC(name, desc)
+#define EXPORT_SYMBOL(sym)
+#define EXPORT_SYMBOL_GPL(sym)
+#endif
+""",
+            "linux/mutex.h": """#ifndef _MOCK_LINUX_MUTEX_H
+#define _MOCK_LINUX_MUTEX_H
+struct mutex { int count; };
+#define DEFINE_MUTEX(name) struct mutex name = { 1 }
+void mutex_init(struct mutex *lock);
+void mutex_lock(struct mutex *lock);
+int mutex_lock_interruptible(struct mutex *lock);
+int mutex_trylock(struct mutex *lock);
+void mutex_unlock(struct mutex *lock);
+void mutex_destroy(struct mutex *lock);
+int mutex_is_locked(struct mutex *lock);
+#endif
+""",
+            "linux/slab.h": """#ifndef _MOCK_LINUX_SLAB_H
+#define _MOCK_LINUX_SLAB_H
+#include <linux/types.h>
+#define GFP_KERNEL 0x0cc0u
+#define GFP_ATOMIC 0x0820u
+void *kmalloc(size_t size, gfp_t flags);
+void *kzalloc(size_t size, gfp_t flags);
+void *kcalloc(size_t n, size_t size, gfp_t flags);
+void *krealloc(const void *p, size_t new_size, gfp_t flags);
+void kfree(const void *p);
+void *vmalloc(unsigned long size);
+void vfree(const void *addr);
+#endif
+""",
+            "linux/spinlock.h": """#ifndef _MOCK_LINUX_SPINLOCK_H
+#define _MOCK_LINUX_SPINLOCK_H
+typedef struct { int slock; } spinlock_t;
+#define DEFINE_SPINLOCK(x) spinlock_t x = { 0 }
+void spin_lock_init(spinlock_t *lock);
+void spin_lock(spinlock_t *lock);
+void spin_unlock(spinlock_t *lock);
+#define spin_lock_irqsave(lock, flags) ((flags) = 0, spin_lock(lock))
+#define spin_unlock_irqrestore(lock, flags) ((void)(flags), spin_unlock(lock))
+#endif
+""",
+            "linux/string.h": """#ifndef _MOCK_LINUX_STRING_H
+#define _MOCK_LINUX_STRING_H
+#include <linux/types.h>
+void *memset(void *s, int c, size_t n);
+void *memcpy(void *dest, const void *src, size_t n);
+void *memmove(void *dest, const void *src, size_t n);
+int memcmp(const void *a, const void *b, size_t n);
+size_t strlen(const char *s);
+size_t strnlen(const char *s, size_t maxlen);
+char *strcpy(char *dest, const char *src);
+char *strncpy(char *dest, const char *src, size_t n);
+ssize_t strscpy(char *dest, const char *src, size_t count);
+char *strcat(char *dest, const char *src);
+int strcmp(const char *a, const char *b);
+int sprintf(char *buf, const char *fmt, ...);
+int snprintf(char *buf, size_t size, const char *fmt, ...);
+int scnprintf(char *buf, size_t size, const char *fmt, ...);
+#endif
+""",
+            "linux/types.h": """#ifndef _MOCK_LINUX_TYPES_H
+#define _MOCK_LINUX_TYPES_H
+#include <stddef.h>
+#include <stdbool.h>
+typedef long ssize_t;
+typedef long long loff_t;
+typedef unsigned int dev_t;
+typedef unsigned short umode_t;
+typedef unsigned int mode_t;
+typedef unsigned int gfp_t;
+typedef unsigned char u8;
+typedef unsigned short u16;
+typedef unsigned int u32;
+typedef unsigned long long u64;
+typedef signed char s8;
+typedef short s16;
+typedef int s32;
+typedef long long s64;
+#endif
+""",
+            "linux/uaccess.h": """#ifndef _MOCK_LINUX_UACCESS_H
+#define _MOCK_LINUX_UACCESS_H
+#include <linux/kernel.h>
+unsigned long copy_to_user(void __user *to, const void *from, unsigned long n);
+unsigned long copy_from_user(void *to, const void __user *from, unsigned long n);
+#define get_user(x, ptr) ((x) = *(ptr), 0)
+#define put_user(x, ptr) (*(ptr) = (x), 0)
+#endif
+""",
+        },
+    },
+}
+
+
+def header_set_dir(name: str) -> str:
+    return os.path.join(HEADER_ROOT, name)
+
+
+def set_headers(name: str) -> List[str]:
+    """Header paths of a set, relative to its directory ("linux/fs.h", ...), sorted."""
+    return sorted(HEADER_SETS[name]["headers"])
+
+
+def _tree_headers(set_dir: str) -> List[str]:
+    headers = []
+    for dirpath, dirnames, filenames in os.walk(set_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".h"):
+                headers.append(os.path.relpath(os.path.join(dirpath, filename), set_dir).replace(os.sep, "/"))
+    return headers
+
+
+def hash_tree(root: str, suffix: str = ".h") -> str:
+    """Content hash of every `suffix` file under `root` (paths included, order independent)."""
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(suffix):
+                continue
+            path = os.path.join(dirpath, filename)
+            h.update(os.path.relpath(path, root).replace(os.sep, "/").encode())
+            with open(path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def header_set_hash(name: str) -> str:
+    """Hash of the set's definition: name, version and every header's text."""
+    payload = json.dumps({"name": name, **HEADER_SETS[name]}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def header_set_drift(name: str, root: Optional[str] = None) -> List[str]:
+    """Headers whose file under `root` (HEADER_ROOT)/<name>/ is missing, differs from the definition, or isn't defined."""
+    set_dir = os.path.join(root or HEADER_ROOT, name)
+    expected = HEADER_SETS[name]["headers"]
+    drift = [rel for rel in _tree_headers(set_dir) if rel not in expected]
+    for rel, text in expected.items():
+        try:
+            with open(os.path.join(set_dir, rel), "r", encoding="utf-8", newline="") as f:
+                if f.read() != text:
+                    drift.append(rel)
+        except FileNotFoundError:
+            drift.append(rel)
+    return sorted(drift)
+
+
+def write_header_set(name: str, root: Optional[str] = None) -> List[str]:
+    """
+    Generates `root` (HEADER_ROOT)/<name>/ from HEADER_SETS: writes the headers that are
+    missing or differ and removes the ones the set no longer defines.
+    Returns the headers it touched. Run it by hand after editing a set;
+    builds only check the tree (see build_header_set).
+    """
+    set_dir = os.path.join(root or HEADER_ROOT, name)
+    changed = header_set_drift(name, root)
+    for rel in changed:
+        path = os.path.join(set_dir, rel)
+        text = HEADER_SETS[name]["headers"].get(rel)
+        if text is None:
+            os.remove(path)
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+    return changed
+
+
+def header_set_label(name: str) -> str:
+    return f"{name}@{HEADER_SETS[name]['version']}"
+
+
+def pch_dir_for(name: str, digest: Optional[str] = None) -> str:
+    """Precompiled headers of one exact revision of a set; a new hash gets a new directory."""
+    return os.path.join(PCH_ROOT, f"{name}-{(digest or header_set_hash(name))[:16]}")
+
+
+def _probe(set_dir: str, header: str, pch_dir: Optional[str], work: str) -> Optional[str]:
+    """gcc's output for a file that includes `header` twice, or None when gcc can't run."""
+    from src.compiler import WARNING_FLAGS, gcc_command
+    probe = os.path.join(work, "probe.c")
+    with open(probe, "w", encoding="utf-8", newline="\n") as f:
+        f.write(f"#include <{header}>\n#include <{header}>\n")
+    path_options = [("-I", pch_dir)] if pch_dir else []
+    cmd = gcc_command([*WARNING_FLAGS, "-fsyntax-only"], set_dir, probe, path_options)
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="ignore")
+    except FileNotFoundError:
+        return None
+    return f"{proc.returncode}\n{proc.stdout}"
+
+
+def _precompile(set_dir: str, header: str, out_dir: str, work: str) -> bool:
+    """
+    Builds out_dir/<header>.gch and keeps it only if a file including the
+    header compiles exactly as it does from source. Headers whose own
+    diagnostics a PCH would hide (or that don't stand alone) are left out.
+    A copy of the header sits next to its .gch: after loading a PCH, gcc
+    resolves a repeated #include of that header to the .gch's directory.
+    """
+    from src.compiler import WARNING_FLAGS, gcc_command
+    expected = _probe(set_dir, header, None, work)
+    if expected is None:
+        return False
+    source = os.path.abspath(os.path.join(set_dir, header))   # as found through -I, so locations match
+    copy = os.path.join(out_dir, header)
+    os.makedirs(os.path.dirname(copy), exist_ok=True)
+    shutil.copy2(source, copy)   # same mtime, so #pragma once sees one file
+    cmd = gcc_command([*WARNING_FLAGS, "-x", "c-header"], set_dir, source, [("-o", copy + ".gch")])
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="ignore")
+    if proc.returncode == 0 and _probe(set_dir, header, out_dir, work) == expected:
+        return True
+    logger.debug(f"Not precompiling {header} in {set_dir}: results differ from the source header")
+    for path in (copy, copy + ".gch"):
+        if os.path.exists(path):
+            os.remove(path)
+    return False
+
+
+def _read_manifest(pch_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(pch_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_header_set(name: str, force: bool = False) -> Dict:
+    """
+    Precompiles the set's headers one by one into .cache/pch/<name>-<hash>/.
+    On the include path ahead of the set, gcc uses a header's .gch only as
+    a stand-in for that same header when it is a file's first include, so
+    compile results are the same with or without it.
+
+    The headers are never rewritten. The PCH directory is built privately and
+    renamed into place, so concurrent compiles (and concurrent builders) see
+    either no directory, and fall back to plain headers, or a complete one.
+    Returns the manifest: {"name", "version", "hash", "source", "pch", "pch_dir", "precompiled"}.
+    """
+    spec = HEADER_SETS[name]
+    set_dir = header_set_dir(name)
+    if not os.path.isdir(set_dir):
+        raise FileNotFoundError(f"Header set '{name}' has no directory {set_dir}")
+    drift = header_set_drift(name)
+    if drift:
+        # the hash (and so the PCH and cached reports) follows the definition, not the files
+        raise ValueError(f"Header set '{name}' in {set_dir} differs from its definition in src/header_sets.py "
+                         f"({', '.join(drift)}); regenerate it with: python -m src.header_sets --write")
+    digest = header_set_hash(name)
+    pch_dir = pch_dir_for(name, digest)
+    # .gch files record the absolute header paths they were built from
+    source = os.path.abspath(set_dir)
+    manifest = None if force else _read_manifest(pch_dir)
+    if manifest and manifest.get("hash") == digest and manifest.get("source") == source:
+        return manifest
+
+    logger.info(f"Precompiling header set {header_set_label(name)} into {pch_dir}")
+    os.makedirs(PCH_ROOT, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{name}-", dir=PCH_ROOT)
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            precompiled = [h for h in set_headers(name) if _precompile(set_dir, h, staging, work)]
+        manifest = {"name": name, "version": spec["version"], "hash": digest, "source": source,
+                    "pch": bool(precompiled), "pch_dir": pch_dir, "precompiled": precompiled}
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.isdir(pch_dir):   # forced, or built for a checkout that has since moved
+            retired = tempfile.mkdtemp(prefix=f".{name}-old-", dir=PCH_ROOT)
+            try:
+                os.replace(pch_dir, os.path.join(retired, "pch"))
+            except OSError:   # a concurrent builder retired it already
+                pass
+            shutil.rmtree(retired, ignore_errors=True)
+        try:
+            os.rename(staging, pch_dir)
+        except OSError:
+            # Another process published this revision first; theirs is identical
+            return _read_manifest(pch_dir) or manifest
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return manifest
+
+
+_READY: Dict[str, Dict] = {}
+
+
+def ensure_header_set(name: str) -> Dict:
+    """Per-process memo around build_header_set, cheap to call before every compile."""
+    if name not in _READY:
+        if name not in HEADER_SETS:
+            raise ValueError(f"Unknown header set '{name}'. Available: {', '.join(sorted(HEADER_SETS))}")
+        _READY[name] = build_header_set(name)
+    return _READY[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and precompile the mock kernel header sets")
+    parser.add_argument("--set", dest="names", action="append", choices=sorted(HEADER_SETS),
+                        help="Header set to build (repeatable; default: all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the manifest is current")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--write", action="store_true",
+                      help=f"Regenerate {HEADER_ROOT}/<set>/ from the definitions before building")
+    mode.add_argument("--check", action="store_true",
+                      help=f"Only report headers in {HEADER_ROOT}/ that differ from the definitions (exit 1 if any)")
+    args = parser.parse_args()
+
+    names = args.names or sorted(HEADER_SETS)
+    if args.check:
+        drift = {name: header_set_drift(name) for name in names}
+        for name, headers in drift.items():
+            print(f" {header_set_label(name)}: " + (", ".join(headers) if headers else "up to date"))
+        raise SystemExit(1 if any(drift.values()) else 0)
+    if args.write:
+        for name in names:
+            changed = write_header_set(name)
+            print(f" {header_set_label(name)}: " + (f"wrote {', '.join(changed)}" if changed else "up to date"))
+
+    for name in names:
+        stamp = build_header_set(name, force=args.force)
+        print(f" {header_set_label(name)} -> {stamp['pch_dir']} "
+              f"({len(stamp['precompiled'])}/{len(set_headers(name))} headers precompiled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,225 @@
-import logging
 import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+import contextlib
+import contextvars
+from typing import Dict, Iterator, Optional
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_DIR = "logs"
 LOG_FILE = "pipeline.log"
-os.makedirs(LOG_DIR, exist_ok=True)
+JSON_LOG_FILE = "pipeline.jsonl"
 
 LOG_PATH = os.path.join(LOG_DIR, LOG_FILE)
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+# Every module logs through a child of this logger (src.compiler, src.evaluation.quality_check, ...)
+ROOT_NAME = "src"
+
+# LOG_JSON=1 writes JSON lines to logs/pipeline.jsonl instead of the text log.
+# LOG_LEVELS="evaluation=WARNING,compiler=DEBUG" sets levels per stage (logger name below "src").
+JSON_LINES = os.getenv("LOG_JSON", "").lower() in ("1", "true", "yes")
+STAGE_LEVELS = os.getenv("LOG_LEVELS", "")
+
+# file / stage of the work in progress, attached to every record logged under it
+_context: contextvars.ContextVar = contextvars.ContextVar("log_context", default={})
+
+
+@contextlib.contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Adds `fields` (file=..., stage=...) to records logged by this task or thread inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """Runs in the logging thread, before the record is queued, so the context is still current."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        ctx = _context.get()
+        record.file = ctx.get("file")
+        name = record.name[len(ROOT_NAME) + 1:] if record.name.startswith(ROOT_NAME + ".") else record.name
+        record.stage = getattr(record, "stage", None) or ctx.get("stage") or name
+        if not hasattr(record, "duration_s"):
+            record.duration_s = None
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, stage, file, duration_s, msg (and exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "stage": getattr(record, "stage", record.name),
+            "file": getattr(record, "file", None),
+            "duration_s": getattr(record, "duration_s", None),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(json_lines: bool) -> logging.Handler:
+    # delay: the file (and LOG_DIR) are only created once something is logged
+    handler = logging.FileHandler(os.path.join(LOG_DIR, JSON_LOG_FILE if json_lines else LOG_FILE),
+                                  encoding="utf-8", delay=True)
+    handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+class _LightQueueHandler(QueueHandler):
+    """
+    Does only what the listener needs on the caller's side: merge the message
+    arguments and render any traceback. The stock handler also copies the
+    record and formats it in full before queueing.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not _started and self.queue is _queue:   # pool workers log to the parent's queue instead
+            _start_listener()
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _queue_handler(q) -> QueueHandler:
+    handler = _LightQueueHandler(q)
+    handler.addFilter(_ContextFilter())
+    return handler
+
+
+def set_stage_levels(levels) -> None:
+    """`levels` is {stage: level} or "stage=LEVEL,..."; a stage covers its sub-stages."""
+    if isinstance(levels, str):
+        levels = dict(item.split("=", 1) for item in levels.split(",") if "=" in item)
+    for stage, level in levels.items():
+        stage = stage.strip()
+        name = ROOT_NAME if stage in ("", ROOT_NAME) else f"{ROOT_NAME}.{stage}"
+        logging.getLogger(name).setLevel(str(level).strip().upper())
+
+
+class _OwnedQueueListener(QueueListener):
+    """A listener that owns its handlers and closes them when stopped."""
+
+    def stop(self) -> None:
+        super().stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+# Callers only enqueue records; the listener thread formats them and does the file I/O.
+# Importing this module has no side effects, and setup only ever touches the
+# "src" logger: a host application's root logger and logging globals are left
+# alone. `_configure` runs on the first get_logger(); LOG_DIR and the listener
+# thread are created by the first record, so commands that never log never
+# pay for them.
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_started = False
+_configured = False
+_start_lock = threading.Lock()
+# LOG_PROPAGATE=1 also hands records to the root logger's handlers (e.g. a host app's console)
+PROPAGATE = os.getenv("LOG_PROPAGATE", "").lower() in ("1", "true", "yes")
+
+
+def _start_listener() -> None:
+    global _started, _listener
+    with _start_lock:
+        if _started:
+            return
+        os.makedirs(LOG_DIR, exist_ok=True)
+        _listener = _OwnedQueueListener(_queue, _file_handler(JSON_LINES), respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)   # drains the queue before exit
+        _started = True
+
+
+def _configure() -> None:
+    global _configured
+    with _start_lock:
+        if _configured:
+            return
+        root = logging.getLogger(ROOT_NAME)
+        root.addHandler(_queue_handler(_queue))
+        root.setLevel(logging.INFO)
+        root.propagate = PROPAGATE
+        _configured = True
+    set_stage_levels(STAGE_LEVELS)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger for one stage; pass `__name__` so the level can be set per module
+    or package. Names outside the package (benchmarks.harness) are filed
+    under "src" too, so they reach the pipeline log.
+    """
+    if name == "__main__":   # python -m src.evaluator: keep the module's own name
+        spec = getattr(sys.modules["__main__"], "__spec__", None)
+        name = spec.name if spec else ROOT_NAME
+    if name != ROOT_NAME and not name.startswith(ROOT_NAME + "."):
+        name = f"{ROOT_NAME}.{name}"
+    _configure()
+    return logging.getLogger(name)
+
+
+def stage_levels() -> Dict[str, str]:
+    """Levels set on stage loggers in this process, for handing to pool workers."""
+    levels = {}
+    for name, lg in logging.root.manager.loggerDict.items():
+        if isinstance(lg, logging.Logger) and lg.level and (name == ROOT_NAME or name.startswith(ROOT_NAME + ".")):
+            levels[name[len(ROOT_NAME) + 1:]] = logging.getLevelName(lg.level)
+    return levels
+
+
+def __getattr__(name: str):
+    # `from src.logger import logger` still works, without configuring anything at import
+    if name == "logger":
+        return get_logger(ROOT_NAME)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-# Remove all existing handlers first (especially for Jupyter / repeated imports)
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
+def start_log_listener():
+    """
+    Starts a background listener that owns the pipeline log handlers, so
+    process-pool workers can log through a queue instead of sharing the file.
+    Returns (queue, listener); call listener.stop() once the workers are done.
+    """
+    import multiprocessing   # only batch runs need it
+    os.makedirs(LOG_DIR, exist_ok=True)
+    mp_queue = multiprocessing.Queue(-1)
+    # its own FileHandler: handlers aren't shared with the in-process listener's thread
+    listener = _OwnedQueueListener(mp_queue, _file_handler(JSON_LINES), respect_handler_level=True)
+    listener.start()
+    return mp_queue, listener
 
-# ✅ Set up logging ONLY to file (UTF-8 safe)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_PATH, encoding="utf-8")  # File logging only
-    ]
-)
 
-logger = logging.getLogger(__name__)
+def init_worker_logging(mp_queue, levels: Optional[Dict[str, str]] = None) -> None:
+    """Process-pool initializer: route this worker's records through `mp_queue`."""
+    global _configured
+    root = logging.getLogger(ROOT_NAME)
+    with _start_lock:
+        for handler in root.handlers[:]:   # a forked worker inherits the parent's queue handler
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler(mp_queue))
+        root.setLevel(logging.INFO)
+        root.propagate = PROPAGATE
+        _configured = True
+    if levels:
+        set_stage_levels(levels)
@@ -1,50 +1,118 @@
-from src.logger import logger
+import json
+import math
+from typing import Dict, Optional
 
-def score_all(evaluation_data: dict) -> dict:
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCORING_VERSION = "3"  # bump when weights or bucket formulas change
+
+# bucket -> report key of the checker whose "metrics" sub-dict it averages
+BUCKET_SOURCES = {
+    "correctness": "functionality",   # plus compilation, which counts half (see compile_credit)
+    "security": "security",
+    "code_quality": "code_quality",
+    "advanced": "advanced_features",
+}
+BUCKETS = tuple(BUCKET_SOURCES)
+
+# Weights in percent; the profile reports are scored with. Other profiles
+# (config/scoring_profiles.json) are applied afterwards by src.scoring.
+DEFAULT_PROFILE = "default"
+DEFAULT_WEIGHTS = {"correctness": 40, "security": 25, "code_quality": 20, "advanced": 15}
+PROFILES_FILE = "config/scoring_profiles.json"
+
+
+def checker_metrics(evaluation_data: dict, key: str) -> Dict[str, float]:
+    """Numeric entries of report[`key`]["metrics"] (empty when the checker failed or is missing)."""
+    section = evaluation_data.get(key) or {}
+    values = section.get("metrics") or {}
+    return {k: float(v) for k, v in values.items()
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and not math.isnan(v)}
+
+
+def compile_credit(evaluation_data: dict) -> float:
+    """
+    1.0 when the file compiled and there is code to credit, else 0. An empty
+    or declaration-only file compiles too, so success only counts when the
+    functionality check ran, scored above 0 and found a function definition.
+    Reports from before the count was recorded need a required file
+    operation (basic_operations above 0) instead.
+    """
+    if not (evaluation_data.get("compilation") or {}).get("success"):
+        return 0.0
+    values = checker_metrics(evaluation_data, BUCKET_SOURCES["correctness"])
+    if not any(values.values()):
+        return 0.0
+    findings = (evaluation_data.get(BUCKET_SOURCES["correctness"]) or {}).get("findings") or {}
+    defined = findings.get("function_definitions")
+    if defined is None:
+        return 1.0 if values.get("basic_operations", 0.0) > 0 else 0.0
+    return 1.0 if defined > 0 else 0.0
+
+
+def bucket_values(evaluation_data: dict) -> Dict[str, float]:
+    """
+    Each bucket in [0, 1]: the mean of its checker's metrics (0 without any).
+    Correctness is half compile_credit, half the functionality mean.
+    """
+    buckets = {}
+    for bucket, key in BUCKET_SOURCES.items():
+        values = checker_metrics(evaluation_data, key)
+        buckets[bucket] = sum(values.values()) / len(values) if values else 0.0
+    buckets["correctness"] = 0.5 * compile_credit(evaluation_data) + 0.5 * buckets["correctness"]
+    return buckets
+
+
+def normalize_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    """`weights` rescaled to sum to 100; buckets left out weigh 0."""
+    unknown = set(weights) - set(BUCKETS)
+    if unknown:
+        raise ValueError(f"Unknown scoring bucket(s): {sorted(unknown)} (expected {list(BUCKETS)})")
+    total = sum(float(weights.get(b, 0)) for b in BUCKETS)
+    if total <= 0:
+        raise ValueError("Scoring weights must sum to more than 0")
+    return {b: 100.0 * float(weights.get(b, 0)) / total for b in BUCKETS}
+
+
+def load_profiles(path: Optional[str] = PROFILES_FILE) -> Dict[str, Dict[str, float]]:
+    """
+    {name: weights} from a JSON file of {"<profile>": {"<bucket>": weight}},
+    weights normalized to 100. The built-in default profile is always present
+    unless the file redefines it.
+    """
+    profiles = {DEFAULT_PROFILE: dict(DEFAULT_WEIGHTS)}
+    if path:
+        try:
+            with open(path, "r") as f:
+                profiles.update(json.load(f))
+        except FileNotFoundError:
+            logger.warning(f"Scoring profiles file {path} not found; using the default profile only")
+    return {name: normalize_weights(weights) for name, weights in profiles.items()}
+
+
+def score_all(evaluation_data: dict, weights: Optional[Dict[str, float]] = None) -> dict:
     """
     Calculate weighted scores for all evaluation metrics.
-    Weights:
-      - Correctness (compilation + functionality): 40%
-      - Security: 25%
-      - Code Quality: 20%
-      - Advanced Features (and performance): 15%
+    Default weights (percent):
+      - Correctness (compilation + functionality): 40
+      - Security: 25
+      - Code Quality: 20
+      - Advanced Features: 15
+    Each bucket averages its checker's "metrics"; see bucket_values.
     """
     try:
-        # Correctness
-        compilation = evaluation_data.get("compilation", {})
-        functionality = evaluation_data.get("functionality", {})
-
-        correctness = 0.0
-        if compilation.get("success"):
-            correctness += 0.5  # compilation counts half
-        correctness += functionality.get("score", 0.0) * 0.5  # functionality counts half
-
-        # Security
-        security = evaluation_data.get("security", {})
-        security_score = security.get("score", 0.0)
-
-        # Code Quality
-        quality = evaluation_data.get("code_quality", {})
-        quality_score = quality.get("score", 0.0)
-
-        # Advanced Features
-        advanced = evaluation_data.get("advanced_features", {})
-        advanced_score = advanced.get("score", 0.0)
-
-        # Weighted score
-        overall_score = (
-            correctness * 40
-            + security_score * 25
-            + quality_score * 20
-            + advanced_score * 15
-        )
+        weights = normalize_weights(weights or DEFAULT_WEIGHTS)
+        buckets = bucket_values(evaluation_data)
+        overall_score = sum(buckets[b] * weights[b] for b in BUCKETS)
 
         return {
             "scores": {
-                "correctness": round(correctness * 100, 2),
-                "security": round(security_score * 100, 2),
-                "code_quality": round(quality_score * 100, 2),
-                "advanced": round(advanced_score * 100, 2),
+                "correctness": round(buckets["correctness"] * 100, 2),
+                "security": round(buckets["security"] * 100, 2),
+                "code_quality": round(buckets["code_quality"] * 100, 2),
+                "advanced": round(buckets["advanced"] * 100, 2),
                 "overall_score": round(overall_score, 2)
             }
         }
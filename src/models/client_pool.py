@@ -0,0 +1,150 @@
+import os
+import asyncio
+import inspect
+import itertools
+import threading
+import contextlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Open connections per endpoint (all event loops' sessions count separately)
+MAX_CONNECTIONS = int(os.getenv("TOGETHER_MAX_CONNECTIONS", "32"))
+KEEPALIVE_S = 30.0   # idle connections are kept this long
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ClientPool:
+    """
+    Up to `size` Together clients (sync and async) for one endpoint, created on
+    first use and handed out round-robin, plus the HTTP sessions behind them.
+
+    The SDK opens and closes a fresh aiohttp session for every async request
+    unless one is supplied through `together.aiosession`; `async_session()`
+    supplies the pool's own, one per event loop, whose connector keeps up to
+    `max_connections` keep-alive connections. Sync clients use the SDK's
+    per-thread requests.Session, which already keeps connections alive.
+    Safe to share between threads.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_retries: Optional[int] = None, size: int = 4,
+                 max_connections: int = MAX_CONNECTIONS, keepalive_s: float = KEEPALIVE_S):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.size = max(1, size)
+        self.max_connections = max(1, max_connections)
+        self.keepalive_s = keepalive_s
+        self._lock = threading.Lock()
+        self._clients: List = []
+        self._async_clients: List = []
+        self._sessions: Dict[asyncio.AbstractEventLoop, object] = {}
+        self._next = itertools.count()
+        self._next_async = itertools.count()
+
+    def _take(self, clients: List, counter, factory):
+        with self._lock:
+            if len(clients) < self.size:
+                clients.append(factory(base_url=self.base_url, max_retries=self.max_retries))
+                return clients[-1]
+            return clients[next(counter) % len(clients)]
+
+    def client(self):
+        from together import Together
+        return self._take(self._clients, self._next, Together)
+
+    def async_client(self):
+        from together import AsyncTogether
+        return self._take(self._async_clients, self._next_async, AsyncTogether)
+
+    def aio_session(self):
+        """The running loop's shared aiohttp session (aiohttp sessions are bound to one loop)."""
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_s)
+                session = self._sessions[loop] = aiohttp.ClientSession(connector=connector)
+            return session
+
+    @contextlib.contextmanager
+    def async_session(self) -> Iterator[None]:
+        """Sends the SDK's async requests made inside the block through `aio_session()`."""
+        import together
+        token = together.aiosession.set(self.aio_session())
+        try:
+            yield
+        finally:
+            together.aiosession.reset(token)
+
+    def _drain(self) -> Tuple[List, Dict]:
+        with self._lock:
+            clients = self._clients + self._async_clients
+            sessions = self._sessions
+            self._clients, self._async_clients, self._sessions = [], [], {}
+        return clients, sessions
+
+    def _close_clients(self, clients: List) -> List:
+        """Calls each client's close(); returns the awaitables async closers hand back."""
+        pending = []
+        for c in clients:
+            closer = getattr(c, "close", None) or getattr(c, "aclose", None)
+            if closer is None:
+                continue
+            try:
+                result = closer()
+                if inspect.isawaitable(result):
+                    pending.append(result)
+            except Exception as e:
+                logger.warning(f"Failed to close client for {self.base_url or 'default endpoint'}: {e}")
+        return pending
+
+    def close(self) -> None:
+        """
+        Closes every client and session from synchronous code (e.g. at exit).
+        Each session is closed on its own loop (one session per loop). On a
+        thread that is running a loop nothing can be awaited, so only sync
+        clients are closed there; use `aclose()` instead. A session whose loop
+        is already closed can't be closed any more and is dropped.
+        """
+        clients, sessions = self._drain()
+        pending = self._close_clients(clients)
+        if _running_loop() is not None:
+            if pending or sessions:
+                logger.warning("ClientPool.close() called on a running event loop; await aclose() instead")
+            for awaitable in pending:
+                if inspect.iscoroutine(awaitable):
+                    awaitable.close()
+            return
+        for loop, session in sessions.items():
+            if loop.is_closed():
+                logger.debug(f"Dropping an HTTP session whose event loop is closed ({self.base_url or 'default endpoint'})")
+                continue
+            loop.run_until_complete(self._gather([session.close()]))
+        if pending:   # async clients' closers, all on one private loop
+            asyncio.run(self._gather(pending))
+
+    async def _gather(self, pending: List) -> None:
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to close client for {self.base_url or 'default endpoint'}: {result}")
+
+    async def aclose(self) -> None:
+        """Closes every client, and the sessions of the running loop (other loops' via `close()`)."""
+        clients, sessions = self._drain()
+        loop = asyncio.get_running_loop()
+        pending = self._close_clients(clients)
+        pending += [s.close() for session_loop, s in sessions.items() if session_loop is loop]
+        others = {l: s for l, s in sessions.items() if l is not loop and not l.is_closed()}
+        if others:
+            with self._lock:
+                self._sessions.update(others)
+        await self._gather(pending)
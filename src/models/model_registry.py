@@ -1,4 +1,10 @@
+import os
+import atexit
+import threading
+from typing import Dict, Optional, Tuple
 from src.models.together import TogetherModel  
+from src.models.client_pool import ClientPool
+from src.models.response_cache import ResponseCache
 
 
 together_models = {
@@ -12,8 +18,61 @@ together_models = {
     "llama3_turbo": "meta-llama/Meta-Llama-3-70B-Instruct"
 }
 
-def get_model(key: str):
+# Clients per endpoint shared by every model handle in the process
+POOL_SIZE = int(os.getenv("TOGETHER_POOL_SIZE", "4"))
+
+_lock = threading.Lock()
+_pools: Dict[Tuple, ClientPool] = {}
+_models: Dict[Tuple, TogetherModel] = {}
+
+
+def set_pool_size(size: int) -> None:
+    """Pool size for endpoints first used after this call."""
+    global POOL_SIZE
+    POOL_SIZE = max(1, size)
+
+
+def get_pool(base_url: Optional[str] = None, max_retries: Optional[int] = None) -> ClientPool:
+    key = (base_url, max_retries)
+    with _lock:
+        if key not in _pools:
+            _pools[key] = ClientPool(base_url, max_retries, size=POOL_SIZE)
+        return _pools[key]
+
+
+def get_model(key: str, base_url: Optional[str] = None, max_retries: Optional[int] = None,
+              cache: Optional[ResponseCache] = None) -> TogetherModel:
+    """Process-wide handle for `key`; the same options always return the same instance."""
     model_name = together_models.get(key)
     if model_name is None:
         raise ValueError(f"Model key '{key}' not found.")
-    return TogetherModel(model_name)
\ No newline at end of file
+    cache_key = (cache.cache_dir, cache.mode) if cache else None
+    handle_key = (key, base_url, max_retries, cache_key)
+    pool = get_pool(base_url, max_retries)
+    with _lock:
+        if handle_key not in _models:
+            _models[handle_key] = TogetherModel(model_name, cache=cache, pool=pool, key=key)
+        return _models[handle_key]
+
+
+def _reset():
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _models.clear()
+    return pools
+
+
+def shutdown() -> None:
+    """Closes every pooled client and forgets cached handles (also runs at exit)."""
+    for pool in _reset():
+        pool.close()
+
+
+async def ashutdown() -> None:
+    """`shutdown` for code running on an event loop, so async clients close on it."""
+    for pool in _reset():
+        await pool.aclose()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,99 @@
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+RESPONSE_CACHE_DIR = ".cache/responses"
+# use: read hits, store misses | refresh: always call the API, overwrite | bypass: never touch the cache
+CACHE_MODES = ("use", "refresh", "bypass")
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Raw model responses on disk, gzip-compressed JSON, one file per
+    (model id, prompt hash, sampling parameters incl. seed).
+    """
+
+    def __init__(self, cache_dir: str = RESPONSE_CACHE_DIR, mode: str = "use"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown response cache mode {mode!r}; expected one of {CACHE_MODES}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+
+    def key_for(self, model_id: str, prompt: str, params: Dict) -> str:
+        ident = json.dumps({"model": model_id, "prompt": prompt_hash(prompt), "params": params},
+                           sort_keys=True, default=str)
+        return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def get_entry(self, model_id: str, prompt: str, params: Dict) -> Optional[Dict]:
+        """The whole entry: the response plus, once a sweep saved it, the sample "file"."""
+        if self.mode != "use":
+            return None
+        path = self._path(self.key_for(model_id, prompt, params))
+        entry = self._read(path)
+        if entry is not None:
+            logger.info(f"Response cache hit for {model_id}")
+        return entry
+
+    def get(self, model_id: str, prompt: str, params: Dict) -> Optional[str]:
+        entry = self.get_entry(model_id, prompt, params)
+        return entry["response"] if entry else None
+
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable response cache entry {path}: {e}")
+            return None
+
+    def _write(self, path: str, entry: Dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Failed to write response cache entry {path}: {e}")
+
+    def put(self, model_id: str, prompt: str, params: Dict, response: str) -> None:
+        if self.mode == "bypass":
+            return
+        path = self._path(self.key_for(model_id, prompt, params))
+        entry = {
+            "model": model_id,
+            "prompt_sha256": prompt_hash(prompt),
+            "params": params,
+            "created": datetime.now().isoformat(),
+            "response": response,
+        }
+        self._write(path, entry)
+
+    def set_file(self, model_id: str, prompt: str, params: Dict, file_path: str) -> None:
+        """
+        Records where a sweep saved this response, so a later hit reuses that
+        file instead of saving the same sample again under a new timestamp.
+        """
+        if self.mode == "bypass":
+            return
+        path = self._path(self.key_for(model_id, prompt, params))
+        entry = self._read(path)
+        if entry is not None and entry.get("file") != file_path:
+            self._write(path, {**entry, "file": file_path})
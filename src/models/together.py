@@ -1,22 +1,126 @@
-from together import Together
-from src.logger import logger
+import time
+from typing import AsyncIterator, Optional
+from src.logger import get_logger
+from src.models.client_pool import ClientPool
+from src.models.response_cache import ResponseCache
+from src.telemetry import TelemetryStore, default_store
+
+logger = get_logger(__name__)
+
+
+def _usage(response) -> tuple:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None, None
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
 
 class TogetherModel:
-    def __init__(self, model_name: str):
-        self.client = Together()
+    def __init__(self, model_name: str, base_url: Optional[str] = None, max_retries: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None, pool: Optional[ClientPool] = None,
+                 key: Optional[str] = None, telemetry: Optional[TelemetryStore] = None):
+        # base_url points the client at another OpenAI-compatible endpoint (e.g. a local fake server);
+        # handles built by the registry share its pool instead of owning a client each
+        self.pool = pool or ClientPool(base_url, max_retries, size=1)
+        self.cache = cache
         self.model_name = model_name
+        # API calls (not cache hits) are recorded under `key`, the name reports use for the model
+        self.key = key or model_name
+        self.telemetry = telemetry or default_store()
         logger.info(f"TogetherModel initialized with model: {model_name}")
 
-    def generate_code(self, prompt: str) -> str:
+    @property
+    def client(self):
+        return self.pool.client()
+
+    @property
+    def async_client(self):
+        return self.pool.async_client()
+
+    def generate_code(self, prompt: str, **params) -> str:
+        """`params` are sampling options (temperature, seed, ...); they are part of the cache key."""
+        cached = self.cache.get(self.model_name, prompt, params) if self.cache else None
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                **params
             )
-            code = response.choices[0].message.content
-            return code
         except Exception as e:
+            self.telemetry.record(self.key, "complete", time.perf_counter() - start, ok=False)
             logger.error(f"Together AI generation failed: {e}")
             raise
+        self.telemetry.record(self.key, "complete", time.perf_counter() - start, True, None, *_usage(response))
+        code = response.choices[0].message.content
+        if self.cache:
+            self.cache.put(self.model_name, prompt, params, code)
+        return code
+
+    async def agenerate_code(self, prompt: str, **params) -> str:
+        """Non-blocking `generate_code`; errors are raised for the caller to retry."""
+        cached = self.cache.get(self.model_name, prompt, params) if self.cache else None
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        try:
+            with self.pool.async_session():
+                response = await self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    **params
+                )
+        except Exception:
+            self.telemetry.record(self.key, "complete", time.perf_counter() - start, ok=False)
+            raise
+        self.telemetry.record(self.key, "complete", time.perf_counter() - start, True, None, *_usage(response))
+        code = response.choices[0].message.content
+        if self.cache:
+            self.cache.put(self.model_name, prompt, params, code)
+        return code
+
+    async def astream_code(self, prompt: str, **params) -> AsyncIterator[str]:
+        """
+        Yields the completion as text deltas while it is generated. A cached
+        response comes back as one delta; a finished stream is cached.
+        """
+        cached = self.cache.get(self.model_name, prompt, params) if self.cache else None
+        if cached is not None:
+            yield cached
+            return
+        start = time.perf_counter()
+        ttft = None
+        usage = (None, None)
+        parts = []
+        try:
+            # the stream keeps the session it was opened on; the context can be reset before iterating
+            with self.pool.async_session():
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    stream=True,
+                    **params
+                )
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:   # sent with the last chunk
+                    usage = _usage(chunk)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    parts.append(delta)
+                    yield delta
+        except BaseException:
+            self.telemetry.record(self.key, "stream", time.perf_counter() - start, False, ttft)
+            raise
+        self.telemetry.record(self.key, "stream", time.perf_counter() - start, True, ttft, *usage)
+        if self.cache:
+            self.cache.put(self.model_name, prompt, params, "".join(parts))
@@ -0,0 +1,130 @@
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+from src.logger import get_logger
+from src.batch import write_batch_summary
+from src.cache import ResultCache, CACHE_DIR
+from src.compiler import CompileService
+from src.evaluator import evaluate_file_async
+from src.models.model_registry import ashutdown
+from src.models.response_cache import ResponseCache
+from src.streaming import overall_score_of
+from src.utils import load_env
+from src.sweep import (
+    DEFAULT_BURST, DEFAULT_MAX_IN_FLIGHT, DEFAULT_MAX_RETRIES, DEFAULT_RATE,
+    add_generation_arguments, generate_sample, generation_inputs, prepare_models, sample_jobs,
+    write_sweep_results,
+)
+
+logger = get_logger(__name__)
+
+# Finished generations waiting for evaluation; producers block (and stop
+# sending requests) once this many are queued.
+DEFAULT_QUEUE_SIZE = 32
+
+
+async def run_pipeline(model_keys: List[str], prompts: Dict[str, str], samples: int, output_dir: str,
+                       reports_dir: str, queue_size: int = DEFAULT_QUEUE_SIZE,
+                       eval_workers: Optional[int] = None, rate: float = DEFAULT_RATE,
+                       burst: int = DEFAULT_BURST, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                       max_retries: int = DEFAULT_MAX_RETRIES, base_url: Optional[str] = None,
+                       params: Optional[Dict] = None, cache: Optional[ResponseCache] = None, seed: int = 0,
+                       stream: bool = False, result_cache: Optional[ResultCache] = None,
+                       compiler: Optional[CompileService] = None) -> List[Dict]:
+    """
+    Generation and evaluation in one loop. `max_in_flight` producer tasks take
+    requests from a shared job list and put each saved sample on a bounded
+    queue; `eval_workers` consumers evaluate from it while other requests are
+    still pending. A full queue blocks the producers, so no new requests go
+    out until evaluation catches up. Rows come back in model/prompt/sample order,
+    with `overall_score` filled in.
+    """
+    models, buckets = prepare_models(model_keys, rate, burst, base_url, cache)
+    in_flight = asyncio.Semaphore(max_in_flight)
+    compiler = compiler or CompileService()
+    eval_workers = eval_workers or compiler.concurrency
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    jobs = iter(sample_jobs(model_keys, prompts, samples))
+    rows: Dict[tuple, Dict] = {}
+    reports: Dict[str, Optional[Dict]] = {}
+    start = time.perf_counter()
+    high_water = 0
+
+    async def produce() -> None:
+        nonlocal high_water
+        for k, name, text, s in jobs:   # shared iterator: each job goes to exactly one producer
+            row = await generate_sample(k, models[k], name, text, s, buckets[k], in_flight, output_dir,
+                                        max_retries, {**(params or {}), "seed": seed + s}, stream)
+            rows[(k, name, s)] = row
+            if row["ok"]:
+                await queue.put(row)
+                high_water = max(high_water, queue.qsize())
+
+    async def consume() -> None:
+        while True:
+            row = await queue.get()
+            if row is None:
+                return
+            report = await evaluate_file_async(row["file"], reports_dir, result_cache, compiler)
+            reports[row["file"]] = report
+            row["overall_score"] = overall_score_of(report)
+
+    logger.info(f"Pipeline: {len(model_keys) * len(prompts) * samples} request(s), {max_in_flight} in flight, "
+                f"{eval_workers} evaluation worker(s), queue of {queue_size}")
+    consumers = [asyncio.ensure_future(consume()) for _ in range(eval_workers)]
+    try:
+        await asyncio.gather(*(produce() for _ in range(max_in_flight)))
+        generated = time.perf_counter() - start
+        for _ in consumers:
+            await queue.put(None)
+        await asyncio.gather(*consumers)
+    finally:
+        for c in consumers:
+            c.cancel()
+    total = time.perf_counter() - start
+    logger.info(f"Pipeline: generation done after {generated:.1f}s, evaluation after {total:.1f}s "
+                f"(queue peaked at {high_water}/{queue_size})")
+
+    ordered = [rows[(k, name, s)] for k, name, _, s in sample_jobs(model_keys, prompts, samples)]
+    evaluated = [r["file"] for r in ordered if r["ok"]]
+    write_batch_summary(evaluated, [reports.get(p) for p in evaluated], reports_dir)
+    return ordered
+
+
+def main(argv: Optional[List[str]] = None):
+    load_env()
+    parser = argparse.ArgumentParser(description="Generate and evaluate in one run, connected by a bounded queue")
+    add_generation_arguments(parser)
+    parser.add_argument("--reports", default="reports", help="Reports output dir")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Generated samples allowed to wait for evaluation before generation pauses")
+    parser.add_argument("--eval-workers", type=int, default=None,
+                        help="Concurrent evaluations (default: --compile-jobs)")
+    parser.add_argument("--compile-jobs", type=int, default=None,
+                        help="Concurrent gcc runs (default: CPU count)")
+    parser.add_argument("--no-result-cache", action="store_true", help="Always re-evaluate")
+    args = parser.parse_args(argv)
+    model_keys, prompts = generation_inputs(parser, args)
+
+    async def _run() -> List[Dict]:
+        try:
+            return await run_pipeline(
+                model_keys, prompts, args.samples, args.output, args.reports,
+                queue_size=args.queue_size, eval_workers=args.eval_workers, rate=args.rate,
+                burst=args.burst, max_in_flight=args.max_in_flight, max_retries=args.max_retries,
+                base_url=args.base_url, cache=ResponseCache(args.cache_dir, args.cache_mode), seed=args.seed,
+                stream=args.stream, result_cache=None if args.no_result_cache else ResultCache(CACHE_DIR),
+                compiler=CompileService(args.compile_jobs),
+            )
+        finally:
+            await ashutdown()
+
+    start = time.perf_counter()
+    rows = asyncio.run(_run())
+    write_sweep_results(rows, args.output, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+import contextlib
+import contextvars
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_DIR = "logs/profile"
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples for the collapsed-stack file
+# samples whose innermost frame is a blocking wait in one of these are idle, not work
+IDLE_LEAF_FILES = {"threading.py", "queue.py", "selectors.py", "handlers.py", "unix_events.py"}
+PROFILE_SUMMARY_FILE = "profile_summary.json"
+
+try:
+    import resource
+except ImportError:   # Windows: no child CPU accounting
+    resource = None
+
+# stage -> record for the work in progress, and the spans open in this task/thread
+_sink: contextvars.ContextVar = contextvars.ContextVar("profile_sink", default=None)
+_open: contextvars.ContextVar = contextvars.ContextVar("profile_open", default=())
+
+_active = False
+
+
+def is_active() -> bool:
+    """True inside `profile_run`: memory is traced and stages should run one at a time."""
+    return _active
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _OpenSpan:
+    __slots__ = ("name", "start_mem", "peak")
+
+    def __init__(self, name: str, start_mem: int):
+        self.name = name
+        self.start_mem = start_mem
+        self.peak = start_mem
+
+
+@contextlib.contextmanager
+def collect() -> Iterator[Dict[str, Dict]]:
+    """Spans finished inside the block (in this task, or threads given its context) land in the dict."""
+    stages: Dict[str, Dict] = {}
+    token = _sink.set(stages)
+    try:
+        yield stages
+    finally:
+        _sink.reset(token)
+
+
+def _raise_outer_peaks(stack: Tuple[_OpenSpan, ...]) -> None:
+    _, peak = tracemalloc.get_traced_memory()
+    for outer in stack:
+        outer.peak = max(outer.peak, peak)
+
+
+@contextlib.contextmanager
+def span(name: str, children: bool = False) -> Iterator[Dict]:
+    """
+    Times one stage: wall_s and cpu_s (this thread's CPU). With `children`,
+    it also records child_cpu_s (finished subprocesses, e.g. gcc). Inside
+    `profile_run` it adds peak_kb, the most traced memory above the stage's
+    start. Nested spans are recorded as "outer.inner". The record is yielded
+    and filled in on exit. CPU and memory are only per stage when stages do
+    not overlap, which is why profiled runs execute them one at a time.
+    """
+    record: Dict = {}
+    stack = _open.get()
+    current = None
+    if tracemalloc.is_tracing():
+        _raise_outer_peaks(stack)   # reset_peak below would lose what they have seen so far
+        tracemalloc.reset_peak()
+        current = _OpenSpan(name, tracemalloc.get_traced_memory()[0])
+    key = ".".join([s.name for s in stack] + [name])
+    token = _open.set(stack + (current or _OpenSpan(name, 0),))
+    child0 = _children_cpu() if children else 0.0
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = round(time.perf_counter() - wall0, 5)
+        record["cpu_s"] = round(time.thread_time() - cpu0, 5)
+        if children:
+            record["child_cpu_s"] = round(_children_cpu() - child0, 5)
+        _open.reset(token)
+        if current is not None and tracemalloc.is_tracing():
+            _raise_outer_peaks(stack + (current,))
+            record["peak_kb"] = round((current.peak - current.start_mem) / 1024, 1)
+        sink = _sink.get()
+        if sink is not None:
+            sink[key] = record
+
+
+def traced(name: str, func: Callable, *args, **kwargs):
+    """`func(*args, **kwargs)` inside `span(name)`; handy for work handed to a thread pool."""
+    with span(name):
+        return func(*args, **kwargs)
+
+
+class StackSampler:
+    """
+    Samples every thread's Python stack each `interval` seconds and counts
+    them as collapsed stacks ("outer;inner;leaf count"), the input format of
+    flamegraph.pl and speedscope. Covers threads cProfile cannot see; threads
+    blocked in a wait (see IDLE_LEAF_FILES) are skipped.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or os.path.basename(frame.f_code.co_filename) in IDLE_LEAF_FILES:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextlib.contextmanager
+def profile_run(name: str, out_dir: str = PROFILE_DIR) -> Iterator[Dict[str, Dict]]:
+    """
+    Profiles the block: tracemalloc is on (spans get peak_kb), cProfile stats
+    go to <out_dir>/<name>_<ts>.prof and sampled stacks to .collapsed. It
+    yields a collect() dict for spans that are not part of a report.
+    """
+    global _active
+    import cProfile   # only profiled runs pay for it
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    sampler = StackSampler()
+    profiler = cProfile.Profile()
+    _active = True
+    sampler.start()
+    profiler.enable()
+    try:
+        with collect() as stages:
+            yield stages
+    finally:
+        profiler.disable()
+        sampler.stop()
+        _active = False
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.dump_stats(f"{base}.prof")
+        sampler.write(f"{base}.collapsed")
+        logger.info(f"Profile written to {base}.prof and {base}.collapsed "
+                    f"(e.g. python -m pstats {base}.prof, flamegraph.pl {base}.collapsed > flame.svg)")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    xs = sorted(values)
+    return xs[min(len(xs) - 1, int(round((len(xs) - 1) * q / 100)))]
+
+
+def aggregate_profiles(profiles: List[Optional[Dict[str, Dict]]]) -> Dict[str, Dict]:
+    """
+    Per stage over many reports' "profile" sections: count, total/mean/p95
+    wall seconds, total CPU (own and child) and the largest peak_kb, plus
+    each stage's share of all top-level wall time.
+    """
+    by_stage: Dict[str, List[Dict]] = {}
+    for profile in profiles:
+        for stage, record in (profile or {}).items():
+            by_stage.setdefault(stage, []).append(record)
+    top_level_wall = sum(r["wall_s"] for stage, rs in by_stage.items() if "." not in stage for r in rs) or 1.0
+    summary = {}
+    for stage, records in sorted(by_stage.items()):
+        walls = [r["wall_s"] for r in records]
+        peaks = [r["peak_kb"] for r in records if "peak_kb" in r]
+        summary[stage] = {
+            "count": len(records),
+            "wall_s": round(sum(walls), 4),
+            "mean_wall_s": round(sum(walls) / len(walls), 5),
+            "p95_wall_s": round(_percentile(walls, 95), 5),
+            "cpu_s": round(sum(r.get("cpu_s", 0.0) for r in records), 4),
+            "child_cpu_s": round(sum(r.get("child_cpu_s", 0.0) for r in records), 4),
+            "max_peak_kb": max(peaks) if peaks else None,
+            "share": round(sum(walls) / top_level_wall, 4) if "." not in stage else None,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate per-stage profile records across evaluation reports")
+    parser.add_argument("--reports", default="reports", help="Directory with *_evaluation.json reports")
+    parser.add_argument("--output", default=None, help=f"Output JSON (default: <reports>/{PROFILE_SUMMARY_FILE})")
+    args = parser.parse_args()
+
+    profiles = []
+    for path in glob.glob(os.path.join(args.reports, "*_evaluation.json")):
+        try:
+            with open(path, "r") as f:
+                profiles.append(json.load(f).get("profile"))
+        except Exception as e:
+            logger.error(f"Failed to parse {path}: {e}")
+    summary = aggregate_profiles(profiles)
+    output = args.output or os.path.join(args.reports, PROFILE_SUMMARY_FILE)
+    with open(output, "w") as f:
+        json.dump({"reports": len(profiles), "stages": summary}, f, indent=4)
+
+    print(f"{'stage':<32} {'count':>7} {'wall_s':>10} {'share':>7} {'p95_s':>9} {'cpu_s':>9} {'peak_kb':>9}")
+    for stage, s in sorted(summary.items(), key=lambda kv: -kv[1]["wall_s"]):
+        share = f"{s['share']:.1%}" if s["share"] is not None else ""
+        peak = s["max_peak_kb"] if s["max_peak_kb"] is not None else ""
+        print(f"{stage:<32} {s['count']:>7} {s['wall_s']:>10} {share:>7} {s['p95_wall_s']:>9} {s['cpu_s']:>9} {peak:>9}")
+    logger.info(f"Profile summary of {len(profiles)} report(s) saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.logger import get_logger
+from src.utils import extract_model_prompt
+
+logger = get_logger(__name__)
+
+DB_FILE = "results.db"
+DEFAULT_RUN = "default"
+
+COLUMNS = ["file", "model", "prompt", "run", "overall_score", "compilation_success",
+           "compilation_errors", "compilation_warnings", "report", "timestamp"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    file TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    run TEXT NOT NULL,
+    overall_score REAL,
+    compilation_success INTEGER,
+    compilation_errors INTEGER,
+    compilation_warnings INTEGER,
+    report TEXT,
+    timestamp TEXT,
+    updated REAL,
+    PRIMARY KEY (file, model, prompt, run)
+);
+CREATE INDEX IF NOT EXISTS results_by_score ON results (run, overall_score DESC);
+CREATE INDEX IF NOT EXISTS results_by_model ON results (run, model, overall_score);
+
+-- per-model totals kept current by triggers, so model tables never scan results
+CREATE TABLE IF NOT EXISTS model_totals (
+    run TEXT NOT NULL,
+    model TEXT NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (run, model)
+);
+CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+    INSERT INTO model_totals (run, model, samples, score_sum) VALUES (new.run, new.model, 1, COALESCE(new.overall_score, 0))
+    ON CONFLICT (run, model) DO UPDATE SET samples = samples + 1, score_sum = score_sum + excluded.score_sum;
+END;
+CREATE TRIGGER IF NOT EXISTS results_au AFTER UPDATE OF overall_score ON results BEGIN
+    UPDATE model_totals SET score_sum = score_sum - COALESCE(old.overall_score, 0) + COALESCE(new.overall_score, 0)
+    WHERE run = new.run AND model = new.model;
+END;
+CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+    UPDATE model_totals SET samples = samples - 1, score_sum = score_sum - COALESCE(old.overall_score, 0)
+    WHERE run = old.run AND model = old.model;
+END;
+"""
+
+UPSERT = f"""
+INSERT INTO results ({", ".join(COLUMNS)}, updated) VALUES ({", ".join("?" * (len(COLUMNS) + 1))})
+ON CONFLICT (file, model, prompt, run) DO UPDATE SET
+""" + ",\n".join(f"    {c} = excluded.{c}" for c in COLUMNS[4:] + ["updated"])
+
+
+def current_run() -> str:
+    """Run label for new rows; evaluations of one file in different runs are kept side by side."""
+    return os.getenv("EVAL_RUN", DEFAULT_RUN)
+
+
+def db_path_for(output_dir: str) -> str:
+    return os.path.join(output_dir, DB_FILE)
+
+
+def row_from_report(report: Dict, report_path: Optional[str] = None, run: Optional[str] = None) -> Dict:
+    """Leaderboard columns of one evaluation report."""
+    file_path = report.get("file") or report_path or ""
+    model, prompt = extract_model_prompt(file_path)
+    metrics = report.get("overall_score", {})
+    if isinstance(metrics, (int, float)):
+        overall_score = metrics
+    else:
+        overall_score = metrics.get("scores", metrics).get("overall_score", 0)
+    compilation = report.get("compilation", {})
+    return {
+        "file": file_path,
+        "model": report.get("model") or model,
+        "prompt": prompt,
+        "run": run or current_run(),
+        "overall_score": overall_score,
+        "compilation_success": bool(compilation.get("success", False)),
+        "compilation_errors": compilation.get("errors_count", 0),
+        "compilation_warnings": compilation.get("warnings_count", 0),
+        "report": report_path,
+        "timestamp": report.get("timestamp"),
+    }
+
+
+class ResultsDB:
+    """
+    Indexed SQLite table of evaluation results, one row per (file, model,
+    prompt, run). Reports are upserted as they are saved, so leaderboards
+    come from index scans instead of re-reading every JSON report. WAL mode
+    lets worker processes write while a summary reads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def upsert(self, rows: List[Dict]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(UPSERT, [[r[c] for c in COLUMNS] + [now] for r in rows])
+
+    def count(self, run: Optional[str] = None) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM results WHERE run = ?", (run or current_run(),)).fetchone()[0]
+
+    def runs(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT run FROM results ORDER BY run")]
+
+    def rows(self, run: Optional[str] = None) -> Iterator[Dict]:
+        """Every row of `run`, best score first, streamed from the score index."""
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM results WHERE run = ? ORDER BY overall_score DESC",
+            (run or current_run(),))
+        for r in cursor:
+            yield dict(r)
+
+    def top(self, k: int, run: Optional[str] = None, model: Optional[str] = None) -> List[Dict]:
+        """The `k` best rows of `run` (optionally one model's), read off the index."""
+        where, args = "run = ?", [run or current_run()]
+        if model is not None:
+            where, args = where + " AND model = ?", args + [model]
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM results WHERE {where} ORDER BY overall_score DESC LIMIT ?",
+            args + [k])
+        return [dict(r) for r in cursor]
+
+    def scores(self, run: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """(model, prompt, overall_score) of every row of `run`, for the statistical tables."""
+        cursor = self.conn.execute("SELECT model, prompt, COALESCE(overall_score, 0) FROM results WHERE run = ?",
+                                   (run or current_run(),))
+        return cursor.fetchall()
+
+    def model_scores(self, run: Optional[str] = None) -> Dict[str, Dict]:
+        """{model: {"samples", "mean_score"}} for `run`."""
+        cursor = self.conn.execute(
+            "SELECT model, samples, score_sum FROM model_totals WHERE run = ? AND samples > 0",
+            (run or current_run(),))
+        return {m: {"samples": n, "mean_score": round(total / n, 2)} for m, n, total in cursor}
+
+
+# One connection per (process, thread, path): sqlite3 connections must not cross
+# threads, and forked pool workers must not reuse the parent's.
+_local = threading.local()
+
+
+def _shared(path: str) -> ResultsDB:
+    dbs = getattr(_local, "dbs", None)
+    if dbs is None or getattr(_local, "pid", None) != os.getpid():
+        dbs = _local.dbs = {}
+        _local.pid = os.getpid()
+    if path not in dbs:
+        dbs[path] = ResultsDB(path)
+    return dbs[path]
+
+
+def record_report(report: Dict, report_path: str, output_dir: str, run: Optional[str] = None) -> None:
+    """Upserts `report` into `output_dir`'s results database; failures are logged, not raised."""
+    try:
+        _shared(db_path_for(output_dir)).upsert([row_from_report(report, report_path, run)])
+    except Exception as e:
+        logger.warning(f"Failed to record {report_path} in the results database: {e}")
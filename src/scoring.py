@@ -0,0 +1,163 @@
+import os
+import csv
+import glob
+import json
+import argparse
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.logger import get_logger
+from src.metrics import BUCKETS, BUCKET_SOURCES, PROFILES_FILE, checker_metrics, compile_credit, load_profiles
+from src.utils import extract_model_prompt
+
+logger = get_logger(__name__)
+
+CORRECTNESS = BUCKETS.index("correctness")
+
+
+class MetricTable(NamedTuple):
+    """Checker metrics of N reports, one row per report."""
+    files: List[str]
+    models: List[str]
+    prompts: List[str]
+    columns: List[Tuple[str, str]]   # (checker key, metric name) per column of `values`
+    values: np.ndarray               # (N, C) float64, NaN where a report lacks the metric
+    compiled: np.ndarray             # (N,) float64, metrics.compile_credit of each report
+
+
+def metric_table(reports: Iterable[Dict]) -> MetricTable:
+    """
+    Packs the "metrics" sub-dicts of the bucket checkers into one array.
+    Only those small dicts are kept while reading, never whole reports.
+    """
+    files, models, prompts, compiled = [], [], [], []
+    # (row, column, value) triples, scattered into the array in one assignment at the end
+    row_idx, col_idx, flat = [], [], []
+    columns: Dict[Tuple[str, str], int] = {}
+    for i, report in enumerate(reports):
+        file_path = report.get("file") or ""
+        model, prompt = extract_model_prompt(file_path)
+        files.append(file_path)
+        models.append(report.get("model") or model)
+        prompts.append(prompt)
+        compiled.append(compile_credit(report))
+        for key in BUCKET_SOURCES.values():
+            for name, value in checker_metrics(report, key).items():
+                row_idx.append(i)
+                col_idx.append(columns.setdefault((key, name), len(columns)))
+                flat.append(value)
+
+    values = np.full((len(files), len(columns)), np.nan)
+    values[row_idx, col_idx] = flat
+    return MetricTable(files, models, prompts, list(columns), values, np.asarray(compiled, dtype=float))
+
+
+def load_reports(reports_dir: str, pattern: str = "*_evaluation.json") -> Iterable[Dict]:
+    """Reports in `reports_dir`, one at a time; unreadable files are logged and skipped."""
+    for path in sorted(glob.glob(os.path.join(reports_dir, pattern))):
+        try:
+            with open(path, "r") as f:
+                yield json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to parse {path}: {e}")
+
+
+def bucket_matrix(table: MetricTable) -> np.ndarray:
+    """(N, len(BUCKETS)) in [0, 1], the vectorized form of metrics.bucket_values."""
+    n = len(table.files)
+    buckets = np.zeros((n, len(BUCKETS)))
+    checkers = np.array([key for key, _ in table.columns]) if table.columns else np.array([], dtype=str)
+    for b, key in enumerate(BUCKET_SOURCES.values()):
+        block = table.values[:, checkers == key]
+        present = ~np.isnan(block)
+        counts = present.sum(axis=1)
+        sums = np.where(present, block, 0.0).sum(axis=1)
+        np.divide(sums, counts, out=buckets[:, b], where=counts > 0)
+    buckets[:, CORRECTNESS] = 0.5 * table.compiled + 0.5 * buckets[:, CORRECTNESS]
+    return buckets
+
+
+def weight_matrix(profiles: Dict[str, Dict[str, float]]) -> Tuple[List[str], np.ndarray]:
+    """(profile names, (P, len(BUCKETS)) weights in percent) from load_profiles output."""
+    names = list(profiles)
+    weights = np.array([[profiles[p][b] for b in BUCKETS] for p in names], dtype=float)
+    return names, weights.reshape(len(names), len(BUCKETS))
+
+
+def rescore(buckets: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """(N, P) overall scores, every report under every profile, in one matrix product."""
+    return buckets @ weights.T
+
+
+def group_means(keys: List[str], scores: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """(sorted unique keys, sample count per key, (K, P) mean score per key and profile)."""
+    names, inverse, counts = np.unique(np.asarray(keys), return_inverse=True, return_counts=True)
+    sums = np.zeros((len(names), scores.shape[1]))
+    np.add.at(sums, inverse, scores)
+    return list(names), counts, sums / counts[:, None]
+
+
+def ranks(means: np.ndarray) -> np.ndarray:
+    """1-based rank of each row within each profile column (1 = best)."""
+    order = np.argsort(-means, axis=0, kind="stable")
+    result = np.empty_like(order)
+    np.put_along_axis(result, order, np.arange(1, means.shape[0] + 1)[:, None], axis=0)
+    return result
+
+
+def _write_rows(path: str, header: List[str], rows: Iterable[List]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    logger.info(f"Rescored table written to {path}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Re-score existing reports under one or more weight profiles")
+    parser.add_argument("--reports", default="reports", help="Directory with *_evaluation.json reports")
+    parser.add_argument("--profiles", default=PROFILES_FILE, help="JSON file of {profile: {bucket: weight}}")
+    parser.add_argument("--profile", action="append", default=None,
+                        help="Profile to apply (repeatable; default: every profile in the file)")
+    parser.add_argument("--by", choices=["model", "prompt"], default="model", help="Grouping of the summary table")
+    parser.add_argument("--csv", default="reports/rescored.csv", help="Per-report scores under each profile")
+    parser.add_argument("--summary-csv", default="reports/rescored_summary.csv",
+                        help="Mean score and rank per group under each profile")
+    args = parser.parse_args(argv)
+
+    profiles = load_profiles(args.profiles)
+    if args.profile:
+        missing = [p for p in args.profile if p not in profiles]
+        if missing:
+            parser.error(f"unknown profile(s) {missing}; available: {sorted(profiles)}")
+        profiles = {p: profiles[p] for p in args.profile}
+
+    table = metric_table(load_reports(args.reports))
+    if not table.files:
+        logger.warning(f"No reports found in {args.reports}")
+        return
+    names, weights = weight_matrix(profiles)
+    buckets = bucket_matrix(table)
+    scores = rescore(buckets, weights)
+
+    _write_rows(args.csv, ["file", "model", "prompt", *BUCKETS, *names],
+                ([f, m, p, *np.round(b * 100, 2), *np.round(s, 2)]
+                 for f, m, p, b, s in zip(table.files, table.models, table.prompts, buckets, scores)))
+
+    keys, counts, means = group_means(table.models if args.by == "model" else table.prompts, scores)
+    rank = ranks(means)
+    _write_rows(args.summary_csv, [args.by, "samples", *names, *(f"rank_{n}" for n in names)],
+                ([k, int(c), *np.round(m, 2), *r] for k, c, m, r in zip(keys, counts, means, rank)))
+
+    width = max(12, *(len(n) for n in names))
+    print(f"{args.by:<24} {'samples':>8} " + " ".join(f"{n:>{width}}" for n in names))
+    for i in np.argsort(rank[:, 0], kind="stable"):
+        cells = " ".join(f"{f'{means[i, j]:.2f} (#{rank[i, j]})':>{width}}" for j in range(len(names)))
+        print(f"{keys[i]:<24} {int(counts[i]):>8} {cells}")
+    logger.info(f"Re-scored {len(table.files)} report(s) under {len(names)} profile(s)")
+
+
+if __name__ == "__main__":
+    main()
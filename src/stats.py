@@ -0,0 +1,100 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+RESAMPLES = 10000
+CONFIDENCE = 0.95
+PERCENTILES = (25, 50, 75)
+# Distinct values resampled per group. Beyond this, scores are pooled into equal-width
+# bins represented by their members' mean (exact group mean; spread within a bin of
+# width range/MAX_SUPPORT is dropped, far below the bootstrap's own noise).
+MAX_SUPPORT = 50
+
+
+def support(scores: np.ndarray, max_support: int = MAX_SUPPORT) -> Tuple[np.ndarray, np.ndarray]:
+    """(values, counts) describing `scores`: its distinct values, or binned ones past `max_support`."""
+    values, counts = np.unique(scores, return_counts=True)
+    if len(values) <= max_support:
+        return values, counts
+    width = (values[-1] - values[0]) / max_support
+    bins = np.minimum(((values - values[0]) / width).astype(int), max_support - 1)
+    binned_counts = np.bincount(bins, weights=counts, minlength=max_support)
+    binned_sums = np.bincount(bins, weights=values * counts, minlength=max_support)
+    keep = binned_counts > 0
+    return binned_sums[keep] / binned_counts[keep], binned_counts[keep].astype(np.int64)
+
+
+def bootstrap_means(scores: np.ndarray, resamples: int, rng: np.random.Generator,
+                    max_support: int = MAX_SUPPORT) -> np.ndarray:
+    """
+    `resamples` bootstrap means of `scores`. Drawing n values with replacement
+    only matters through how often each value is drawn, so each resample is one
+    multinomial count vector over the distinct values: cost resamples x values,
+    not resamples x n.
+    """
+    values, counts = support(scores, max_support)
+    n = int(counts.sum())
+    draws = rng.multinomial(n, counts / n, size=resamples)
+    return draws @ values / n
+
+
+def group_bootstrap(keys: Sequence[str], scores: np.ndarray, resamples: int = RESAMPLES,
+                    confidence: float = CONFIDENCE, seed: int = 0,
+                    percentiles: Sequence[float] = PERCENTILES) -> Tuple[List[Dict], np.ndarray]:
+    """
+    Per distinct key (sorted): samples, mean, `percentiles` and a percentile
+    bootstrap CI of the mean. Also returns the (resamples, groups) matrix of
+    bootstrap means, the input of rank_probabilities.
+    """
+    scores = np.asarray(scores, dtype=float)
+    names, inverse, counts = np.unique(np.asarray(keys), return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    rng = np.random.default_rng(seed)
+    boot = np.empty((resamples, len(names)))
+    rows = []
+    for g, name in enumerate(names):
+        group = scores[order[bounds[g]:bounds[g + 1]]]
+        boot[:, g] = bootstrap_means(group, resamples, rng)
+        row = {"group": str(name), "samples": int(counts[g]), "mean": float(group.mean())}
+        for q, value in zip(percentiles, np.percentile(group, percentiles)):
+            row[f"p{q}"] = float(value)
+        rows.append(row)
+    if len(names):
+        tail = (1 - confidence) / 2 * 100
+        low, high = np.percentile(boot, [tail, 100 - tail], axis=0)
+        for row, lo, hi in zip(rows, low, high):
+            row["ci_low"], row["ci_high"] = float(lo), float(hi)
+    return rows, boot
+
+
+def rank_probabilities(boot: np.ndarray) -> np.ndarray:
+    """
+    (groups, groups) matrix: entry [g, k] is the share of resamples in which
+    group g has rank k + 1 (highest mean first).
+    """
+    resamples, groups = boot.shape
+    ranks = np.argsort(np.argsort(-boot, axis=1, kind="stable"), axis=1)
+    cells = (np.arange(groups) * groups + ranks).ravel()
+    return np.bincount(cells, minlength=groups * groups).reshape(groups, groups) / max(resamples, 1)
+
+
+def leaderboard(keys: Sequence[str], scores: np.ndarray, resamples: int = RESAMPLES,
+                confidence: float = CONFIDENCE, seed: int = 0) -> List[Dict]:
+    """
+    group_bootstrap rows, best mean first, plus p_best (probability of rank 1)
+    and expected_rank over the same resamples.
+    """
+    rows, boot = group_bootstrap(keys, scores, resamples, confidence, seed)
+    if not rows:
+        return rows
+    probs = rank_probabilities(boot)
+    expected = probs @ np.arange(1, len(rows) + 1)
+    for row, p, e in zip(rows, probs, expected):
+        row["p_best"] = float(p[0])
+        row["expected_rank"] = float(e)
+    return sorted(rows, key=lambda r: -r["mean"])
@@ -0,0 +1,88 @@
+import time
+import asyncio
+from typing import Dict, Optional
+
+from src.logger import get_logger
+from src.code_fences import FenceParser
+from src.utils import save_generated_code
+
+logger = get_logger(__name__)
+
+
+def _write(path: str, code: str) -> None:
+    with open(path, "w") as f:
+        f.write(code)
+
+
+async def _cancel(task: Optional[asyncio.Task]) -> None:
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def start_evaluation(path: str, reports_dir: Optional[str], result_cache=None, compiler=None) -> Optional[asyncio.Task]:
+    if not reports_dir:
+        return None
+    from src.evaluator import evaluate_file_async
+    return asyncio.ensure_future(evaluate_file_async(path, reports_dir, result_cache, compiler))
+
+
+def overall_score_of(report: Optional[Dict]) -> Optional[float]:
+    return report.get("overall_score", {}).get("scores", {}).get("overall_score") if report else None
+
+
+async def finish_evaluation(row: Dict, evaluation: Optional[asyncio.Task]) -> Dict:
+    """Waits for the evaluation started for `row` and records its overall score."""
+    if evaluation is not None:
+        row["overall_score"] = overall_score_of(await evaluation)
+    return row
+
+
+async def stream_generation(model, prompt: str, params: Dict, row: Dict, output_dir: str,
+                            reports_dir: Optional[str] = None, result_cache=None,
+                            compiler=None) -> Optional[asyncio.Task]:
+    """
+    Streams one completion into a FenceParser. Each time a code fence closes,
+    the code so far is saved and (with `reports_dir`) its evaluation starts
+    right away, overlapping with the rest of the stream; a later block
+    supersedes the running evaluation. Fills in `row` with the saved file,
+    ttft_s, ttfcb_s (time to first closed code block), total_s and blocks,
+    and returns the evaluation still running for the final code.
+    """
+    parser = FenceParser()
+    evaluation: Optional[asyncio.Task] = None
+    evaluated = None
+    start = time.perf_counter()
+    row["ttft_s"] = row["ttfcb_s"] = None   # a retried stream starts over
+
+    async def speculate(code: str) -> None:
+        nonlocal evaluation, evaluated
+        await _cancel(evaluation)
+        if row["file"] is None:
+            row["file"] = save_generated_code(row["model"], code, output_path=output_dir,
+                                              prompt_name=row["prompt"], sample=row["sample"])
+        else:
+            _write(row["file"], code)
+        evaluated = code
+        evaluation = start_evaluation(row["file"], reports_dir, result_cache, compiler)
+
+    try:
+        async for delta in model.astream_code(prompt, **params):
+            if row["ttft_s"] is None:
+                row["ttft_s"] = round(time.perf_counter() - start, 3)
+            if parser.feed(delta):
+                if row["ttfcb_s"] is None:
+                    row["ttfcb_s"] = round(time.perf_counter() - start, 3)
+                    logger.info(f"{row['model']}/{row['prompt']}#{row['sample']}: first code block "
+                                f"after {row['ttfcb_s']}s, evaluating while the stream continues")
+                await speculate("\n\n".join(parser.blocks))
+        row["total_s"] = round(time.perf_counter() - start, 3)
+        row["blocks"] = len(parser.blocks)
+
+        final = parser.result()
+        if final != evaluated:   # no fenced block at all: fall back to the raw text, as before
+            await speculate(final)
+        return evaluation
+    except BaseException:
+        await _cancel(evaluation)
+        raise
@@ -3,67 +3,194 @@ import glob
 import csv
 import json
 import argparse
-from src.logger import logger
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from src.logger import get_logger
+from src.results_db import ResultsDB, db_path_for, row_from_report
+from src.stats import CONFIDENCE, RESAMPLES, leaderboard
+from src.telemetry import PERCENTILES, TELEMETRY_DIR, TelemetryStore, load_prices, summarize_model
 
+logger = get_logger(__name__)
 
-def _collect_report_rows(reports_dir: str, pattern: str = "*_evaluation.json") -> list:
+
+def import_reports(reports_dir: str, db: ResultsDB, pattern: str = "*_evaluation.json",
+                   run: Optional[str] = None) -> int:
+    """Backfills `db` from JSON reports written before the results database existed."""
     rows = []
     for file_path in glob.glob(os.path.join(reports_dir, pattern)):
         try:
             with open(file_path, "r") as f:
-                data = json.load(f)
-            metrics = data.get("overall_score", {})
-            # If metrics is just a number
-            overall_score = metrics if isinstance(metrics, (int, float)) else metrics.get("overall_score", 0)
-
-            row = {
-                "file": data.get("file"),
-                "model": data.get("model"),
-                "overall_score": overall_score,
-                "compilation_success": data.get("compilation", {}).get("success", False),
-                "compilation_errors": data.get("compilation", {}).get("errors_count", 0),
-                "compilation_warnings": data.get("compilation", {}).get("warnings_count", 0),
-            }
-            rows.append(row)
+                rows.append(row_from_report(json.load(f), file_path, run))
         except Exception as e:
             logger.error(f"Failed to parse {file_path}: {e}")
-    return rows
+    db.upsert(rows)
+    logger.info(f"Imported {len(rows)} report(s) from {reports_dir}")
+    return len(rows)
 
 
-def _write_csv(rows: list, csv_path: str, sort_by="overall_score", descending=True):
-    if not rows:
+def _write_csv(rows: Iterable[Dict], csv_path: str):
+    """Writes `rows` in the order given (the database already returns them ranked)."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
         logger.warning("No rows to write!")
         return
-    rows = sorted(rows, key=lambda r: r.get(sort_by, 0), reverse=descending)
     with open(csv_path, "w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=rows[0].keys())
+        writer = csv.DictWriter(csvfile, fieldnames=first.keys())
         writer.writeheader()
+        writer.writerow(first)
         writer.writerows(rows)
     logger.info(f"Summary CSV updated: {csv_path}")
 
 
-def _write_markdown(rows: list, md_path: str, limit: int = 10):
-    rows = sorted(rows, key=lambda r: r.get("overall_score", 0), reverse=True)
+def _write_markdown(top_rows: list, md_path: str):
     with open(md_path, "w") as mdfile:
         mdfile.write("# Evaluation Leaderboard\n\n")
         mdfile.write("| File | Model | Overall Score |\n")
         mdfile.write("|------|-------|---------------|\n")
-        for row in rows[:limit]:
+        for row in top_rows:
             mdfile.write(f"| {row['file']} | {row['model']} | {row['overall_score']} |\n")
     logger.info(f"Summary Markdown updated: {md_path}")
 
 
-def main():
+def _model_rows(scores: Dict[str, Dict], store: TelemetryStore, prices: Dict[str, Dict[str, float]]) -> List[Dict]:
+    """
+    One row per model: mean quality score next to call latency percentiles,
+    throughput and cost from telemetry. `s_per_point` is median latency per
+    score point (lower is better).
+    """
+    model_rows = []
+    for model in sorted(set(scores) | set(store.models())):
+        samples = scores.get(model, {}).get("samples", 0)
+        mean_score = scores.get(model, {}).get("mean_score")
+        stats = summarize_model(store.load(model), prices.get(model))
+        p50 = stats["latency_p50_s"]
+        cost = stats["cost_usd"]
+        model_rows.append({
+            "model": model,
+            "samples": samples,
+            "mean_score": mean_score,
+            **stats,
+            "cost_per_sample_usd": round(cost / samples, 5) if cost is not None and samples else None,
+            "s_per_point": round(p50 / mean_score, 4) if p50 is not None and mean_score else None,
+        })
+    return model_rows
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else str(value)
+
+
+def _write_model_markdown(model_rows: list, md_path: str):
+    latency_cols = [f"latency_p{q}_s" for q in PERCENTILES]
+    with open(md_path, "a") as mdfile:
+        mdfile.write("\n## Models: quality, latency and cost\n\n")
+        mdfile.write("| Model | Samples | Mean Score | " + " | ".join(f"p{q} (s)" for q in PERCENTILES)
+                     + " | TTFT p50 (s) | Tokens/s | Cost (USD) | s / Point |\n")
+        mdfile.write("|" + "---|" * (7 + len(PERCENTILES)) + "\n")
+        for row in sorted(model_rows, key=lambda r: r["mean_score"] or 0, reverse=True):
+            cells = [row["model"], row["samples"], row["mean_score"], *(row[c] for c in latency_cols),
+                     row["ttft_p50_s"], row["tokens_per_s"], row["cost_usd"], row["s_per_point"]]
+            mdfile.write("| " + " | ".join(_fmt(c) for c in cells) + " |\n")
+    logger.info(f"Model table added to {md_path}")
+
+
+def _stats_rows(scores: List[Tuple[str, str, float]], resamples: int = RESAMPLES,
+                confidence: float = CONFIDENCE, seed: int = 0) -> List[Dict]:
+    """
+    Bootstrap leaderboard rows per model, first over all prompts (prompt
+    "all"), then within each prompt. Each row has the mean, percentiles,
+    CI, P(best) and expected rank among the models compared with it.
+    """
+    if not scores:
+        return []
+    models = np.array([s[0] for s in scores])
+    prompts = np.array([s[1] for s in scores])
+    values = np.array([s[2] for s in scores], dtype=float)
+    groups = [("all", np.ones(len(values), dtype=bool))] + [(str(p), prompts == p) for p in np.unique(prompts)]
+    rows = []
+    for prompt, mask in groups:
+        for r in leaderboard(models[mask], values[mask], resamples, confidence, seed):
+            row = {"prompt": prompt, "model": r.pop("group"), "samples": r.pop("samples")}
+            row.update({k: round(v, 3) if k in ("p_best", "expected_rank") else round(v, 2) for k, v in r.items()})
+            rows.append(row)
+    return rows
+
+
+def _write_stats_markdown(stats_rows: list, md_path: str, confidence: float = CONFIDENCE):
+    ci = f"{confidence:.0%} CI"
+    with open(md_path, "a") as mdfile:
+        mdfile.write(f"\n## Models: mean score with {ci} (bootstrap)\n\n")
+        mdfile.write(f"| Model | Samples | Mean | {ci} | p25 | p50 | p75 | P(best) | E[rank] |\n")
+        mdfile.write("|" + "---|" * 9 + "\n")
+        for r in stats_rows:
+            if r["prompt"] == "all":
+                mdfile.write(f"| {r['model']} | {r['samples']} | {r['mean']} | [{r['ci_low']}, {r['ci_high']}] "
+                             f"| {r['p25']} | {r['p50']} | {r['p75']} | {r['p_best']} | {r['expected_rank']} |\n")
+        mdfile.write("\n### By prompt\n\n")
+        mdfile.write(f"| Prompt | Model | Samples | Mean | {ci} | P(best) |\n")
+        mdfile.write("|" + "---|" * 6 + "\n")
+        for r in stats_rows:
+            if r["prompt"] != "all":
+                mdfile.write(f"| {r['prompt']} | {r['model']} | {r['samples']} | {r['mean']} "
+                             f"| [{r['ci_low']}, {r['ci_high']}] | {r['p_best']} |\n")
+    logger.info(f"Model statistics added to {md_path}")
+
+
+def build_summary(db: ResultsDB, csv_path: str, md_path: str, models_csv: str, top: int = 10,
+                  run: Optional[str] = None, store: Optional[TelemetryStore] = None,
+                  prices: Optional[Dict[str, Dict[str, float]]] = None, stats_csv: Optional[str] = None,
+                  resamples: int = RESAMPLES, confidence: float = CONFIDENCE, seed: int = 0) -> None:
+    """
+    Summary CSV, markdown leaderboard and per-model tables of `run`, all read
+    from `db`. With `resamples` > 0, the leaderboard also gets bootstrap CIs and
+    rank probabilities per model, overall and per prompt.
+    """
+    _write_csv(db.rows(run), csv_path)
+    _write_markdown(db.top(top, run), md_path)
+    if resamples > 0:
+        stats_rows = _stats_rows(db.scores(run), resamples, confidence, seed)
+        if stats_rows:
+            if stats_csv:
+                _write_csv(stats_rows, stats_csv)
+            _write_stats_markdown(stats_rows, md_path, confidence)
+    model_rows = _model_rows(db.model_scores(run), store or TelemetryStore(TELEMETRY_DIR), prices or {})
+    if model_rows:
+        _write_csv(model_rows, models_csv)
+        _write_model_markdown(model_rows, md_path)
+
+
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(description="Rebuild summary CSV and leaderboard")
-    parser.add_argument("--reports", default="reports", help="Directory with evaluation JSON reports")
+    parser.add_argument("--reports", default="reports", help="Directory with evaluation reports and results.db")
     parser.add_argument("--csv", default="reports/summary.csv", help="Path to output CSV file")
     parser.add_argument("--md", default="reports/leaderboard.md", help="Path to output leaderboard markdown")
-    args = parser.parse_args()
-
-    rows = _collect_report_rows(args.reports)
-    _write_csv(rows, args.csv)
-    _write_markdown(rows, args.md)
+    parser.add_argument("--top", type=int, default=10, help="Rows in the markdown leaderboard")
+    parser.add_argument("--run", default=None, help="Run to summarize (default: $EVAL_RUN or 'default')")
+    parser.add_argument("--import-reports", action="store_true",
+                        help="Load existing *_evaluation.json files into results.db first "
+                             "(done automatically when the run has no rows)")
+    parser.add_argument("--models-csv", default="reports/models.csv", help="Path to output per-model CSV")
+    parser.add_argument("--telemetry", default=TELEMETRY_DIR, help="Directory with model call telemetry")
+    parser.add_argument("--prices", default=None,
+                        help='JSON file of {"<model>": {"input": usd_per_1M, "output": usd_per_1M}}')
+    parser.add_argument("--stats-csv", default="reports/model_stats.csv",
+                        help="Path to output per-model (and per-prompt) bootstrap statistics")
+    parser.add_argument("--resamples", type=int, default=RESAMPLES,
+                        help="Bootstrap resamples for confidence intervals and rank probabilities (0 to skip)")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE, help="Confidence level of the intervals")
+    parser.add_argument("--seed", type=int, default=0, help="Bootstrap seed (fixed, so leaderboards are reproducible)")
+    args = parser.parse_args(argv)
 
+    db = ResultsDB(db_path_for(args.reports))
+    try:
+        if args.import_reports or db.count(args.run) == 0:
+            import_reports(args.reports, db, run=args.run)
+        build_summary(db, args.csv, args.md, args.models_csv, args.top, args.run,
+                      TelemetryStore(args.telemetry), load_prices(args.prices), args.stats_csv,
+                      args.resamples, args.confidence, args.seed)
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     main()
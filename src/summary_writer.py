@@ -0,0 +1,105 @@
+import os
+import csv
+import json
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+FLUSH_EVERY = 50         # rows
+FLUSH_INTERVAL = 30.0    # seconds
+
+
+class SummaryWriter:
+    """
+    Streams summary rows to <name>.ndjson and <name>.csv as inputs finish.
+    Every flush fsyncs both files, then appends one line to <name>.checkpoint:
+      {"csv": <bytes>, "ndjson": <bytes>, "done": [<input>, ...]}
+    On reopen, inputs in the checkpoint are reported in `done` and both files
+    are truncated to the last checkpointed sizes, dropping rows written after
+    the last flush. A resumed run therefore appends exactly the missing rows.
+    Only input names are kept in memory, never rows.
+    """
+
+    def __init__(self, directory: str, fields: List[str], name: str = "summary",
+                 flush_every: int = FLUSH_EVERY, flush_interval: float = FLUSH_INTERVAL, restart: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.csv_path = os.path.join(directory, f"{name}.csv")
+        self.ndjson_path = os.path.join(directory, f"{name}.ndjson")
+        self.checkpoint_path = os.path.join(directory, f"{name}.checkpoint")
+        self.fields = fields
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.done: Set[str] = set()
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+
+        csv_size, ndjson_size = (0, 0) if restart else self._load_checkpoint()
+        if csv_size == 0 or not (os.path.exists(self.csv_path) and os.path.exists(self.ndjson_path)):
+            csv_size = ndjson_size = 0
+            self.done.clear()
+        for path, size in ((self.csv_path, csv_size), (self.ndjson_path, ndjson_size)):
+            with open(path, "ab") as f:
+                f.truncate(size)
+        if not self.done and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        self._csv_file = open(self.csv_path, "a", newline="", encoding="utf-8")
+        self._ndjson_file = open(self.ndjson_path, "a", encoding="utf-8")
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=fields)
+        if csv_size == 0:
+            self._writer.writeheader()
+        if self.done:
+            logger.info(f"Resuming summary in {directory}: {len(self.done)} input(s) already done")
+
+    def _load_checkpoint(self) -> Tuple[int, int]:
+        sizes = (0, 0)
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break      # torn last line: the flush it describes never completed
+                    self.done.update(entry["done"])
+                    sizes = (entry["csv"], entry["ndjson"])
+        except FileNotFoundError:
+            pass
+        return sizes
+
+    def write(self, input_name: str, row: Optional[Dict]) -> None:
+        """Records `input_name` as done, with `row` (None for inputs that produced no row)."""
+        if row is not None:
+            self._writer.writerow(row)
+            self._ndjson_file.write(json.dumps(row) + "\n")
+        self._pending.append(input_name)
+        if len(self._pending) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        sizes = {}
+        for key, f in (("csv", self._csv_file), ("ndjson", self._ndjson_file)):
+            f.flush()
+            os.fsync(f.fileno())
+            sizes[key] = os.fstat(f.fileno()).st_size
+        if self._pending:
+            with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({**sizes, "done": self._pending}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.done.update(self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        self._csv_file.close()
+        self._ndjson_file.close()
+
+    def __enter__(self) -> "SummaryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,287 @@
+import os
+import glob
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.logger import get_logger
+from src.models.model_registry import together_models, get_model, ashutdown, set_pool_size, POOL_SIZE
+from src.models.response_cache import ResponseCache, RESPONSE_CACHE_DIR, CACHE_MODES
+from src.streaming import finish_evaluation, start_evaluation, stream_generation
+from src.utils import extract_code_blocks, save_generated_code, load_env
+from src.code_runner import read_prompt
+
+logger = get_logger(__name__)
+
+DEFAULT_RATE = 1.0          # requests per second per model
+DEFAULT_BURST = 5           # requests a model may send back to back
+DEFAULT_MAX_IN_FLIGHT = 16  # concurrent requests across all models
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 1.0          # seconds; doubled per attempt, full jitter
+BACKOFF_CAP = 60.0
+RESULTS_FILE = "sweep_results.json"
+MANIFEST_FILE = "sweep_manifest.txt"
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:   # waiters are served in arrival order
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _status_of(error: Exception) -> Optional[int]:
+    for attr in ("http_status", "status_code", "status"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """429 and 5xx responses, timeouts and dropped connections are worth another try."""
+    status = _status_of(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError)) or \
+        type(error).__name__ in ("Timeout", "APIConnectionError", "ServiceUnavailableError", "RateLimitError")
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, so retrying clients spread out."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def load_prompts(prompts_dir: str, pattern: str = "*.txt") -> Dict[str, str]:
+    """prompt name (file stem) -> prompt text, sorted by name."""
+    paths = sorted(glob.glob(os.path.join(prompts_dir, pattern)))
+    return {os.path.splitext(os.path.basename(p))[0]: read_prompt(p) for p in paths}
+
+
+def _holds(path: str, code: str) -> bool:
+    try:
+        with open(path, "r") as f:
+            return f.read() == code
+    except OSError:
+        return False
+
+
+def _save_sample(row: Dict, response: str, output_dir: str, saved: Optional[str] = None) -> Dict:
+    """
+    Saves the sample's code under a new timestamped name, unless `saved` (where
+    an earlier run put the same cached response) still holds exactly that code.
+    """
+    code = extract_code_blocks(response)
+    if saved and _holds(saved, code):
+        row["file"] = saved
+    else:
+        row["file"] = save_generated_code(row["model"], code, output_path=output_dir,
+                                          prompt_name=row["prompt"], sample=row["sample"])
+    row["ok"], row["error"] = True, None
+    return row
+
+
+def _remember_file(model, prompt: str, params: Dict, row: Dict) -> None:
+    """Stores the sample file with the cached response, so a re-run reuses it."""
+    if model.cache and row["file"]:
+        model.cache.set_file(model.model_name, prompt, params, row["file"])
+
+
+async def generate_sample(model_key: str, model, prompt_name: str, prompt: str, sample: int,
+                        bucket: TokenBucket, in_flight: asyncio.Semaphore, output_dir: str,
+                        max_retries: int, params: Dict, stream: bool = False,
+                        reports_dir: Optional[str] = None, result_cache=None, compiler=None) -> Dict:
+    row = {"model": model_key, "prompt": prompt_name, "sample": sample, "ok": False, "file": None,
+           "cached": False, "attempts": 0, "latency_s": None, "ttft_s": None, "ttfcb_s": None,
+           "total_s": None, "blocks": None, "overall_score": None, "error": None}
+
+    # finished in an earlier (possibly crashed) run: no token, no slot, no request
+    cached = model.cache.get_entry(model.model_name, prompt, params) if model.cache else None
+    if cached is not None:
+        row["cached"] = True
+        _save_sample(row, cached["response"], output_dir, cached.get("file"))
+        _remember_file(model, prompt, params, row)
+        return await finish_evaluation(row, start_evaluation(row["file"], reports_dir, result_cache, compiler))
+
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        async with in_flight:
+            row["attempts"] = attempt + 1
+            start = time.perf_counter()
+            try:
+                if stream:
+                    evaluation = await stream_generation(model, prompt, params, row, output_dir,
+                                                         reports_dir, result_cache, compiler)
+                else:
+                    response = await model.agenerate_code(prompt, **params)
+            except Exception as e:
+                row["error"] = f"{type(e).__name__}: {e}"
+                if attempt < max_retries and is_retryable(e):
+                    delay = backoff_delay(attempt)
+                    logger.warning(f"{model_key}/{prompt_name}#{sample} attempt {attempt + 1} failed "
+                                   f"({row['error']}); retrying in {delay:.1f}s")
+                else:
+                    logger.error(f"{model_key}/{prompt_name}#{sample} failed: {row['error']}")
+                    return row
+            else:
+                row["latency_s"] = round(time.perf_counter() - start, 3)
+                if stream:
+                    row["ok"], row["error"] = True, None
+                else:
+                    _save_sample(row, response, output_dir)
+                    evaluation = start_evaluation(row["file"], reports_dir, result_cache, compiler)
+                _remember_file(model, prompt, params, row)
+                break
+        await asyncio.sleep(delay)   # back off outside the in-flight slot
+    # evaluation runs outside the in-flight slot so it never holds up requests
+    return await finish_evaluation(row, evaluation)
+
+
+def sample_jobs(model_keys: List[str], prompts: Dict[str, str], samples: int) -> List[Tuple[str, str, str, int]]:
+    """(model key, prompt name, prompt text, sample index) for every request, in result order."""
+    return [(k, name, text, s) for k in model_keys for name, text in prompts.items() for s in range(samples)]
+
+
+def prepare_models(model_keys: List[str], rate: float, burst: int, base_url: Optional[str],
+                   cache: Optional[ResponseCache]) -> Tuple[Dict, Dict[str, TokenBucket]]:
+    """Shared model handles and one token bucket per model."""
+    # the SDK's own retries would bypass the rate limiter, so they are turned off
+    models = {k: get_model(k, base_url=base_url, max_retries=0, cache=cache) for k in model_keys}
+    return models, {k: TokenBucket(rate, burst) for k in model_keys}
+
+
+async def run_sweep(model_keys: List[str], prompts: Dict[str, str], samples: int, output_dir: str,
+                    rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, max_retries: int = DEFAULT_MAX_RETRIES,
+                    base_url: Optional[str] = None, params: Optional[Dict] = None,
+                    cache: Optional[ResponseCache] = None, seed: int = 0, stream: bool = False,
+                    reports_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Generates `samples` completions for every (model, prompt) pair concurrently.
+    Each model has its own token bucket; `max_in_flight` bounds open requests
+    overall. Sample k is requested with seed `seed + k`, so with a response
+    cache a re-run only sends what is missing. With `stream`, completions are
+    consumed as they arrive and code blocks are evaluated as soon as they close
+    (`reports_dir` enables evaluation). Rows come back in model/prompt/sample order.
+    """
+    models, buckets = prepare_models(model_keys, rate, burst, base_url, cache)
+    in_flight = asyncio.Semaphore(max_in_flight)
+    compiler = None
+    if reports_dir:
+        from src.compiler import CompileService
+        compiler = CompileService()
+    jobs = [
+        generate_sample(k, models[k], name, text, s, buckets[k], in_flight, output_dir, max_retries,
+                        {**(params or {}), "seed": seed + s}, stream, reports_dir, compiler=compiler)
+        for k, name, text, s in sample_jobs(model_keys, prompts, samples)
+    ]
+    logger.info(f"Sweep: {len(model_keys)} model(s) x {len(prompts)} prompt(s) x {samples} sample(s) "
+                f"= {len(jobs)} request(s), {max_in_flight} in flight, {rate}/s per model")
+    return list(await asyncio.gather(*jobs))
+
+
+def write_sweep_results(rows: List[Dict], output_dir: str, elapsed: float) -> str:
+    """Writes the per-request results and a manifest of saved files for `src.evaluator --manifest`."""
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, RESULTS_FILE)
+    with open(results_path, "w") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "requests": len(rows),
+            "failed": sum(1 for r in rows if not r["ok"]),
+            "retries": sum(max(0, r["attempts"] - 1) for r in rows),
+            "cached": sum(1 for r in rows if r["cached"]),
+            "elapsed_s": round(elapsed, 2),
+            "results": rows,
+        }, f, indent=4)
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        f.writelines(f"{r['file']}\n" for r in rows if r["ok"])
+    logger.info(f"Sweep results saved to {results_path}")
+    return results_path
+
+
+def add_generation_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared by `src.sweep` and `src.pipeline`."""
+    parser.add_argument("--models", nargs="+", required=True,
+                        help=f"Model keys or 'all' ({', '.join(together_models)})")
+    parser.add_argument("--prompts-dir", default="prompts", help="Directory of *.txt prompts")
+    parser.add_argument("--samples", type=int, default=1, help="Completions per model/prompt pair")
+    parser.add_argument("--output", default="generated_code", help="Where generated .c files are saved")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Requests per second per model")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help="Token bucket capacity per model")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Concurrent requests across all models")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Retries per request on 429/5xx/timeouts")
+    parser.add_argument("--base-url", default=os.getenv("TOGETHER_BASE_URL"),
+                        help="Completions endpoint (e.g. a local fake server); defaults to Together's")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE,
+                        help="Keep-alive clients per endpoint shared by all models")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream completions; record time to first token / first code block")
+    parser.add_argument("--seed", type=int, default=0, help="Sample k is requested with seed SEED+k")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="use",
+                        help="use: resume from cached responses | refresh: re-request and overwrite | bypass: no cache")
+    parser.add_argument("--cache-dir", default=RESPONSE_CACHE_DIR, help="Response cache directory")
+
+
+def generation_inputs(parser: argparse.ArgumentParser, args) -> Tuple[List[str], Dict[str, str]]:
+    """Validated model keys and prompts from `add_generation_arguments` options."""
+    model_keys = list(together_models) if args.models == ["all"] else args.models
+    unknown = [k for k in model_keys if k not in together_models]
+    if unknown:
+        parser.error(f"unknown model key(s): {', '.join(unknown)}")
+
+    prompts = load_prompts(args.prompts_dir)
+    if not prompts:
+        parser.error(f"no prompts found in {args.prompts_dir}")
+
+    set_pool_size(args.pool_size)
+    return model_keys, prompts
+
+
+def main(argv: Optional[List[str]] = None):
+    load_env()
+    parser = argparse.ArgumentParser(description="Generate code for many models x prompts x samples concurrently")
+    add_generation_arguments(parser)
+    parser.add_argument("--evaluate", metavar="REPORTS_DIR", default=None,
+                        help="Evaluate each sample into REPORTS_DIR (while streaming, as soon as a code block closes)")
+    args = parser.parse_args(argv)
+    model_keys, prompts = generation_inputs(parser, args)
+
+    async def _run() -> List[Dict]:
+        try:
+            return await run_sweep(model_keys, prompts, args.samples, args.output, rate=args.rate,
+                                   burst=args.burst, max_in_flight=args.max_in_flight,
+                                   max_retries=args.max_retries, base_url=args.base_url,
+                                   cache=ResponseCache(args.cache_dir, args.cache_mode), seed=args.seed,
+                                   stream=args.stream, reports_dir=args.evaluate)
+        finally:
+            await ashutdown()   # close pooled async clients on the loop that used them
+
+    start = time.perf_counter()
+    rows = asyncio.run(_run())
+    write_sweep_results(rows, args.output, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import json
+import math
+import time
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", "logs/telemetry")
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (same as numpy's default); None for no values."""
+    if not values:
+        return None
+    xs = sorted(values)
+    pos = (len(xs) - 1) * q / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+class TelemetryStore:
+    """
+    Append-only NDJSON metrics, one file per model key, one line per API call:
+      {"ts", "model", "op", "ok", "latency_s", "ttft_s", "prompt_tokens", "completion_tokens", "tokens_per_s"}
+    Lines are written with a single O_APPEND write, so threads and processes can share a file.
+    """
+
+    def __init__(self, root: str = TELEMETRY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, model: str) -> str:
+        return os.path.join(self.root, f"{model.replace('/', '__')}.ndjson")
+
+    def record(self, model: str, op: str, latency_s: float, ok: bool = True, ttft_s: Optional[float] = None,
+               prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None) -> None:
+        generating = latency_s - (ttft_s or 0.0)
+        entry = {
+            "ts": round(time.time(), 3),
+            "model": model,
+            "op": op,
+            "ok": ok,
+            "latency_s": round(latency_s, 4),
+            "ttft_s": round(ttft_s, 4) if ttft_s is not None else None,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_per_s": round(completion_tokens / generating, 2) if completion_tokens and generating > 0 else None,
+        }
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            with self._lock:
+                os.makedirs(self.root, exist_ok=True)
+                fd = os.open(self._path(model), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except Exception as e:
+            logger.warning(f"Failed to record telemetry for {model}: {e}")
+
+    def models(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(f[:-len(".ndjson")].replace("__", "/") for f in os.listdir(self.root) if f.endswith(".ndjson"))
+
+    def load(self, model: str) -> Iterable[Dict]:
+        try:
+            with open(self._path(model), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue   # torn last line from a crash
+        except FileNotFoundError:
+            return
+
+
+def load_prices(path: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """{model key: {"input": USD per 1M prompt tokens, "output": USD per 1M completion tokens}}."""
+    if not path:
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def summarize_model(entries: Iterable[Dict], price: Optional[Dict[str, float]] = None) -> Dict:
+    """Latency percentiles, throughput, token totals and cost for one model's calls."""
+    entries = list(entries)
+    ok = [e for e in entries if e.get("ok")]
+    latencies = [e["latency_s"] for e in ok]
+    ttfts = [e["ttft_s"] for e in ok if e.get("ttft_s") is not None]
+    rates = [e["tokens_per_s"] for e in ok if e.get("tokens_per_s")]
+    prompt_tokens = sum(e.get("prompt_tokens") or 0 for e in ok)
+    completion_tokens = sum(e.get("completion_tokens") or 0 for e in ok)
+
+    summary = {"calls": len(entries), "errors": len(entries) - len(ok)}
+    for q in PERCENTILES:
+        p = percentile(latencies, q)
+        summary[f"latency_p{q}_s"] = round(p, 3) if p is not None else None
+    p = percentile(ttfts, 50)
+    summary["ttft_p50_s"] = round(p, 3) if p is not None else None
+    summary["tokens_per_s"] = round(sum(rates) / len(rates), 1) if rates else None
+    summary["prompt_tokens"] = prompt_tokens
+    summary["completion_tokens"] = completion_tokens
+    summary["cost_usd"] = None
+    if price:
+        summary["cost_usd"] = round((prompt_tokens * price.get("input", 0.0)
+                                     + completion_tokens * price.get("output", 0.0)) / 1e6, 4)
+    return summary
+
+
+_DEFAULT: Optional[TelemetryStore] = None
+
+
+def default_store() -> TelemetryStore:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = TelemetryStore()
+    return _DEFAULT
@@ -1,27 +1,68 @@
 import os
-import json
 import re
+import json
 from typing import Dict, Any
 from datetime import datetime
-from src.logger import logger
+from src.logger import get_logger
+from src.code_fences import FenceParser
+
+logger = get_logger(__name__)
 
 
 def extract_code_blocks(text: str)->str:
-    matches = re.findall(r"```(?:[a-zA-Z]+\n)?(.*?)```", text, re.DOTALL)
-    code="\n\n".join(matches) if matches else text.strip()
+    parser = FenceParser()
+    parser.feed(text)
+    code = parser.result()
     logger.info("code extracted from response")
     return code
 
 
-def save_generated_code(model_name: str, code: str,output_path: str = "generated_code"):
+def save_generated_code(model_name: str, code: str,output_path: str = "generated_code",
+                        prompt_name: str = None, sample: int = None) -> str:
+    """
+    Saves to <model>_<YYYYmmdd>_<HHMMSS>.c; sweeps also pass the prompt and
+    sample index (<model>_<ts>_<prompt>_s<k>.c) so concurrent saves never collide.
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     os.makedirs(output_path, exist_ok=True)
-    filename = f"{model_name}_{timestamp}.c"
-    file_path = os.path.join(output_path, filename)
+    filename = f"{model_name}_{timestamp}"
+    if prompt_name is not None:
+        filename += f"_{prompt_name}_s{sample or 0}"
+    file_path = os.path.join(output_path, f"{filename}.c")
     with open(file_path, "w") as f:
         f.write(code)
     logger.info(f" Code saved to {file_path}")
+    return file_path
+
+
+# save_generated_code() names files <model>_<YYYYmmdd>_<HHMMSS>.c, or
+# <model>_<YYYYmmdd>_<HHMMSS>_<prompt>_s<k>.c for sweep samples
+TIMESTAMPED_RX = re.compile(r"^(?P<model>.+?)_\d{8}_\d{6}(?:_(?P<prompt>.+)_s\d+)?$")
+
+
+def extract_model_prompt(filename: str):
+    """
+    Expected filename formats:
+      <model_name>_<YYYYmmdd>_<HHMMSS>.c → ('deepseek_r1', 'unknown')
+      <model_name>_<YYYYmmdd>_<HHMMSS>_<prompt_name>_s<k>.c → ('deepseek_r1', 'char_driver.txt')
+      <prompt_name>_<model_name>.c       → ('mistral', 'char_driver.txt')
+    """
+    name = os.path.splitext(os.path.basename(filename))[0]
+    m = TIMESTAMPED_RX.match(name)
+    if m:
+        return m.group("model"), f"{m.group('prompt')}.txt" if m.group("prompt") else "unknown"
+    parts = name.split("_")
+    if len(parts) < 2:
+        return "unknown", "unknown"
+    model = parts[-1]
+    prompt = "_".join(parts[:-1]) + ".txt"
+    return model, prompt
+
 
+def load_env() -> None:
+    """Loads API keys from .env; only generation commands need them, so dotenv is imported here."""
+    from dotenv import load_dotenv
+    load_dotenv()
 
 
 def ensure_dir(path: str) -> None:
@@ -0,0 +1,142 @@
+"""
+A local, OpenAI/Together-compatible chat completions server for tests and
+for pointing `--base-url` at something that costs nothing:
+
+    python -m tests.fake_completions --port 8765
+    python -m src.sweep --models qwen3_32b --base-url http://127.0.0.1:8765/v1/
+
+It answers POST <anything>/chat/completions with a small C code block (or an
+SSE stream of it), can be scripted to fail with given status codes, and
+records every request and every TCP connection it accepts.
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+def completion_text(model: str, seed) -> str:
+    return f"Here you go:\n```c\n/* {model} seed {seed} */\nint main(void) {{ return 0; }}\n```\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so connection reuse is observable
+    server: "FakeCompletionsServer"
+
+    def setup(self):
+        super().setup()
+        self.server.connection_opened()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        status = self.server.take_status(payload)
+        self.server.record(payload, status)
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send(404, b'{"error": {"message": "not found"}}')
+        if status != 200:
+            error = {"error": {"message": f"fake error {status}", "type": "fake_error"}}
+            return self._send(status, json.dumps(error).encode())
+
+        model, text = payload.get("model", "fake"), completion_text(payload.get("model"), payload.get("seed"))
+        usage = {"prompt_tokens": 10, "completion_tokens": len(text.split()), "total_tokens": 10 + len(text.split())}
+        base = {"id": "fake-1", "created": int(time.time()), "model": model}
+        if payload.get("stream"):
+            events = []
+            for k, piece in enumerate(text.splitlines(keepends=True)):
+                choice = {"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}
+                events.append({**base, "object": "chat.completion.chunk", "choices": [choice]})
+            events.append({**base, "object": "chat.completion.chunk", "usage": usage,
+                           "choices": [{"index": 0, "delta": {"content": ""}, "finish_reason": "stop"}]})
+            body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+            return self._send(200, body.encode(), "text/event-stream")
+        response = {**base, "object": "chat.completion", "usage": usage, "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]}
+        self._send(200, json.dumps(response).encode())
+
+
+class FakeCompletionsServer(ThreadingHTTPServer):
+    """
+    Runs on a background thread. `script` is a list of status codes handed to
+    the next requests in order (then 200); `status_for(payload)` may return a
+    status for a particular request instead. `requests` holds
+    {"t", "model", "seed", "stream", "status"} per request and `connections`
+    the number of TCP connections accepted.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, script: Optional[List[int]] = None,
+                 status_for: Optional[Callable[[Dict], Optional[int]]] = None):
+        super().__init__((host, port), _Handler)
+        self.script = list(script or [])
+        self.status_for = status_for
+        self.requests: List[Dict] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def take_status(self, payload: Dict) -> int:
+        with self._lock:
+            if self.script:
+                return self.script.pop(0)
+        status = self.status_for(payload) if self.status_for else None
+        return status or 200
+
+    def record(self, payload: Dict, status: int) -> None:
+        with self._lock:
+            self.requests.append({"t": time.monotonic(), "model": payload.get("model"), "seed": payload.get("seed"),
+                                  "stream": bool(payload.get("stream")), "status": status})
+
+    def start(self) -> "FakeCompletionsServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-completions", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeCompletionsServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake chat completions locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = FakeCompletionsServer(args.host, args.port)
+    print(f"Fake completions at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
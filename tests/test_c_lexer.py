@@ -0,0 +1,79 @@
+from src.evaluation.c_lexer import tokenize
+from src.evaluation.source_unit import SourceUnit
+from src.evaluation.static_analyzer import analyze_code
+
+SPLIT = """\
+static DEFINE_MUTEX(lock);
+
+static ssize_t demo_read(struct file *f, char __user *buf, size_t len, loff_t *off)
+{
+    mutex_lock(&lock);
+    if (copy_from_user(kbuf, buf, len))
+        return -EFAULT;
+    return len;
+}
+
+static ssize_t demo_write(struct file *f, const char __user *buf, size_t count, loff_t *off)
+{
+    mutex_unlock(&lock);
+    return count;
+}
+"""
+
+TOGETHER = """\
+static DEFINE_MUTEX(lock);
+
+static ssize_t demo_read(struct file *f, char __user *buf, size_t len, loff_t *off)
+{
+    return len;
+}
+
+static ssize_t demo_write(struct file *f, const char __user *buf, size_t count, loff_t *off)
+{
+    mutex_lock(&lock);
+    if (copy_from_user(kbuf, buf, count))
+        return -EFAULT;
+    mutex_unlock(&lock);
+    return count;
+}
+"""
+
+
+def _unit(text: str) -> SourceUnit:
+    return SourceUnit.from_bytes("demo.c", text.encode())
+
+
+def test_tokens_skip_comments_and_keep_directives():
+    tokens = tokenize("#include <linux/fs.h>\n/* read( */ int x = 'a'; // y(\n")
+    assert [t.kind for t in tokens] == ["directive", "ident", "ident", "punct", "char", "punct"]
+    assert tokens[1].start == len("#include <linux/fs.h>\n/* read( */ ")
+
+
+def test_functions_span_their_bodies():
+    unit = _unit(SPLIT)
+    assert [fn.name for fn in unit.functions] == ["demo_read", "demo_write"]
+    read, write = unit.functions
+    assert (read.start_line, read.end_line) == (3, 9)
+    assert (write.start_line, write.end_line) == (11, 15)
+    assert unit.functions.at(SPLIT.index("mutex_lock")) == read
+    assert unit.functions.at(SPLIT.index("DEFINE_MUTEX")) is None
+
+
+def test_unterminated_function_runs_to_the_end():
+    text = "int demo_open(void) {\n    if (x) {\n        return 0;\n"
+    (fn,) = _unit(text).functions
+    assert fn.name == "demo_open" and fn.end == len(text)
+
+
+def test_lock_pairs_and_copy_bounds_are_scoped_per_function():
+    split, together = analyze_code(_unit(SPLIT)), analyze_code(_unit(TOGETHER))
+    # the file as a whole has the same calls either way
+    assert split["findings"]["uses_mutex"] and together["findings"]["uses_mutex"]
+    assert split["findings"]["user_copy_calls"] == together["findings"]["user_copy_calls"] == 1
+
+    # lock and unlock in different functions is not a locked section
+    assert split["functionality"]["edge_cases"] == 0.5
+    assert together["functionality"]["edge_cases"] == 0.6
+    # `count` only bounds a copy_from_user in its own function
+    assert split["security"]["input_validation"] == 0.6
+    assert together["security"]["input_validation"] == 0.8
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from src import cache as cache_mod
+from src.cache import ResultCache
+from src import compiler
+from src.compiler import CompileService
+from src.evaluator import evaluate_file
+
+
+def _report(status: str, padding: int = 0) -> dict:
+    return {"file": "x.c", "compilation": {"status": status, "success": status == "ok"}, "pad": "x" * padding}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"))
+
+
+def test_key_follows_content_and_versions(cache, monkeypatch):
+    key = cache.key_for(b"int x;\n")
+    assert cache.key_for(b"int x;\n") == key
+    assert cache.key_for(b"int y;\n") != key
+    assert cache.key_for(b"int x;\n", "truncated=10|") != key
+
+    monkeypatch.setattr(cache_mod.metrics, "SCORING_VERSION", "bumped")
+    assert ResultCache(cache.cache_dir).key_for(b"int x;\n") != key
+
+
+@pytest.mark.parametrize("status", ["ok", "failed", "skipped"])
+def test_verdicts_are_cached(cache, status):
+    cache.put("ab" * 32, _report(status))
+    assert cache.get("ab" * 32)["compilation"]["status"] == status
+
+
+@pytest.mark.parametrize("status", ["timeout", "memory_limit", "error", None])
+def test_reports_without_a_verdict_are_not_cached(cache, status):
+    cache.put("ab" * 32, _report(status) if status else {"file": "x.c"})
+    assert cache.get("ab" * 32) is None
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=11_000)
+    keys = [f"{i:02d}" * 32 for i in range(4)]
+    for i, key in enumerate(keys[:3]):
+        cache.put(key, _report("ok", 3000))
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    cache.get(keys[0])   # now the most recently used
+
+    cache.put(keys[3], _report("ok", 3000))   # over 11 kB: evict down to 9.9 kB, one entry
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(k) is not None for k in (keys[0], keys[2], keys[3]))
+    assert cache._scan_size() <= 11_000 * cache_mod.EVICT_TARGET
+
+
+def test_failed_compile_is_retried_on_the_next_run(tmp_path, monkeypatch):
+    calls = []
+
+    async def gcc_missing(self, file_path):
+        calls.append(file_path)
+        return compiler._new_result(None, "minimal", False)   # status "error", as when gcc is missing
+
+    monkeypatch.setattr(CompileService, "compile", gcc_missing)
+    source = tmp_path / "demo.c"
+    source.write_text("int main(void) { return 0; }\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    for _ in range(2):
+        assert evaluate_file(str(source), str(tmp_path / "reports"), cache)["compilation"]["status"] == "error"
+    assert len(calls) == 2
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+
+import pytest
+
+pytest.importorskip("together")
+
+from src import telemetry
+from src.models import model_registry
+from src.models.client_pool import ClientPool
+from src.models.together import TogetherModel
+from tests.fake_completions import FakeCompletionsServer
+
+MODEL_ID = model_registry.together_models["qwen3_32b"]
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("TOGETHER_API_KEY", "test-key")
+    monkeypatch.setattr(telemetry, "_DEFAULT", telemetry.TelemetryStore(str(tmp_path / "telemetry")))
+
+
+@pytest.fixture
+def server():
+    with FakeCompletionsServer() as s:
+        yield s
+
+
+def _model(server, **pool_options):
+    return TogetherModel(MODEL_ID, pool=ClientPool(server.base_url, max_retries=0, **pool_options))
+
+
+def test_async_requests_reuse_one_connection(server):
+    model = _model(server)
+
+    async def run():
+        try:
+            for seed in range(10):
+                await model.agenerate_code("prompt", seed=seed)
+            async for _ in model.astream_code("prompt", seed=99):
+                pass
+        finally:
+            await model.pool.aclose()
+
+    asyncio.run(run())
+    assert len(server.requests) == 11
+    assert server.connections == 1
+
+
+def test_concurrent_requests_stay_within_the_connection_limit(server):
+    model = _model(server, max_connections=2)
+
+    async def run():
+        try:
+            await asyncio.gather(*(model.agenerate_code("prompt", seed=s) for s in range(12)))
+        finally:
+            await model.pool.aclose()
+
+    asyncio.run(run())
+    assert len(server.requests) == 12
+    assert server.connections <= 2
+
+
+def test_models_sharing_a_pool_share_connections(server):
+    pool = ClientPool(server.base_url, max_retries=0)
+    a, b = TogetherModel(MODEL_ID, pool=pool), TogetherModel("other/model", pool=pool)
+
+    async def run():
+        try:
+            for seed in range(3):
+                await a.agenerate_code("prompt", seed=seed)
+                await b.agenerate_code("prompt", seed=seed)
+        finally:
+            await pool.aclose()
+
+    asyncio.run(run())
+    assert server.connections == 1
+
+
+def test_sync_requests_reuse_one_connection(server):
+    model = _model(server)
+    for seed in range(5):
+        model.generate_code("prompt", seed=seed)
+    model.pool.close()
+    assert len(server.requests) == 5
+    assert server.connections == 1
+
+
+def test_aclose_closes_the_session(server):
+    model = _model(server)
+
+    async def run():
+        await model.agenerate_code("prompt")
+        session = model.pool.aio_session()
+        await model.pool.aclose()
+        return session
+
+    assert asyncio.run(run()).closed
+
+
+def test_close_on_a_running_loop_defers_to_aclose(server, caplog, monkeypatch):
+    monkeypatch.setattr(logging.getLogger("src"), "propagate", True)   # let caplog see pipeline records
+    model = _model(server)
+
+    async def run():
+        await model.agenerate_code("prompt")
+        session = model.pool.aio_session()
+        with caplog.at_level(logging.WARNING, logger="src"):
+            model.pool.close()   # must not call asyncio.run() inside the loop
+        closed_by_close = session.closed
+        await session.close()
+        return closed_by_close
+
+    assert asyncio.run(run()) is False
+    assert "await aclose()" in caplog.text
+
+
+def test_close_without_a_loop_closes_sessions_of_idle_loops(server):
+    model = _model(server)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(model.agenerate_code("prompt"))
+        session = next(iter(model.pool._sessions.values()))
+        model.pool.close()
+        assert session.closed
+    finally:
+        loop.close()
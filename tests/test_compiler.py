@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import asyncio
+import shutil
+
+import pytest
+
+from src import compiler
+from src.compiler import CompileService, compile_code
+
+pytestmark = pytest.mark.skipif(shutil.which("gcc") is None or os.name != "posix",
+                                reason="needs gcc on a POSIX host")
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.fixture
+def huge_initializer(tmp_path):
+    # cc1 needs far more than 150 MB for a three-million-element initializer
+    return _write(tmp_path, "huge.c", "int a[] = {" + ",".join(["1"] * 3_000_000) + "};\n")
+
+
+def test_ok_and_failed(tmp_path):
+    ok = compile_code(_write(tmp_path, "ok.c", "int main(void) { return 0; }\n"))
+    assert ok["status"] == "ok" and ok["success"]
+
+    bad = compile_code(_write(tmp_path, "bad.c", "int main(void) { return undeclared; }\n"))
+    assert bad["status"] == "failed" and bad["errors_count"] >= 1
+
+
+def test_memory_limit_has_its_own_status(huge_initializer):
+    result = compile_code(huge_initializer, memory_limit_mb=150)
+    assert result["status"] == "memory_limit"
+    assert not result["success"]
+
+
+def test_memory_limit_in_service(huge_initializer):
+    service = CompileService(concurrency=1, memory_limit_mb=150)
+    result = asyncio.run(service.compile(huge_initializer))
+    assert result["status"] == "memory_limit"
+
+
+def test_limit_applied_before_exec_without_prlimit(monkeypatch, huge_initializer):
+    monkeypatch.setattr(compiler, "PRLIMIT", None)
+    cmd = compiler._limited(["gcc", "x.c"], 1024)
+    assert cmd[0] == sys.executable and cmd[-3:] == ["1024", "gcc", "x.c"]
+    assert compile_code(huge_initializer, memory_limit_mb=150)["status"] == "memory_limit"
+
+    service = CompileService(concurrency=1, memory_limit_mb=150)
+    assert asyncio.run(service.compile(huge_initializer))["status"] == "memory_limit"
+
+
+def test_no_limit_runs_gcc_directly():
+    assert compiler._limited(["gcc", "x.c"], None) == ["gcc", "x.c"]
+
+
+def test_missing_gcc_is_an_error(monkeypatch, tmp_path):
+    monkeypatch.setattr(compiler, "gcc_command", lambda flags, inc, path, opts=(): ["no-such-gcc", path])
+    assert compiler._limited(["no-such-gcc"], 1024) == ["no-such-gcc"]
+    assert compile_code(_write(tmp_path, "ok.c", "int x;\n"))["status"] == "error"
+
+
+@pytest.fixture
+def slow_initializer(tmp_path):
+    # several seconds of cc1 time, so a timeout that only killed the driver would show
+    return _write(tmp_path, "slow.c", "int a[] = {" + ",".join(["1"] * 6_000_000) + "};\n")
+
+
+def test_timeout_kills_cc1_too(slow_initializer):
+    start = time.perf_counter()
+    result = compile_code(slow_initializer, timeout=0.5, memory_limit_mb=None)
+    assert result["status"] == "timeout"
+    assert time.perf_counter() - start < 2.5
+
+
+def test_timeout_in_service(slow_initializer):
+    service = CompileService(concurrency=1, timeout=0.5, memory_limit_mb=None)
+    start = time.perf_counter()
+    assert asyncio.run(service.compile(slow_initializer))["status"] == "timeout"
+    assert time.perf_counter() - start < 2.5
+
+
+def test_cancelled_compile_is_killed_and_reaped(slow_initializer):
+    service = CompileService(concurrency=1, timeout=60, memory_limit_mb=None)
+
+    async def run():
+        task = asyncio.create_task(service.compile(slow_initializer))
+        await asyncio.sleep(0.5)
+        start = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 2.0
+
+
+LIMIT = 150 * 1024 * 1024
+
+
+def _finish(stderr, returncode=1, limit_hit=False):
+    return compiler._finish(compiler._new_result(None, "minimal", False), "", stderr, returncode, LIMIT, limit_hit)
+
+
+def test_crash_is_an_error_not_out_of_memory():
+    killed = "gcc: fatal error: Killed signal terminated program cc1\ncompilation terminated.\n"
+    segv = "x.c:1:1: internal compiler error: Segmentation fault\n"
+    ice = "x.c:9:1: internal compiler error: in fold_convert_loc, at fold-const.c:2435\n"
+    assert _finish(killed) == {**_finish(killed), "status": "error", "reason": "gcc killed by SIGKILL"}
+    assert _finish(segv)["reason"] == "gcc killed by SIGSEGV"
+    assert _finish(ice)["status"] == "error" and _finish(ice)["reason"] == "internal compiler error"
+    assert _finish("", returncode=-6)["reason"] == "gcc killed by SIGABRT"
+    # only a SIGKILL/SIGSEGV of a job that reached its cap counts as running out of memory
+    assert _finish(killed, limit_hit=True)["status"] == "memory_limit"
+    assert _finish(segv, limit_hit=True)["status"] == "memory_limit"
+    assert _finish(ice, limit_hit=True)["status"] == "error"
+    assert _finish("cc1: out of memory allocating 6000 bytes\n")["status"] == "memory_limit"
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from src import compiler
+from src.batch import SUMMARY_FILE, evaluate_batch
+from src.compiler import CompileService
+from src.dedup import MAX_DISTANCE, DedupIndex, build_index, normalized_tokens
+from tests.test_metrics import DRIVER
+
+# same tokens as DRIVER: only comments and spacing differ
+REFORMATTED = "/* demo driver */\n" + DRIVER.replace(", ", ",  ").replace("{ return", "{\n    // nothing to do\n    return")
+# one constant changed: a near-duplicate, not an exact one
+TWEAKED = DRIVER.replace("return len;", "return len - 1;")
+
+
+def _distance(a: str, b: str) -> int:
+    index = DedupIndex()
+    index.add("a", a)
+    index.add("b", b)
+    return bin(index.entries["a"].simhash ^ index.entries["b"].simhash).count("1")
+
+
+def test_comments_and_spacing_do_not_change_the_tokens():
+    assert normalized_tokens(REFORMATTED) == normalized_tokens(DRIVER)
+    assert normalized_tokens("#include  <linux/fs.h>\n") == normalized_tokens("#include <linux/fs.h>\n")
+
+
+def test_exact_and_near_duplicates_are_clustered():
+    index = DedupIndex()
+    for path, text in (("a.c", DRIVER), ("b.c", REFORMATTED), ("c.c", TWEAKED), ("d.c", "int unrelated(void);\n")):
+        index.add(path, text)
+    assert index.duplicate_of("b.c") == "a.c"
+    assert index.duplicate_of("c.c") is None
+    assert _distance(DRIVER, TWEAKED) <= MAX_DISTANCE
+    assert index.clusters() == [["a.c", "b.c", "c.c"]]
+    ids = index.cluster_ids()
+    assert ids["a.c"] == ids["c.c"] != ids["d.c"]
+
+
+@pytest.fixture
+def counted_compiles(monkeypatch):
+    calls = []
+
+    async def fake_compile(self, file_path):
+        calls.append(file_path)
+        return {**compiler._new_result(None, "minimal", False), "status": "ok", "success": True}
+
+    monkeypatch.setattr(CompileService, "compile", fake_compile)
+    return calls
+
+
+def test_duplicates_reuse_the_original_report(tmp_path, counted_compiles):
+    paths = []
+    for name, text in (("a.c", DRIVER), ("b.c", REFORMATTED), ("c.c", TWEAKED)):
+        (tmp_path / name).write_text(text)
+        paths.append(str(tmp_path / name))
+    out = tmp_path / "reports"
+
+    reports = evaluate_batch(paths, str(out), jobs=1, dedup=True)
+    # the reformatted copy is never compiled or checked; the tweaked one is
+    assert sorted(counted_compiles) == [paths[0], paths[2]]
+    original, copy, tweaked = reports
+    assert copy["duplicate_of"] == paths[0] and copy["file"] == paths[1]
+    assert copy["overall_score"] == original["overall_score"]
+    assert "duplicate_of" not in tweaked
+
+    summary = json.loads((out / SUMMARY_FILE).read_text())["dedup"]
+    assert summary["exact_duplicates"] == 1 and summary["unique_files"] == 2
+    assert summary["clusters"] == [{"id": 0, "size": 3, "files": paths}]
+
+
+def test_files_over_the_cap_are_left_out(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVAL_MAX_SOURCE_MB", str(1 / 1024))
+    big, small = tmp_path / "big.c", tmp_path / "small.c"
+    big.write_text(DRIVER * 4)
+    small.write_text(DRIVER)
+    assert list(build_index([str(big), str(small)]).entries) == [str(small)]
@@ -0,0 +1,46 @@
+import pytest
+
+from src.cache import ResultCache
+from src.compiler import CompileService
+from src.evaluator import evaluate_file
+
+LINE = "static int counter_%d;\n"
+
+
+@pytest.fixture
+def capped(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVAL_MAX_SOURCE_MB", str(1 / 1024))   # 1 KiB
+
+    async def no_gcc(self, file_path):
+        raise AssertionError(f"{file_path} reached gcc")
+
+    monkeypatch.setattr(CompileService, "compile", no_gcc)
+    return tmp_path
+
+
+def _write(tmp_path, name, lines):
+    path = tmp_path / name
+    path.write_text("".join(LINE % i for i in range(lines)))
+    return str(path)
+
+
+def test_truncated_source_is_not_compiled(capped):
+    report = evaluate_file(_write(capped, "huge.c", 5000), str(capped / "reports"))
+    assert report["source"]["truncated"]
+    assert report["source"]["analyzed_bytes"] <= 1024 < report["source"]["bytes"]
+    assert report["compilation"]["status"] == "skipped"
+    assert not report["compilation"]["success"]
+    assert report["overall_score"]["scores"]["correctness"] < 50
+
+
+def test_truncated_cache_key_covers_prefix_and_size(capped):
+    cache = ResultCache(str(capped / "cache"))
+    first = evaluate_file(_write(capped, "a.c", 5000), str(capped / "reports"), cache)
+    # same prefix and size, different bytes past the cap: same analysis, served from the cache
+    path = capped / "b.c"
+    path.write_text(open(capped / "a.c").read()[:-2] + "x\n")
+    second = evaluate_file(str(path), str(capped / "reports"), cache)
+    assert second["timestamp"] == first["timestamp"]
+    # a different size is a different report
+    third = evaluate_file(_write(capped, "c.c", 6000), str(capped / "reports"), cache)
+    assert third["timestamp"] != first["timestamp"]
@@ -0,0 +1,124 @@
+import os
+import glob
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import compiler, header_sets
+from src.compiler import compile_code
+from benchmarks.corpus import generate_driver
+
+pytestmark = pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    # kmalloc/GFP_KERNEL are only declared by linux/slab.h, which this file never includes
+    "missing_slab.c": "#include <linux/module.h>\n#include <linux/fs.h>\n"
+                      "static int f(void) { void *p = kmalloc(8, GFP_KERNEL); kfree(p); return 0; }\n",
+    "included_twice.c": "#include <linux/module.h>\n#include <linux/module.h>\nstruct module { int x; };\n",
+    "macro_first.c": "#define THIS_MODULE 1\n#include <linux/module.h>\nint x = THIS_MODULE;\n",
+    "not_first.c": "#include <linux/init.h>\n#include <linux/module.h>\nint printk(int);\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def isolated_pch(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(header_sets, "PCH_ROOT", str(tmp_path / "pch"))
+    monkeypatch.setattr(header_sets, "_READY", {})
+
+
+def _sources(tmp_path):
+    paths = sorted(glob.glob(os.path.join(ROOT, "generated_code", "*.c")))
+    for name, text in CASES.items():
+        path = tmp_path / name
+        path.write_text(text)
+        paths.append(str(path))
+    for seed, size in enumerate((1024, 16 * 1024)):
+        path = tmp_path / f"generated_{seed}.c"
+        path.write_text(generate_driver(size, seed=seed))
+        paths.append(str(path))
+    return paths
+
+
+def _verdict(result):
+    return (result["status"], result["errors_count"], result["warnings_count"], result["notes_count"],
+            result["diagnostics"])
+
+
+@pytest.mark.parametrize("name", sorted(header_sets.HEADER_SETS))
+def test_pch_does_not_change_results(tmp_path, monkeypatch, name):
+    assert header_sets.ensure_header_set(name)["pch"]
+    for path in _sources(tmp_path):
+        monkeypatch.setattr(compiler, "USE_PCH", True)
+        with_pch = compile_code(path, header_set=name)
+        monkeypatch.setattr(compiler, "USE_PCH", False)
+        without = compile_code(path, header_set=name)
+        assert with_pch["pch"] and not without["pch"]
+        assert _verdict(with_pch) == _verdict(without), os.path.basename(path)
+
+
+def test_missing_include_still_fails_with_pch(tmp_path):
+    path = tmp_path / "missing_slab.c"
+    path.write_text(CASES["missing_slab.c"])
+    result = compile_code(str(path), header_set="kernel")
+    assert result["pch"]
+    assert result["status"] == "failed"
+    assert any("GFP_KERNEL" in d["message"] for d in result["diagnostics"])
+
+
+def test_headers_with_their_own_warnings_are_not_precompiled():
+    manifest = header_sets.build_header_set("minimal")
+    # the minimal stubs' static inline functions trip -Wunused-parameter
+    assert "linux/slab.h" not in manifest["precompiled"]
+    assert "linux/module.h" in manifest["precompiled"]
+
+
+def test_build_leaves_headers_alone_and_publishes_once():
+    set_dir = header_sets.header_set_dir("kernel")
+    before = header_sets.hash_tree(set_dir)
+    with ThreadPoolExecutor(4) as pool:
+        manifests = list(pool.map(lambda _: header_sets.build_header_set("kernel", force=True), range(4)))
+    assert header_sets.hash_tree(set_dir) == before
+    assert len({m["pch_dir"] for m in manifests}) == 1
+    pch_root = header_sets.PCH_ROOT
+    assert os.listdir(pch_root) == [os.path.basename(manifests[0]["pch_dir"])]
+    assert os.path.exists(os.path.join(manifests[0]["pch_dir"], "linux", "fs.h.gch"))
+
+
+@pytest.mark.parametrize("name", sorted(header_sets.HEADER_SETS))
+def test_committed_tree_is_the_generated_one(tmp_path, name):
+    assert header_sets.header_set_drift(name) == []
+    assert header_sets.write_header_set(name, str(tmp_path)) == header_sets.set_headers(name)
+    assert header_sets.hash_tree(str(tmp_path / name)) == header_sets.hash_tree(header_sets.header_set_dir(name))
+
+
+def test_kernel_offers_every_minimal_header():
+    assert set(header_sets.set_headers("minimal")) <= set(header_sets.set_headers("kernel"))
+
+
+def test_write_repairs_drift_and_build_refuses_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(header_sets, "HEADER_ROOT", str(tmp_path))
+    header_sets.write_header_set("kernel")
+    set_dir = tmp_path / "kernel" / "linux"
+    (set_dir / "fs.h").write_text("/* edited by hand */\n")
+    (set_dir / "stray.h").write_text("\n")
+    (set_dir / "slab.h").unlink()
+    assert header_sets.header_set_drift("kernel") == ["linux/fs.h", "linux/slab.h", "linux/stray.h"]
+    with pytest.raises(ValueError, match="--write"):
+        header_sets.build_header_set("kernel")
+
+    assert header_sets.write_header_set("kernel") == ["linux/fs.h", "linux/slab.h", "linux/stray.h"]
+    assert header_sets.header_set_drift("kernel") == []
+    assert not (set_dir / "stray.h").exists()
+
+
+def test_hash_follows_the_definition(monkeypatch):
+    before = header_sets.header_set_hash("kernel")
+    headers = dict(header_sets.HEADER_SETS["kernel"]["headers"])
+    headers["linux/fs.h"] += "/* one more line */\n"
+    monkeypatch.setitem(header_sets.HEADER_SETS, "kernel", {**header_sets.HEADER_SETS["kernel"], "headers": headers})
+    assert header_sets.header_set_hash("kernel") != before
+    assert header_sets.pch_dir_for("kernel") != header_sets.pch_dir_for("kernel", before)
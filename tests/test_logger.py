@@ -0,0 +1,84 @@
+import os
+import sys
+import logging
+import subprocess
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+
+from src import logger as log
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(code: str, cwd, **env) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": ROOT, **env}
+    return subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def test_import_leaves_host_logging_alone(tmp_path):
+    proc = _python("""
+        import logging, sys
+        logging.basicConfig(stream=sys.stdout, level=logging.WARNING, format="%(funcName)s:%(lineno)d %(message)s")
+        handlers, level = logging.root.handlers[:], logging.root.level
+        import src.logger, src.evaluator, src.batch
+        from src.logger import get_logger
+        get_logger("src.compiler").warning("pipeline record")
+        assert logging.root.handlers == handlers and logging.root.level == level
+        assert logging.logThreads and logging.logProcesses
+
+        def host_function():
+            logging.getLogger("host").warning("host record")
+        host_function()
+    """, tmp_path)
+    assert proc.stdout.startswith("host_function:")
+    assert "pipeline record" not in proc.stdout   # "src" doesn't propagate by default
+    with open(tmp_path / "logs" / "pipeline.log", encoding="utf-8") as f:
+        assert "pipeline record" in f.read()
+
+
+def test_propagation_can_be_turned_on(tmp_path):
+    proc = _python("""
+        import logging, sys
+        logging.basicConfig(stream=sys.stdout, format="host %(message)s")
+        from src.logger import get_logger
+        get_logger("src.compiler").warning("pipeline record")
+    """, tmp_path, LOG_PROPAGATE="1")
+    assert "host pipeline record" in proc.stdout
+
+
+def test_outside_names_are_filed_under_src():
+    assert log.get_logger("benchmarks.harness").name == "src.benchmarks.harness"
+    assert log.get_logger("src.compiler").name == "src.compiler"
+
+
+def _work(n: int) -> int:
+    log.get_logger("src.batch").info(f"worker record {n}")
+    return n
+
+
+def test_worker_listener_has_its_own_handlers(tmp_path, monkeypatch):
+    monkeypatch.setattr(log, "LOG_DIR", str(tmp_path))
+    mp_queue, listener = log.start_log_listener()
+    if log._listener is not None:
+        assert not set(listener.handlers) & set(log._listener.handlers)
+    try:
+        with ProcessPoolExecutor(max_workers=2, initializer=log.init_worker_logging,
+                                 initargs=(mp_queue, {})) as pool:
+            assert sorted(pool.map(_work, range(4))) == [0, 1, 2, 3]
+    finally:
+        listener.stop()
+    assert all(h.stream is None for h in listener.handlers)   # closed with the listener
+    with open(tmp_path / log.LOG_FILE, encoding="utf-8") as f:
+        text = f.read()
+    assert all(f"worker record {n}" in text for n in range(4))
+
+
+def test_stage_levels_apply_below_src():
+    stage = logging.getLogger("src.test_stage")
+    try:
+        log.set_stage_levels("test_stage=ERROR")
+        assert stage.level == logging.ERROR
+        assert log.stage_levels()["test_stage"] == "ERROR"
+    finally:
+        stage.setLevel(logging.NOTSET)
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from src import scoring
+from src.evaluation.scheduler import run_checkers
+from src.evaluation.source_unit import SourceUnit
+from src.metrics import compile_credit, load_profiles, score_all
+
+DRIVER = """\
+#include <linux/fs.h>
+#include <linux/module.h>
+
+static int demo_open(struct inode *inode, struct file *file) { return 0; }
+static int demo_release(struct inode *inode, struct file *file) { return 0; }
+static ssize_t demo_read(struct file *f, char __user *buf, size_t len, loff_t *off) { return 0; }
+static ssize_t demo_write(struct file *f, const char __user *buf, size_t len, loff_t *off) { return len; }
+
+static const struct file_operations demo_fops = {
+    .open = demo_open, .release = demo_release, .read = demo_read, .write = demo_write,
+};
+MODULE_LICENSE("GPL");
+"""
+
+
+def _report(text: str, compiled: bool = True) -> dict:
+    unit = SourceUnit.from_bytes("demo.c", text.encode())
+    results, _ = asyncio.run(run_checkers(unit))
+    return {"file": "demo.c", "compilation": {"success": compiled}, **results}
+
+
+@pytest.mark.parametrize("text", ["", "/* nothing yet */\n", "struct demo;\nextern int demo_count;\n"])
+def test_compiling_without_code_earns_no_credit(text):
+    report = _report(text)
+    assert compile_credit(report) == 0.0
+    # security and code quality still reward the absence of problems, correctness must not
+    assert score_all(report)["scores"]["overall_score"] < 45
+
+
+def test_compiled_driver_earns_compile_credit():
+    report = _report(DRIVER)
+    assert report["functionality"]["findings"]["function_definitions"] == 4
+    assert compile_credit(report) == 1.0
+    assert compile_credit(_report(DRIVER, compiled=False)) == 0.0
+
+
+def test_failed_functionality_check_earns_no_credit():
+    report = _report(DRIVER)
+    report["functionality"] = {"error": "crashed"}
+    assert compile_credit(report) == 0.0
+
+
+def test_reports_without_the_count_fall_back_to_basic_operations():
+    report = _report(DRIVER)
+    del report["functionality"]["findings"]["function_definitions"]
+    report["functionality"]["metrics"]["basic_operations"] = 0.5
+    assert compile_credit(report) == 1.0
+    report["functionality"]["metrics"]["basic_operations"] = 0.0
+    assert compile_credit(report) == 0.0
+
+
+def test_rescore_matches_score_all():
+    reports = [_report(""), _report(DRIVER), _report(DRIVER, compiled=False)]
+    names, weights = scoring.weight_matrix(load_profiles(None))
+    overall = scoring.rescore(scoring.bucket_matrix(scoring.metric_table(reports)), weights)
+    expected = [score_all(r)["scores"]["overall_score"] for r in reports]
+    assert [round(v, 2) for v in overall[:, names.index("default")]] == expected
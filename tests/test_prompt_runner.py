@@ -0,0 +1,53 @@
+import glob
+
+import pytest
+
+pytest.importorskip("together")
+
+from src import code_runner, telemetry
+from src.errors import PromptFileError
+from src.models import model_registry
+from tests.fake_completions import FakeCompletionsServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    with FakeCompletionsServer() as s:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("TOGETHER_API_KEY", "test-key")
+        monkeypatch.setenv("TOGETHER_BASE_URL", s.base_url)
+        monkeypatch.setattr(telemetry, "_DEFAULT", telemetry.TelemetryStore(str(tmp_path / "telemetry")))
+        (tmp_path / "prompts").mkdir()
+        (tmp_path / "prompts" / "char_driver.txt").write_text("Write a Linux character driver.")
+        model_registry.shutdown()
+        yield s
+        model_registry.shutdown()
+
+
+def _run(*extra):
+    code_runner.main(["--prompt", "char_driver.txt", "--model", "qwen3_32b", "--output", "out",
+                      "--cache-dir", "responses", "--seed", "7", *extra])
+
+
+def test_read_prompt_missing_file(tmp_path):
+    with pytest.raises(PromptFileError):
+        code_runner.read_prompt(str(tmp_path / "missing.txt"))
+
+
+def test_generates_and_saves_the_code_block(server):
+    _run()
+    saved = glob.glob("out/qwen3_32b_*.c")
+    assert len(saved) == 1
+    with open(saved[0]) as f:
+        code = f.read()
+    assert "int main(void)" in code and "```" not in code
+    assert [r["seed"] for r in server.requests] == [7]
+
+
+def test_second_run_is_served_from_the_response_cache(server):
+    _run()
+    model_registry.shutdown()
+    _run()
+    assert len(server.requests) == 1
+    _run("--cache-mode", "refresh")
+    assert len(server.requests) == 2
@@ -0,0 +1,59 @@
+import pytest
+
+from src.results_db import ResultsDB, db_path_for, record_report, row_from_report
+
+
+def _report(name: str, score: float, compiled: bool = True) -> dict:
+    return {
+        "file": f"generated_code/{name}",
+        "timestamp": "2025-07-29T18:25:01",
+        "compilation": {"success": compiled, "errors_count": 0 if compiled else 2, "warnings_count": 1},
+        "overall_score": {"scores": {"overall_score": score}},
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = ResultsDB(db_path_for(str(tmp_path)))
+    yield db
+    db.close()
+
+
+def test_row_takes_model_and_prompt_from_the_file_name():
+    row = row_from_report(_report("deepseek_r1_20250729_182501_char_driver_s2.c", 71.5), "r.json", "base")
+    assert (row["model"], row["prompt"], row["run"]) == ("deepseek_r1", "char_driver.txt", "base")
+    assert row["overall_score"] == 71.5 and row["compilation_success"] and row["compilation_warnings"] == 1
+
+
+def test_upsert_keeps_one_row_per_file_and_run(db):
+    name = "qwen3_32b_20250729_182501_char_driver_s0.c"
+    db.upsert([row_from_report(_report(name, 40.0), run="base")])
+    db.upsert([row_from_report(_report(name, 60.0), run="base")])
+    db.upsert([row_from_report(_report(name, 80.0), run="tuned")])
+    assert db.count("base") == 1 and db.count("tuned") == 1
+    assert db.runs() == ["base", "tuned"]
+    # the per-model totals follow the update instead of counting the file twice
+    assert db.model_scores("base") == {"qwen3_32b": {"samples": 1, "mean_score": 60.0}}
+
+
+def test_top_and_rows_come_best_first(db):
+    db.upsert([row_from_report(_report(f"{model}_20250729_18250{i}_p_s0.c", score), run="base")
+               for i, (model, score) in enumerate([("a", 50.0), ("b", 90.0), ("a", 70.0), ("b", 10.0)])])
+    assert [r["overall_score"] for r in db.rows("base")] == [90.0, 70.0, 50.0, 10.0]
+    assert [r["overall_score"] for r in db.top(2, "base")] == [90.0, 70.0]
+    assert [r["overall_score"] for r in db.top(5, "base", model="a")] == [70.0, 50.0]
+    assert db.model_scores("base") == {"a": {"samples": 2, "mean_score": 60.0},
+                                       "b": {"samples": 2, "mean_score": 50.0}}
+    assert sorted(map(tuple, db.scores("base"))) == [("a", "p.txt", 50.0), ("a", "p.txt", 70.0),
+                                         ("b", "p.txt", 10.0), ("b", "p.txt", 90.0)]
+
+
+def test_record_report_writes_the_output_dirs_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVAL_RUN", "nightly")
+    record_report(_report("m_20250729_182501.c", 55.0, compiled=False), "r.json", str(tmp_path))
+    db = ResultsDB(db_path_for(str(tmp_path)))
+    try:
+        row, = db.rows("nightly")
+        assert row["report"] == "r.json" and not row["compilation_success"] and row["compilation_errors"] == 2
+    finally:
+        db.close()
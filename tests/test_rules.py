@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+from src.evaluation import rules
+from src.evaluation.rules import RuleEngine, RuleHits, default_engine, register_regex
+from src.evaluation.security_check import scan_security_issues
+from src.evaluation.source_unit import SourceUnit
+
+COMMENTED = """\
+/* copy_from_user(buf, ubuf, len) is left for later */
+// mutex_lock(&lock);
+static const char *msg = "strcpy(dst, src) kfree";
+static ssize_t demo_write(struct file *f, const char *ubuf, size_t len, loff_t *off) { return len; }
+"""
+
+
+def _unit(text: str) -> SourceUnit:
+    return SourceUnit.from_bytes("demo.c", text.encode())
+
+
+def test_rules_only_see_code_outside_comments_and_strings():
+    hits = _unit(COMMENTED).hits
+    assert not hits.has("call.copy_from_user")
+    assert not hits.has("call.mutex_lock")
+    assert not hits.has("call.strcpy")
+    assert not hits.contains("kfree")
+    assert hits.contains("ssize_t") and hits.contains("loff_t")
+
+    findings = scan_security_issues(_unit(COMMENTED))["findings"]
+    assert findings == {"unsafe_calls": [], "user_copy_calls": 0, "uses_mutex": False}
+
+
+def test_contains_rejects_unregistered_literals():
+    hits = _unit("int kfree_count;\n").hits
+    assert hits.contains("kfree")
+    with pytest.raises(ValueError, match="not registered"):
+        hits.contains("vmalloc")
+    with pytest.raises(ValueError):
+        RuleHits({}).contains("kfree(")
+
+
+def test_engine_matches_a_plain_regex_search():
+    text = "memcpy(a, b, 1); memmove(a, b, 1);\nstrcpy (x, y); xstrcpy(z); copy_to_user(u, k, n);\n"
+    hits = default_engine().scan(text)
+    for name, pattern in rules.REGEX_RULES.items():
+        assert hits.positions.get(name, []) == [m.start() for m in re.finditer(pattern, text)], name
+    # overlapping literals are all reported, each at its own offset
+    assert hits.positions["lit:memcpy"] == [0]
+    assert hits.positions["lit:memmove("] == [17]
+
+
+def test_unanchored_rule_falls_back_to_its_own_scan(monkeypatch):
+    monkeypatch.setattr(rules, "_RULES", dict(rules._RULES))
+    rule = register_regex("call.either", r"(?:foo|bar)\(")
+    assert rule.anchor is None
+    engine = RuleEngine([rule])
+    assert engine.scan("x = bar(1) + foo(2);").positions == {"call.either": [4, 13]}
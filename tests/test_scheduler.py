@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from src.evaluation.registry import COMPILATION, Checker, registered_checkers
+from src.evaluation.scheduler import build_graph, run_checkers
+from src.evaluation.source_unit import SourceUnit
+
+
+def _checker(key, *inputs, func=None):
+    return Checker(key, func or (lambda unit, **values: {"key": key, "inputs": sorted(values)}), inputs, "1")
+
+
+def test_cycle_is_rejected():
+    checkers = [_checker("a", "text", "c"), _checker("b", "a"), _checker("c", "b"), _checker("d", "hits")]
+    with pytest.raises(ValueError, match=r"cycle among: \['a', 'b', 'c'\]"):
+        build_graph(checkers)
+
+
+def test_self_dependency_is_a_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        build_graph([_checker("a", "a")])
+
+
+def test_unknown_input_is_rejected():
+    with pytest.raises(ValueError, match="'diagnostics'"):
+        build_graph([_checker("a", "diagnostics")])
+
+
+def test_graph_orders_dependencies_first():
+    graph = build_graph([_checker("late", "early", COMPILATION), _checker("early", "functions")])
+    order = [node for node, _ in graph]
+    assert order.index("tokens") < order.index("functions") < order.index("early") < order.index("late")
+    assert order.index(COMPILATION) < order.index("late")
+    assert dict(graph)["late"] == ("early", COMPILATION)
+    # without a compile job there is no compilation node to wait for
+    assert COMPILATION not in dict(build_graph(registered_checkers(), with_compilation=False))
+
+
+def test_checkers_get_their_inputs_and_independent_ones_overlap():
+    def slow(unit, **values):
+        time.sleep(0.3)
+        return {"done": True}
+
+    checkers = [_checker("left", "text", func=slow), _checker("right", "text", func=slow),
+                _checker("joined", "left", "right")]
+    unit = SourceUnit.from_bytes("demo.c", b"int x;\n")
+    start = time.perf_counter()
+    results, timings = asyncio.run(run_checkers(unit, checkers=checkers))
+    assert time.perf_counter() - start < 0.55
+    assert results["joined"] == {"key": "joined", "inputs": ["left", "right"]}
+    assert set(timings) == {"text", "left", "right", "joined"} and timings["left"] >= 0.3
+
+
+def test_failing_checker_does_not_stop_the_others():
+    def broken(unit):
+        raise RuntimeError("boom")
+
+    unit = SourceUnit.from_bytes("demo.c", b"int x;\n")
+    results, _ = asyncio.run(run_checkers(unit, checkers=[_checker("bad", "text", func=broken), _checker("ok", "hits")]))
+    assert results == {"bad": {}, "ok": {"key": "ok", "inputs": []}}
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.stats import bootstrap_means, group_bootstrap, leaderboard, rank_probabilities, support
+
+
+def _naive_means(scores, resamples, seed):
+    """Textbook bootstrap: draw n scores with replacement per resample."""
+    rng = np.random.default_rng(seed)
+    return rng.choice(scores, size=(resamples, len(scores)), replace=True).mean(axis=1)
+
+
+@pytest.mark.parametrize("scores", [
+    np.array([40.0, 55.0, 55.0, 60.0, 72.5, 90.0]),                 # few distinct values
+    np.random.default_rng(1).normal(60, 12, 400).round(2),          # binned past MAX_SUPPORT
+])
+def test_multinomial_bootstrap_matches_resampling_scores(scores):
+    fast = bootstrap_means(scores, 20000, np.random.default_rng(0))
+    slow = _naive_means(scores, 20000, 0)
+    se = scores.std() / np.sqrt(len(scores))
+    assert abs(fast.mean() - scores.mean()) < 0.05 * se
+    assert fast.std() == pytest.approx(slow.std(), rel=0.05)
+    assert np.percentile(fast, [2.5, 97.5]) == pytest.approx(np.percentile(slow, [2.5, 97.5]), abs=0.15 * se)
+
+
+def test_binned_support_keeps_count_and_mean():
+    scores = np.random.default_rng(2).uniform(0, 100, 1000)
+    values, counts = support(scores, max_support=20)
+    assert len(values) <= 20 and counts.sum() == 1000
+    assert values @ counts / 1000 == pytest.approx(scores.mean())
+
+
+def test_ci_covers_the_mean_and_narrows_with_samples():
+    rng = np.random.default_rng(3)
+    small, large = rng.normal(50, 10, 20), rng.normal(50, 10, 2000)
+    rows, boot = group_bootstrap(["small"] * 20 + ["large"] * 2000, np.concatenate([small, large]), seed=0)
+    large_row, small_row = rows   # groups come sorted by key
+    assert boot.shape == (10000, 2)
+    for row in rows:
+        assert row["ci_low"] < row["mean"] < row["ci_high"]
+        assert row["p25"] <= row["p50"] <= row["p75"]
+    width = lambda r: r["ci_high"] - r["ci_low"]
+    # the 95% interval is about +-1.96 standard errors
+    assert width(large_row) == pytest.approx(2 * 1.96 * large.std() / np.sqrt(2000), rel=0.1)
+    assert width(small_row) > 5 * width(large_row)
+
+
+def test_constant_group_has_a_point_interval_and_results_repeat():
+    rows, _ = group_bootstrap(["m"] * 5, np.full(5, 70.0))
+    assert rows[0]["ci_low"] == rows[0]["ci_high"] == 70.0
+    keys, scores = ["a", "b"] * 10, np.arange(20.0)
+    assert group_bootstrap(keys, scores, seed=7)[0] == group_bootstrap(keys, scores, seed=7)[0]
+    assert group_bootstrap([], np.array([]))[0] == []
+
+
+def test_rank_probabilities_and_leaderboard():
+    boot = np.array([[3.0, 1.0, 2.0], [1.0, 3.0, 2.0], [3.0, 2.0, 1.0], [3.0, 1.0, 2.0]])
+    probs = rank_probabilities(boot)
+    assert probs.sum(axis=0) == pytest.approx(np.ones(3))
+    assert probs.sum(axis=1) == pytest.approx(np.ones(3))
+    assert probs[0].tolist() == [0.75, 0.0, 0.25]
+
+    rng = np.random.default_rng(4)
+    keys = ["weak"] * 30 + ["strong"] * 30 + ["close"] * 30
+    scores = np.concatenate([rng.normal(40, 5, 30), rng.normal(80, 5, 30), rng.normal(78, 5, 30)])
+    board = leaderboard(keys, scores, resamples=4000)
+    assert [r["group"] for r in board] == ["strong", "close", "weak"]
+    assert board[0]["p_best"] + board[1]["p_best"] == pytest.approx(1.0)
+    assert board[2]["p_best"] == 0.0 and board[2]["expected_rank"] == 3.0
+    assert 0.5 < board[0]["p_best"] < 1.0
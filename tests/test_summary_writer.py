@@ -0,0 +1,82 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.summary_writer import SummaryWriter
+
+FIELDS = ["name", "score"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Writes rows in0..in6 with a flush every 3 rows, lets in6 reach the files
+# but not the checkpoint, then dies without closing anything.
+KILLED = """
+import os, signal, sys
+from src.summary_writer import SummaryWriter
+w = SummaryWriter(sys.argv[1], ["name", "score"], flush_every=3, flush_interval=3600)
+for i in range(7):
+    w.write(f"in{i}", {"name": f"in{i}", "score": i})
+w._csv_file.flush(); w._ndjson_file.flush()
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+
+def _rows(directory):
+    with open(os.path.join(directory, "summary.csv"), newline="") as f:
+        csv_rows = [r["name"] for r in csv.DictReader(f)]
+    with open(os.path.join(directory, "summary.ndjson")) as f:
+        ndjson_rows = [json.loads(line)["name"] for line in f]
+    assert csv_rows == ndjson_rows
+    return csv_rows
+
+
+def _finish(directory, inputs):
+    with SummaryWriter(directory, FIELDS, flush_every=3) as w:
+        todo = [name for name in inputs if name not in w.done]
+        for name in todo:
+            w.write(name, {"name": name, "score": 0})
+    return todo
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs SIGKILL")
+def test_killed_writer_resumes_without_duplicates(tmp_path):
+    proc = subprocess.run([sys.executable, "-c", KILLED, str(tmp_path)], cwd=ROOT)
+    assert proc.returncode == -9
+    # in6 reached the files but not the checkpoint
+    assert _rows(str(tmp_path))[-1] == "in6"
+
+    inputs = [f"in{i}" for i in range(10)]
+    assert _finish(str(tmp_path), inputs) == ["in6", "in7", "in8", "in9"]
+    assert _rows(str(tmp_path)) == inputs
+    # a second resume has nothing left to do
+    assert _finish(str(tmp_path), inputs) == []
+    assert _rows(str(tmp_path)) == inputs
+
+
+def test_torn_checkpoint_line_is_ignored(tmp_path):
+    with SummaryWriter(str(tmp_path), FIELDS, flush_every=2) as w:
+        for i in range(4):
+            w.write(f"in{i}", {"name": f"in{i}", "score": i})
+    with open(tmp_path / "summary.checkpoint", "a") as f:
+        f.write('{"csv": 99')
+    assert _finish(str(tmp_path), [f"in{i}" for i in range(5)]) == ["in4"]
+    assert _rows(str(tmp_path)) == [f"in{i}" for i in range(5)]
+
+
+def test_inputs_without_a_row_count_as_done(tmp_path):
+    with SummaryWriter(str(tmp_path), FIELDS) as w:
+        w.write("empty", None)
+        w.write("full", {"name": "full", "score": 1})
+    assert _finish(str(tmp_path), ["empty", "full"]) == []
+    assert _rows(str(tmp_path)) == ["full"]
+
+
+def test_restart_discards_the_checkpoint(tmp_path):
+    _finish(str(tmp_path), ["a", "b"])
+    with SummaryWriter(str(tmp_path), FIELDS, restart=True) as w:
+        assert not w.done
+        w.write("c", {"name": "c", "score": 2})
+    assert _rows(str(tmp_path)) == ["c"]
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("together")
+
+from src import sweep, telemetry
+from src.models import model_registry
+from src.models.response_cache import ResponseCache
+from tests.fake_completions import FakeCompletionsServer
+
+MODEL = "qwen3_32b"
+MODEL_ID = model_registry.together_models[MODEL]
+PROMPTS = {"char_driver": "Write a Linux character driver."}
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("TOGETHER_API_KEY", "test-key")
+    monkeypatch.setattr(telemetry, "_DEFAULT", telemetry.TelemetryStore(str(tmp_path / "telemetry")))
+    monkeypatch.setattr(sweep, "BACKOFF_BASE", 0.01)
+    model_registry.shutdown()
+    yield
+    model_registry.shutdown()
+
+
+@pytest.fixture
+def server():
+    with FakeCompletionsServer() as s:
+        yield s
+
+
+def _sweep(server, tmp_path, samples=1, cache=None, **kwargs):
+    async def run():
+        try:
+            return await sweep.run_sweep([MODEL], PROMPTS, samples, str(tmp_path / "out"),
+                                         base_url=server.base_url, cache=cache, **kwargs)
+        finally:
+            await model_registry.ashutdown()
+    return asyncio.run(run())
+
+
+def test_generates_every_sample_with_its_seed(server, tmp_path):
+    rows = _sweep(server, tmp_path, samples=3, seed=10)
+    assert [r["ok"] for r in rows] == [True] * 3
+    assert sorted(r["seed"] for r in server.requests) == [10, 11, 12]
+    for row in rows:
+        with open(row["file"]) as f:
+            assert "int main(void)" in f.read()
+
+
+def test_rate_limit_paces_requests(server, tmp_path):
+    rate, samples = 20.0, 6
+    _sweep(server, tmp_path, samples=samples, rate=rate, burst=1)
+    times = sorted(r["t"] for r in server.requests)
+    assert len(times) == samples
+    # one token up front, then one every 1/rate seconds
+    assert times[-1] - times[0] >= (samples - 1) / rate * 0.9
+
+
+def test_burst_is_sent_back_to_back(server, tmp_path):
+    _sweep(server, tmp_path, samples=4, rate=0.5, burst=4)
+    times = sorted(r["t"] for r in server.requests)
+    assert times[-1] - times[0] < 1.0
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_retryable_statuses(server, tmp_path, status):
+    server.script = [status, status]
+    row, = _sweep(server, tmp_path)
+    assert row["ok"] and row["attempts"] == 3
+    assert [r["status"] for r in server.requests] == [status, status, 200]
+
+
+def test_gives_up_after_max_retries(server, tmp_path):
+    server.script = [503] * 10
+    row, = _sweep(server, tmp_path, max_retries=2)
+    assert not row["ok"] and row["attempts"] == 3
+    assert len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried(server, tmp_path):
+    server.script = [400]
+    row, = _sweep(server, tmp_path)
+    assert not row["ok"] and row["attempts"] == 1
+    assert len(server.requests) == 1
+
+
+def test_resume_only_requests_what_is_missing(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses"))
+    server.status_for = lambda payload: 400 if payload.get("seed") == 1 else None
+    first = _sweep(server, tmp_path, samples=3, cache=cache)
+    assert [r["ok"] for r in first] == [True, False, True]
+
+    server.status_for = None
+    server.requests.clear()
+    second = _sweep(server, tmp_path, samples=3, cache=cache)
+    assert [r["ok"] for r in second] == [True, True, True]
+    assert [r["cached"] for r in second] == [True, False, True]
+    assert [r["seed"] for r in server.requests] == [1]
+
+    server.requests.clear()
+    third = _sweep(server, tmp_path, samples=3, cache=cache)
+    assert all(r["cached"] for r in third)
+    assert server.requests == []
+
+
+def test_streaming_sweep(server, tmp_path):
+    row, = _sweep(server, tmp_path, stream=True)
+    assert row["ok"] and row["blocks"] == 1
+    assert row["ttft_s"] is not None and row["ttfcb_s"] is not None
+    assert server.requests[0]["stream"]
+
+
+def test_cache_hits_reuse_the_saved_sample(server, tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "responses"))
+    first = _sweep(server, tmp_path, samples=2, cache=cache)
+    # a later second would otherwise give every hit a new timestamped name
+    monkeypatch.setattr(sweep, "save_generated_code", lambda *a, **k: pytest.fail("saved again"))
+    second = _sweep(server, tmp_path, samples=2, cache=cache)
+    assert all(r["cached"] for r in second)
+    assert [r["file"] for r in second] == [r["file"] for r in first]
+    assert len(list((tmp_path / "out").glob("*.c"))) == 2
+
+
+def test_changed_sample_file_is_saved_again(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses"))
+    first, = _sweep(server, tmp_path, cache=cache)
+    with open(first["file"], "a") as f:
+        f.write("/* edited */\n")
+    second, = _sweep(server, tmp_path, cache=cache)
+    assert second["cached"]
+    with open(second["file"]) as f:
+        assert "edited" not in f.read()
+    assert cache.get_entry(MODEL_ID, PROMPTS["char_driver"], {"seed": 0})["file"] == second["file"]